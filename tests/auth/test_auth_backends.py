@@ -1,8 +1,12 @@
+from django.core.cache import cache
+from django.test import override_settings
 from model_bakery import baker
+from model_bakery.recipe import seq
 from rest_framework.test import APIRequestFactory, APITestCase
 
 from tests.models import User
 from zq_django_util.utils.auth.backends import OpenIdBackend
+from zq_django_util.utils.auth.cache import user_cache
 from zq_django_util.utils.auth.exceptions import (
     OpenIdNotBound,
     OpenIdNotProvided,
@@ -48,6 +52,25 @@ class OpenIdBackendTestCase(APITestCase):
                 request, openid=openid, raise_exception=True
             )
 
+    async def test_aauthenticate(self):
+        user = await User.objects.acreate(username="test", openid="openid")
+        self.assertEqual(
+            await self.backend.aauthenticate(openid="openid"), user
+        )
+        self.assertIsNone(await self.backend.aauthenticate(openid="-1"))
+        self.assertIsNone(await self.backend.aauthenticate())
+
+    async def test_aauthenticate_raise_exception(self):
+        with self.assertRaises(OpenIdNotProvided):
+            await self.backend.aauthenticate(raise_exception=True)
+        with self.assertRaises(OpenIdNotBound):
+            await self.backend.aauthenticate(openid="-1", raise_exception=True)
+
+    async def test_aget_user(self):
+        user = await User.objects.acreate(username="test", openid="openid")
+        self.assertEqual(await self.backend.aget_user(user.id), user)
+        self.assertIsNone(await self.backend.aget_user(-1))
+
     def test_get_user_exists(self):
         user = baker.make(User)
         self.assertEqual(self.backend.get_user(user.id), user)
@@ -62,3 +85,44 @@ class OpenIdBackendTestCase(APITestCase):
         request = self.factory.request()
         auth_user = backend.authenticate(request, openid=openid)
         self.assertEqual(auth_user, user)
+
+    def test_authenticate_many(self):
+        users = baker.make(User, _quantity=3, openid=seq("openid"))
+        openids = [user.openid for user in users]
+
+        with self.assertNumQueries(1):
+            result = self.backend.authenticate_many(
+                openids + [openids[0], "not_bound", None]
+            )
+        self.assertEqual(result, {user.openid: user for user in users})
+
+    def test_authenticate_many_chunked(self):
+        users = baker.make(User, _quantity=5, openid=seq("openid"))
+        self.backend.chunk_size = 2
+
+        with self.assertNumQueries(3):
+            result = self.backend.authenticate_many(
+                user.openid for user in users
+            )
+        self.assertEqual(len(result), 5)
+
+    def test_authenticate_many_empty(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.authenticate_many([]), {})
+
+    def test_get_users(self):
+        users = baker.make(User, _quantity=3)
+
+        with self.assertNumQueries(1):
+            result = self.backend.get_users([user.id for user in users] + [-1])
+        self.assertEqual(result, {user.id: user for user in users})
+
+    @override_settings(ZQ_AUTH={"USER_CACHE": True})
+    def test_get_users_fill_cache(self):
+        cache.clear()
+        user_cache.local.clear()
+        user = baker.make(User)
+
+        self.backend.get_users([user.id])
+        user_cache.local.clear()
+        self.assertEqual(user_cache.get(user.id), user)
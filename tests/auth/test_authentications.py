@@ -1,5 +1,16 @@
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import override_settings
 from model_bakery import baker
 from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
 from tests.models import User
 from zq_django_util.exceptions import ApiException
@@ -8,6 +19,11 @@ from zq_django_util.utils.auth.authentications import (
     ActiveUserAuthentication,
     NormalUserAuthentication,
 )
+from zq_django_util.utils.auth.cache import (
+    revoke_blacklisted_token,
+    token_cache,
+    user_cache,
+)
 
 
 class ActiveUserAuthenticationTestCase(APITestCase):
@@ -48,6 +64,174 @@ class ActiveUserAuthenticationTestCase(APITestCase):
         )
 
 
+@override_settings(ZQ_AUTH={"USER_CACHE": True})
+class ActiveUserAuthenticationCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.local.clear()
+        self.authentication = ActiveUserAuthentication()
+        self.user = baker.make(User, is_active=True)
+        self.context = {"user_id": self.user.id}
+
+    def test_get_user_cached(self):
+        self.assertEqual(self.authentication.get_user(self.context), self.user)
+
+        with self.assertNumQueries(0):
+            user = self.authentication.get_user(self.context)
+        self.assertEqual(user, self.user)
+        self.assertIsNot(user, self.authentication.get_user(self.context))
+
+    def test_get_user_shared_cache(self):
+        self.authentication.get_user(self.context)
+        user_cache.local.clear()
+
+        with self.assertNumQueries(0):
+            user = self.authentication.get_user(self.context)
+        self.assertEqual(user, self.user)
+
+    def test_get_user_cache_error(self):
+        self.authentication.get_user(self.context)
+        user_cache.local.clear()
+
+        with patch(
+            "zq_django_util.utils.auth.cache.cache.get", side_effect=Exception
+        ):
+            with self.assertNumQueries(1):
+                self.assertEqual(
+                    self.authentication.get_user(self.context), self.user
+                )
+
+    def test_invalidate_on_save(self):
+        self.authentication.get_user(self.context)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(ApiException) as exc_context:
+            self.authentication.get_user(self.context)
+        self.assertEqual(
+            exc_context.exception.response_type, ResponseType.NotActive
+        )
+
+    def test_invalidate_on_delete(self):
+        self.authentication.get_user(self.context)
+
+        self.user.delete()
+
+        with self.assertRaises(ApiException) as exc_context:
+            self.authentication.get_user(self.context)
+        self.assertEqual(
+            exc_context.exception.response_type, ResponseType.ResourceNotFound
+        )
+
+    @override_settings(ZQ_AUTH={"USER_CACHE": False})
+    def test_cache_disabled(self):
+        self.authentication.get_user(self.context)
+
+        with self.assertNumQueries(1):
+            self.authentication.get_user(self.context)
+
+
+@override_settings(ZQ_AUTH={"TOKEN_CACHE": True})
+class ActiveUserAuthenticationTokenCacheTestCase(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.authentication = ActiveUserAuthentication()
+        self.user = baker.make(User, is_active=True)
+        self.raw_token = str(AccessToken.for_user(self.user)).encode()
+
+    def get_validated_token(self):
+        with patch.object(
+            JWTAuthentication,
+            "get_validated_token",
+            autospec=True,
+            side_effect=JWTAuthentication.get_validated_token,
+        ) as mock_validate:
+            token = self.authentication.get_validated_token(self.raw_token)
+        return token, mock_validate.call_count
+
+    def test_get_validated_token_cached(self):
+        token, count = self.get_validated_token()
+        self.assertEqual(count, 1)
+        self.assertEqual(token["user_id"], self.user.id)
+
+        cached_token, count = self.get_validated_token()
+        self.assertEqual(count, 0)
+        self.assertIs(cached_token, token)
+
+    def test_get_validated_token_invalid(self):
+        self.raw_token = b"invalid"
+        with self.assertRaises(InvalidToken):
+            self.authentication.get_validated_token(self.raw_token)
+        self.assertEqual(len(token_cache.local), 0)
+
+    def test_token_expired(self):
+        token = AccessToken.for_user(self.user)
+        token.set_exp(lifetime=-token.lifetime)
+        token_cache.set(str(token), token)
+        self.assertIsNone(token_cache.get(str(token)))
+
+        token.set_exp(from_time=token.current_time, lifetime=token.lifetime)
+        token_cache.set(str(token), token)
+        self.assertIs(token_cache.get(str(token).encode()), token)
+        self.assertLessEqual(
+            token_cache.local._data[str(token)][1] - time.monotonic(),
+            token.lifetime.total_seconds(),
+        )
+
+    def test_revoke(self):
+        self.get_validated_token()
+        token_cache.revoke(self.raw_token)
+        self.assertEqual(self.get_validated_token()[1], 1)
+
+    def test_purge_user(self):
+        other = baker.make(User, is_active=True)
+        other_token = str(AccessToken.for_user(other)).encode()
+        self.authentication.get_validated_token(other_token)
+        self.get_validated_token()
+
+        token_cache.purge_user(self.user.id)
+        self.assertEqual(self.get_validated_token()[1], 1)
+        self.assertIsNotNone(token_cache.get(other_token))
+
+    def test_purge_user_non_int_id(self):
+        user_id = uuid.uuid4()
+        token = AccessToken()
+        token[api_settings.USER_ID_CLAIM] = str(user_id)
+        token_cache.set(str(token), token)
+        other = AccessToken()
+        other[api_settings.USER_ID_CLAIM] = "1"
+        token_cache.set(str(other), other)
+
+        token_cache.purge_user(user_id)
+        self.assertIsNone(token_cache.get(str(token)))
+        self.assertIsNotNone(token_cache.get(str(other)))
+
+        token_cache.purge_user(1)
+        self.assertIsNotNone(token_cache.get(str(other)))
+        token_cache.purge_user("1")
+        self.assertIsNone(token_cache.get(str(other)))
+
+    def test_revoke_blacklisted_token(self):
+        self.get_validated_token()
+        instance = SimpleNamespace(
+            token=SimpleNamespace(token="refresh", user=self.user)
+        )
+        revoke_blacklisted_token(None, instance)
+        self.assertIsNone(token_cache.get(self.raw_token))
+
+        self.get_validated_token()
+        instance.token.user = None
+        revoke_blacklisted_token(None, instance)
+        self.assertEqual(len(token_cache.local), 0)
+
+    @override_settings(ZQ_AUTH={"TOKEN_CACHE": False})
+    def test_cache_disabled(self):
+        self.get_validated_token()
+        self.assertEqual(self.get_validated_token()[1], 1)
+        self.assertEqual(len(token_cache.local), 0)
+
+
 class NormalUserAuthenticationTestCase(APITestCase):
     def setUp(self):
         self.factory = APIRequestFactory()
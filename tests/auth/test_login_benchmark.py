@@ -0,0 +1,108 @@
+import os
+import time
+import unittest
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.test import override_settings
+from model_bakery import baker
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tests.models import User
+from zq_django_util.utils.auth.serializers import (
+    OpenIdLoginSerializer,
+    PasswordLoginSerializer,
+)
+from zq_django_util.utils.auth.tokens import token_factory
+
+BENCHMARK_ROUNDS = int(os.environ.get("ZQ_BENCHMARK_ROUNDS", 500))
+
+
+class ReducedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    降低迭代次数的 PBKDF2，在安全性与登录吞吐量之间取舍
+    """
+
+    algorithm = "pbkdf2_sha256_reduced"
+    iterations = 100000
+
+
+def throughput(func, rounds=BENCHMARK_ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return rounds / (time.perf_counter() - start)
+
+
+@unittest.skipUnless(
+    os.environ.get("ZQ_BENCHMARK"),
+    "设置环境变量 ZQ_BENCHMARK=1 以运行登录吞吐量测试",
+)
+class LoginBenchmarkTestCase(APITestCase):
+    """
+    登录吞吐量测试
+
+    ZQ_BENCHMARK=1 pytest -s tests/auth/test_login_benchmark.py
+    """
+
+    PASSWORD_HASHERS = [
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "tests.auth.test_login_benchmark.ReducedPBKDF2PasswordHasher",
+    ]
+
+    def setUp(self):
+        self.user = baker.make(
+            User,
+            is_active=True,
+            openid="openid",
+            password=make_password("password"),
+        )
+
+    def report(self, name, baseline, optimized):
+        print(
+            f"\n{name}: {baseline:.0f} -> {optimized:.0f} logins/s "
+            f"({optimized / baseline:.2f}x)"
+        )
+
+    def test_token_issue(self):
+        def legacy():
+            refresh = RefreshToken.for_user(self.user)
+            return (
+                refresh.access_token.current_time
+                + refresh.access_token.lifetime,
+                str(refresh.access_token),
+                str(refresh),
+            )
+
+        def factory():
+            return token_factory.issue(RefreshToken.for_user(self.user))
+
+        self.report("token issue", throughput(legacy), throughput(factory))
+
+    def test_openid_login(self):
+        def login():
+            serializer = OpenIdLoginSerializer(data={"openid": "openid"})
+            serializer.is_valid(raise_exception=True)
+
+        print(f"\nopenid login: {throughput(login):.0f} logins/s")
+
+    def test_password_login(self):
+        data = {"username": self.user.username, "password": "password"}
+
+        def login():
+            serializer = PasswordLoginSerializer(data=data)
+            serializer.is_valid(raise_exception=True)
+
+        rounds = max(BENCHMARK_ROUNDS // 50, 5)
+        with override_settings(PASSWORD_HASHERS=self.PASSWORD_HASHERS):
+            self.user.set_password("password")
+            self.user.save()
+            baseline = throughput(login, rounds)
+
+            with override_settings(
+                ZQ_AUTH={"PASSWORD_HASHER": "pbkdf2_sha256_reduced"}
+            ):
+                login()  # 首次登录时升级哈希
+                optimized = throughput(login, rounds)
+
+        self.report("password login", baseline, optimized)
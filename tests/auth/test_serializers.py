@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 from django.contrib.auth.hashers import make_password
 from model_bakery import baker
 from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from tests.models import User
 from zq_django_util.exceptions import ApiException
@@ -30,6 +33,35 @@ class OpenIdLoginSerializerTestCase(APITestCase):
         self.assertIn("access", serializer.validated_data)
         self.assertIn("refresh", serializer.validated_data)
 
+    async def test_async_success(self):
+        serializer = self.serializer(data={"openid": self.openid})
+        self.assertTrue(await serializer.ais_valid())
+        self.assertEqual(serializer.validated_data["id"], self.user.pk)
+        self.assertIn("access", serializer.validated_data)
+
+    async def test_async_token_issued_in_thread(self):
+        def get_token(user):
+            User.objects.count()  # 模拟 token_blacklist 写入 OutstandingToken
+            return RefreshToken.for_user(user)
+
+        serializer = self.serializer(data={"openid": self.openid})
+        with patch.object(serializer, "get_token", side_effect=get_token):
+            self.assertTrue(await serializer.ais_valid())
+        self.assertEqual(serializer.validated_data["id"], self.user.pk)
+
+    async def test_async_field_error(self):
+        serializer = self.serializer(data={})
+        self.assertFalse(await serializer.ais_valid())
+        self.assertIn("openid", serializer.errors)
+
+    async def test_async_openid_not_bind(self):
+        serializer = self.serializer(data={"openid": "-1"})
+        with self.assertRaises(ApiException) as context:
+            await serializer.ais_valid()
+        self.assertEqual(
+            context.exception.response_type, ResponseType.ThirdLoginFailed
+        )
+
     def test_openid_not_bind(self):
         data = {"openid": "-1"}
         serializer = self.serializer(data=data)
@@ -51,6 +83,19 @@ class AbstractWechatLoginSerializerTestCase(APITestCase):
         with self.assertRaises(NotImplementedError):
             self.serializer(data={"code": "123"}).is_valid()
 
+    async def test_async_get_open_id(self):
+        class WechatLoginSerializer(AbstractWechatLoginSerializer):
+            async def aget_open_id(self, attrs):
+                return attrs["code"]
+
+        serializer = WechatLoginSerializer(data={"code": self.openid})
+        self.assertTrue(await serializer.ais_valid())
+        self.assertEqual(serializer.validated_data["id"], self.user.pk)
+
+    async def test_async_get_open_id_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            await self.serializer(data={"code": "123"}).ais_valid()
+
 
 class PasswordLoginSerializerTestCase(APITestCase):
     def setUp(self):
@@ -75,3 +120,10 @@ class PasswordLoginSerializerTestCase(APITestCase):
         )
         self.assertIn("access", serializer.validated_data)
         self.assertIn("refresh", serializer.validated_data)
+
+    async def test_async_success(self):
+        data = {"username": self.username, "password": self.password}
+        serializer = self.serializer(data=data)
+        self.assertTrue(await serializer.ais_valid())
+        self.assertEqual(serializer.validated_data["id"], self.user.pk)
+        self.assertIn("access", serializer.validated_data)
@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from model_bakery import baker
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from tests.models import User
+from zq_django_util.utils.auth.tokens import TokenFactory
+
+
+class TokenFactoryTestCase(APITestCase):
+    def setUp(self):
+        self.factory = TokenFactory()
+        self.user = baker.make(User)
+
+    def test_encode_same_as_simplejwt(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.assertEqual(self.factory.encode(refresh), str(refresh))
+
+    def test_issue(self):
+        refresh = RefreshToken.for_user(self.user)
+        access, refresh_token, expire_time = self.factory.issue(refresh)
+
+        self.assertEqual(refresh_token, str(refresh))
+        access_token = AccessToken(access)
+        self.assertEqual(access_token["user_id"], self.user.id)
+        self.assertNotEqual(access_token["jti"], refresh["jti"])
+        self.assertEqual(int(expire_time.timestamp()), access_token["exp"])
+
+    def test_issue_access_token_built_once(self):
+        refresh = RefreshToken.for_user(self.user)
+        with patch.object(
+            RefreshToken,
+            "access_token_class",
+            wraps=RefreshToken.access_token_class,
+        ) as mock_access_token_class:
+            self.factory.issue(refresh)
+        mock_access_token_class.assert_called_once()
+
+    def test_audience_issuer(self):
+        refresh = RefreshToken.for_user(self.user)
+        refresh._token_backend = TokenBackend(
+            "HS256", "secret", audience="aud", issuer="iss"
+        )
+        self.assertEqual(self.factory.encode(refresh), str(refresh))
+
+    def test_backend_without_json_encoder(self):
+        refresh = RefreshToken.for_user(self.user)
+        backend = TokenBackend("HS256", "secret")
+        del backend.json_encoder
+        refresh._token_backend = backend
+
+        token = self.factory.encode(refresh)
+        self.assertEqual(backend.decode(token)["user_id"], self.user.id)
+
+    def test_rsa_signing_key_preloaded(self):
+        private_key = rsa.generate_private_key(
+            public_exponent=65537, key_size=2048
+        )
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        public_pem = (
+            private_key.public_key()
+            .public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+            .decode()
+        )
+        backend = TokenBackend("RS256", pem, public_pem)
+        refresh = RefreshToken.for_user(self.user)
+        refresh._token_backend = backend
+
+        with patch(
+            "jwt.algorithms.load_pem_private_key",
+            wraps=serialization.load_pem_private_key,
+        ) as mock_load:
+            token = self.factory.encode(refresh)
+            self.assertEqual(self.factory.encode(refresh), token)
+        self.assertEqual(mock_load.call_count, 1)
+        self.assertEqual(
+            backend.decode(token)["user_id"],
+            self.user.id,
+        )
+
+    def test_signing_key_reloaded(self):
+        refresh = RefreshToken.for_user(self.user)
+        token = self.factory.encode(refresh)
+
+        refresh._token_backend = TokenBackend("HS256", "other")
+        self.assertNotEqual(self.factory.encode(refresh), token)
+        self.assertEqual(self.factory.encode(refresh), str(refresh))
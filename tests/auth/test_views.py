@@ -1,5 +1,6 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from django.contrib.auth.hashers import make_password
 from django.test import override_settings
 from model_bakery import baker
 from rest_framework.test import APITestCase
@@ -38,3 +39,61 @@ class OpenIdLoginSerializerTestCase(APITestCase):
         self.assertEqual(
             context.exception.response_type, ResponseType.ThirdLoginFailed
         )
+
+
+@override_settings(ROOT_URLCONF="tests.auth.urls")
+class AsyncLoginViewTestCase(APITestCase):
+    def setUp(self):
+        self.openid = "openid"
+        self.password = "bar"
+        self.user = baker.make(
+            User,
+            is_active=True,
+            openid=self.openid,
+            password=make_password(self.password),
+        )
+
+    async def test_openid_login(self):
+        response = await self.async_client.post(
+            "/async/login/openid/", {"openid": self.openid}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["id"], self.user.id)
+        self.assertIn("access", response.data)
+
+    async def test_password_login(self):
+        response = await self.async_client.post(
+            "/async/login/password/",
+            {"username": self.user.username, "password": self.password},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["id"], self.user.id)
+
+    async def test_openid_login_not_bound(self):
+        with self.assertRaises(ApiException) as context:
+            await self.async_client.post(
+                "/async/login/openid/", {"openid": "-1"}
+            )
+        self.assertEqual(
+            context.exception.response_type, ResponseType.ThirdLoginFailed
+        )
+
+    @patch("zq_django_util.utils.auth.views.OpenIdLoginView.get_serializer")
+    async def test_openid_login_token_error(
+        self, mock_get_serializer: MagicMock
+    ):
+        mock_get_serializer.return_value.ais_valid = AsyncMock(
+            side_effect=TokenError
+        )
+
+        with self.assertRaises(ApiException) as context:
+            await self.async_client.post(
+                "/async/login/openid/", {"openid": self.openid}
+            )
+        self.assertEqual(
+            context.exception.response_type, ResponseType.ThirdLoginFailed
+        )
+
+    async def test_method_not_allowed(self):
+        response = await self.async_client.get("/async/login/openid/")
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,281 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.test import override_settings
+from model_bakery import baker
+from rest_framework.test import APITestCase
+
+from tests.models import User
+from zq_django_util.exceptions import ApiException
+from zq_django_util.response import ResponseType
+from zq_django_util.utils.auth.serializers import WechatLoginSerializer
+from zq_django_util.utils.auth.wechat import WechatClient
+
+
+class MockWechatHandler(BaseHTTPRequestHandler):
+    server: "MockWechatServer"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.handle_api(url.path, params)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.handle_api(self.path, json.loads(self.rfile.read(length)))
+
+    def handle_api(self, path, params):
+        self.server.requests.append((path, params))
+        time.sleep(self.server.delay)
+        status, data = self.server.responses.pop(0)
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockWechatServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), MockWechatHandler)
+        self.requests = []
+        self.responses = []
+        self.delay = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class WechatClientTestCase(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = MockWechatServer()
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.server.requests.clear()
+        self.server.responses.clear()
+        self.server.delay = 0
+        self.settings_override = override_settings(
+            ZQ_AUTH={
+                "WECHAT_APP_ID": "appid",
+                "WECHAT_APP_SECRET": "secret",
+                "WECHAT_API_BASE": self.server.url,
+            }
+        )
+        self.settings_override.enable()
+        self.client = WechatClient()
+
+    def tearDown(self):
+        self.client.close()
+        self.settings_override.disable()
+
+    def test_code_to_session(self):
+        self.server.responses.append(
+            (200, {"openid": "openid", "session_key": "key"})
+        )
+
+        result = self.client.code_to_session("code")
+        self.assertEqual(result, {"openid": "openid", "session_key": "key"})
+        self.assertEqual(
+            self.server.requests,
+            [
+                (
+                    "/sns/jscode2session",
+                    {
+                        "appid": "appid",
+                        "secret": "secret",
+                        "js_code": "code",
+                        "grant_type": "authorization_code",
+                    },
+                )
+            ],
+        )
+
+    def test_code_dedupe(self):
+        self.server.responses.append((200, {"openid": "openid"}))
+
+        self.assertEqual(self.client.get_open_id("code"), "openid")
+        self.assertEqual(self.client.get_open_id("code"), "openid")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_code_concurrent(self):
+        self.server.responses.append((200, {"openid": "openid"}))
+        self.server.responses.append(
+            (200, {"errcode": 40163, "errmsg": "code been used"})
+        )
+        self.server.delay = 0.3
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(
+                executor.map(
+                    lambda _: self.client.get_open_id("code"), range(3)
+                )
+            )
+
+        self.assertEqual(results, ["openid"] * 3)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_code_concurrent_failed(self):
+        self.server.responses.append((502, {}))
+        self.server.responses.append((502, {}))
+        self.server.responses.append((502, {}))
+        self.server.responses.append((200, {"openid": "openid"}))
+        self.server.delay = 0.1
+
+        with override_settings(
+            ZQ_AUTH={
+                "WECHAT_APP_ID": "appid",
+                "WECHAT_APP_SECRET": "secret",
+                "WECHAT_API_BASE": self.server.url,
+                "WECHAT_RETRIES": 2,
+            }
+        ):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                first = executor.submit(self.client.get_open_id, "code")
+                time.sleep(0.05)
+                second = executor.submit(self.client.get_open_id, "code")
+
+                with self.assertRaises(ApiException):
+                    first.result()
+                self.assertEqual(second.result(), "openid")  # 锁释放后重新请求
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_code_invalid(self):
+        self.server.responses.append(
+            (200, {"errcode": 40163, "errmsg": "code been used"})
+        )
+
+        with self.assertRaises(ApiException) as context:
+            self.client.get_open_id("code")
+        self.assertEqual(
+            context.exception.response_type, ResponseType.ThirdLoginFailed
+        )
+
+    def test_service_error(self):
+        self.server.responses.append(
+            (200, {"errcode": -1, "errmsg": "system error"})
+        )
+
+        with self.assertRaises(ApiException) as context:
+            self.client.get_open_id("code")
+        self.assertEqual(
+            context.exception.response_type, ResponseType.ThirdServiceError
+        )
+
+    def test_retry(self):
+        self.server.responses.extend([(503, {}), (200, {"openid": "openid"})])
+
+        self.assertEqual(self.client.get_open_id("code"), "openid")
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_retry_exhausted(self):
+        self.server.responses.extend([(503, {})] * 3)
+
+        with self.assertRaises(ApiException) as context:
+            self.client.get_open_id("code")
+        self.assertEqual(
+            context.exception.response_type, ResponseType.ThirdServiceError
+        )
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_connection_error(self):
+        with override_settings(
+            ZQ_AUTH={
+                "WECHAT_API_BASE": "http://127.0.0.1:1",
+                "WECHAT_RETRIES": 0,
+            }
+        ):
+            with self.assertRaises(ApiException) as context:
+                self.client.get_open_id("code")
+        self.assertEqual(
+            context.exception.response_type, ResponseType.ThirdServiceError
+        )
+
+    def test_session_reused(self):
+        session = self.client.session
+        self.assertIs(self.client.session, session)
+
+        with override_settings(ZQ_AUTH={"WECHAT_POOL_SIZE": 1}):
+            self.assertIsNot(self.client.session, session)
+
+    def test_access_token_cached(self):
+        self.server.responses.append(
+            (200, {"access_token": "token", "expires_in": 7200})
+        )
+
+        self.assertEqual(self.client.get_access_token(), "token")
+        self.assertEqual(
+            WechatClient(app_id="appid").get_access_token(), "token"
+        )
+        self.assertEqual(
+            self.server.requests,
+            [
+                (
+                    "/cgi-bin/stable_token",
+                    {
+                        "grant_type": "client_credential",
+                        "appid": "appid",
+                        "secret": "secret",
+                        "force_refresh": False,
+                    },
+                )
+            ],
+        )
+
+    def test_access_token_force_refresh(self):
+        self.server.responses.extend(
+            [
+                (200, {"access_token": "token", "expires_in": 7200}),
+                (200, {"access_token": "new", "expires_in": 7200}),
+            ]
+        )
+
+        self.client.get_access_token()
+        self.assertEqual(
+            self.client.get_access_token(force_refresh=True), "new"
+        )
+        self.assertEqual(self.client.get_access_token(), "new")
+        self.assertTrue(self.server.requests[1][1]["force_refresh"])
+
+    def test_access_token_error(self):
+        self.server.responses.append(
+            (200, {"errcode": 40013, "errmsg": "invalid appid"})
+        )
+
+        with self.assertRaises(ApiException) as context:
+            self.client.get_access_token()
+        self.assertEqual(
+            context.exception.response_type, ResponseType.ThirdServiceError
+        )
+
+    def test_login_serializer(self):
+        user = baker.make(User, is_active=True, openid="openid")
+        self.server.responses.append((200, {"openid": "openid"}))
+
+        serializer = WechatLoginSerializer(data={"code": "code"})
+        serializer.client = self.client
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data["id"], user.id)
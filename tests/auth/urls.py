@@ -1,7 +1,12 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 
-from zq_django_util.utils.auth.views import OpenIdLoginView, PasswordLoginView
+from zq_django_util.utils.auth.views import (
+    AsyncOpenIdLoginView,
+    AsyncPasswordLoginView,
+    OpenIdLoginView,
+    PasswordLoginView,
+)
 
 urlpatterns = [
     path(
@@ -10,6 +15,16 @@ urlpatterns = [
     path(
         "login/password/", PasswordLoginView.as_view(), name="password_login"
     ),  # 密码登录
+    path(
+        "async/login/openid/",
+        AsyncOpenIdLoginView.as_view(),
+        name="async_openid_pair",
+    ),  # 异步openid登录
+    path(
+        "async/login/password/",
+        AsyncPasswordLoginView.as_view(),
+        name="async_password_login",
+    ),  # 异步密码登录
     path(
         "refresh/", TokenRefreshView.as_view(), name="token_refresh"
     ),  # 刷新token
@@ -1,11 +1,19 @@
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
+from django.core.handlers.asgi import ASGIRequest
 from django.test import override_settings
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.request import Empty, Request
 from rest_framework.test import APIRequestFactory, APITestCase
 
 from zq_django_util.logs.utils import (
     database_log_enabled,
     get_client_ip,
     get_headers,
+    get_request_data,
     is_api_logger_enabled,
+    is_request_skipped,
     mask_sensitive_data,
 )
 
@@ -153,3 +161,146 @@ class LogUtilTestCase(APITestCase):
         data = "password"
 
         self.assertEqual(data, mask_sensitive_data(data))
+
+    @override_settings(ROOT_URLCONF="tests.logs.urls", DRF_LOGGER={})
+    def test_is_request_skipped(self):
+        factory = APIRequestFactory()
+
+        self.assertTrue(is_request_skipped(Request(factory.get("/admin/"))))
+        self.assertTrue(is_request_skipped(Request(factory.get("/__debug__/"))))
+        self.assertFalse(is_request_skipped(Request(factory.get("/test/"))))
+
+    @override_settings(
+        ROOT_URLCONF="tests.logs.urls",
+        DRF_LOGGER={
+            "SKIP_NAMESPACE": ["namespace"],
+            "METHODS": ["POST"],
+        },
+    )
+    def test_is_request_skipped_by_setting(self):
+        factory = APIRequestFactory()
+
+        self.assertTrue(
+            is_request_skipped(Request(factory.post("/namespace/")))
+        )
+        self.assertTrue(is_request_skipped(Request(factory.get("/test/"))))
+        self.assertFalse(is_request_skipped(Request(factory.post("/test/"))))
+
+    def get_request(self, request) -> Request:
+        return Request(
+            request, parsers=[JSONParser(), FormParser(), MultiPartParser()]
+        )
+
+    def test_get_request_data_parsed(self):
+        request = self.get_request(
+            APIRequestFactory().post("/test/", {"a": "1"})
+        )
+        data = request.data
+
+        self.assertIs(get_request_data(request), data)
+
+    @override_settings(DRF_LOGGER={"REQUEST_DATA_MAX_SIZE": 4})
+    def test_get_request_data_parsed_too_large(self):
+        request = self.get_request(
+            APIRequestFactory().post("/test/", {"a": "1"}, format="json")
+        )
+        data = request.data
+
+        self.assertIs(get_request_data(request), data)
+
+    @override_settings(DRF_LOGGER={"REQUEST_DATA_MAX_SIZE": 1024})
+    def test_get_request_data_parsed_upload(self):
+        request = self.get_request(
+            APIRequestFactory().post(
+                "/test/",
+                {
+                    "a": "1",
+                    "file": SimpleUploadedFile(
+                        "file.bin",
+                        b"0" * 200 * 1024,
+                        "application/octet-stream",
+                    ),
+                },
+            )
+        )
+        request.data
+
+        data = get_request_data(request)
+
+        self.assertEqual(data["a"], "1")
+        self.assertIsInstance(data["file"], UploadedFile)
+        self.assertEqual(data["file"].size, 200 * 1024)
+
+    def test_get_request_data_chunked(self):
+        django_request = APIRequestFactory().post(
+            "/test/", {"a": "1"}, format="json"
+        )
+        del django_request.META["CONTENT_LENGTH"]
+        django_request.META["HTTP_TRANSFER_ENCODING"] = "chunked"
+        request = self.get_request(django_request)
+
+        self.assertDictEqual(
+            get_request_data(request),
+            {"__content__": "not parsed (size: unknown)"},
+        )
+        self.assertIs(request._full_data, Empty)
+
+    def get_asgi_request(self, body: bytes) -> ASGIRequest:
+        """
+        无 Content-Length 的 ASGI 请求(请求体为完整接收的可定位文件)
+        """
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/test/",
+            "headers": [(b"content-type", b"application/json")],
+        }
+        return ASGIRequest(scope, io.BytesIO(body))
+
+    @override_settings(DRF_LOGGER={"REQUEST_DATA_MAX_SIZE": 4})
+    def test_get_request_data_asgi_without_length(self):
+        request = self.get_request(self.get_asgi_request(b'{"a": "1"}'))
+
+        self.assertDictEqual(
+            get_request_data(request), {"__content__": "not parsed (size: 10)"}
+        )
+        self.assertIs(request._full_data, Empty)
+
+    def test_get_request_data_asgi_small(self):
+        request = self.get_request(self.get_asgi_request(b'{"a": "1"}'))
+
+        self.assertDictEqual(
+            get_request_data(request), {"__content__": "not parsed (size: 10)"}
+        )
+
+    def test_get_request_data_asgi_empty(self):
+        request = self.get_request(self.get_asgi_request(b""))
+
+        self.assertDictEqual(get_request_data(request), {})
+
+    def test_get_request_data_empty(self):
+        request = self.get_request(APIRequestFactory().get("/test/"))
+
+        self.assertDictEqual(get_request_data(request), {})
+        self.assertIs(request._full_data, Empty)
+
+    @override_settings(DRF_LOGGER={"REQUEST_DATA_MAX_SIZE": 1024})
+    def test_get_request_data_small(self):
+        request = self.get_request(
+            APIRequestFactory().post("/test/", {"a": "1"}, format="json")
+        )
+
+        self.assertDictEqual(get_request_data(request), {"a": "1"})
+
+    @override_settings(DRF_LOGGER={"REQUEST_DATA_MAX_SIZE": 4})
+    def test_get_request_data_too_large(self):
+        request = self.get_request(
+            APIRequestFactory().post("/test/", {"a": "1"}, format="json")
+        )
+        size = request.META["CONTENT_LENGTH"]
+
+        self.assertDictEqual(
+            get_request_data(request),
+            {"__content__": f"not parsed (size: {size})"},
+        )
+        self.assertIs(request._full_data, Empty)
@@ -1,12 +1,17 @@
 import datetime
+import hashlib
+import io
 import warnings
-from tempfile import TemporaryFile
 from typing import Type
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import oss2
 from django import VERSION
+from django.core.cache import cache
 from django.core.exceptions import SuspiciousOperation
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.http import FileResponse
 from django.test import override_settings
 from django.utils.timezone import now
 from rest_framework.test import APITestCase
@@ -17,8 +22,11 @@ from zq_django_util.utils.oss.backends import (
     OssStaticStorage,
     OssStorage,
 )
+from zq_django_util.utils.oss.clients import run_async
 from zq_django_util.utils.oss.exceptions import OssError
 
+PART_SIZE = oss2.defaults.min_part_size
+
 
 class OssStorageTestCase(APITestCase):
     access_key_id = "access_key_id"
@@ -58,11 +66,22 @@ class OssStorageTestCase(APITestCase):
             self.access_key_id, self.access_key_secret
         )
         self.mock_service.assert_called_once_with(
-            self.mock_auth.return_value, self.endpoint
+            self.mock_auth.return_value, self.endpoint, session=ANY
         )
         self.mock_bucket.assert_called_once_with(
-            self.mock_auth.return_value, self.endpoint, self.bucket_name
+            self.mock_auth.return_value,
+            self.endpoint,
+            self.bucket_name,
+            session=ANY,
+        )
+        self.mock_bucket.return_value.get_bucket_acl.assert_not_called()
+
+    def test_bucket_acl_lazy(self):
+        self.mock_bucket.return_value.get_bucket_acl.return_value.acl = (
+            oss2.BUCKET_ACL_PRIVATE
         )
+        self.assertEqual(self.storage.bucket_acl, oss2.BUCKET_ACL_PRIVATE)
+        self.assertEqual(self.storage.bucket_acl, oss2.BUCKET_ACL_PRIVATE)
         self.mock_bucket.return_value.get_bucket_acl.assert_called_once()
 
     def mock_exc(self, exc_type: Type) -> oss2.exceptions.OssError:
@@ -80,7 +99,7 @@ class OssStorageTestCase(APITestCase):
             self.mock_exc(oss2.exceptions.NoSuchBucket)
         )
         with self.assertRaises(SuspiciousOperation):
-            OssStorage()
+            self.storage.url("file")
 
     def test__normalize_endpoint_no_protocol(self):
         endpoint = "oss-cn-shanghai.aliyuncs.com"
@@ -114,47 +133,111 @@ class OssStorageTestCase(APITestCase):
             "base/dir/",
         )
 
-    def test__open(self):
-        file = TemporaryFile()
-        file.write(b"test")
-        file.seek(0)
-        file.content_length = 4
-        file.request_id = "request_id"
+    def mock_object(self, data: bytes) -> None:
+        self.mock_bucket.return_value.get_object_meta.return_value = MagicMock(
+            content_length=len(data), request_id="request_id"
+        )
 
-        self.mock_bucket.return_value.get_object.return_value = file
+        def get_object(key, byte_range=None):
+            start, end = byte_range
+            return io.BytesIO(data[start : end + 1])
+
+        self.mock_bucket.return_value.get_object.side_effect = get_object
+
+    def test__open(self):
+        self.mock_object(b"test")
         res = self.storage._open("file")
 
-        self.mock_bucket.return_value.get_object.assert_called_once_with(
+        self.mock_bucket.return_value.get_object_meta.assert_called_once_with(
             "base/file"
         )
+        self.mock_bucket.return_value.get_object.assert_not_called()
         self.assertEqual(res.read(), b"test")
         self.assertEqual(res.name, "base/file")
+        self.mock_bucket.return_value.get_object.assert_called_once_with(
+            "base/file", byte_range=(0, 3)
+        )
+
+    @override_settings(ALIYUN_OSS={"READ_BUFFER_SIZE": 4})
+    def test__open_read_all(self):
+        data = bytes(range(256)) * 40000
+        self.mock_object(data)
+        res = self.storage._open("file")
+
+        self.assertEqual(res.read(1), data[:1])
+        self.assertEqual(res.read(), data[1:])
+        self.assertEqual(res.read(-1), b"")
+        self.assertEqual(self.mock_bucket.return_value.get_object.call_count, 2)
+        self.mock_bucket.return_value.get_object.assert_called_with(
+            "base/file", byte_range=(4, len(data) - 1)
+        )
+
+    @override_settings(ALIYUN_OSS={"READ_BUFFER_SIZE": 4})
+    def test__open_read_ahead(self):
+        self.mock_object(b"0123456789")
+        res = self.storage._open("file")
 
-    def test__open_no_verify_copy(self):
-        file = TemporaryFile()
-        file.write(b"test")
-        file.seek(0)
-        file.content_length = None
-        file.request_id = "request_id"
+        self.assertEqual(res.read(1), b"0")
+        self.assertEqual(res.read(2), b"12")
+        self.assertEqual(res.read(1), b"3")
+        self.assertEqual(self.mock_bucket.return_value.get_object.call_count, 1)
+        self.assertEqual(res.read(), b"456789")
+        self.assertEqual(res.read(), b"")
 
-        self.mock_bucket.return_value.get_object.return_value = file
+    def test__open_seek(self):
+        self.mock_object(b"0123456789")
         res = self.storage._open("file")
 
-        self.assertEqual(res.read(), b"test")
+        self.assertEqual(res.size, 10)
+        res.seek(-3, io.SEEK_END)
+        self.assertEqual(res.read(), b"789")
+        res.seek(2)
+        self.assertEqual(res.read(3), b"234")
+        self.assertEqual(res.tell(), 5)
+        self.mock_bucket.return_value.get_object.assert_any_call(
+            "base/file", byte_range=(7, 9)
+        )
+
+    @override_settings(ALIYUN_OSS={"READ_BUFFER_SIZE": 4})
+    def test__open_chunks(self):
+        self.mock_object(b"0123456789")
+        res = self.storage._open("file")
+
+        self.assertEqual(list(res.chunks(4)), [b"0123", b"4567", b"89"])
+        self.assertEqual(self.mock_bucket.return_value.get_object.call_count, 3)
+
+    def test__open_file_response(self):
+        self.mock_object(b"0123456789")
+        response = FileResponse(self.storage._open("dir/file.txt"))
+
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+
+    def test__open_incomplete_read(self):
+        self.mock_object(b"test")
+        self.mock_bucket.return_value.get_object.side_effect = None
+        self.mock_bucket.return_value.get_object.return_value = io.BytesIO(
+            b"te"
+        )
+        res = self.storage._open("file")
+
+        with self.assertRaises(OssError):
+            res.read()
 
     def test__open_mode_invalid(self):
         with self.assertRaises(ValueError):
             self.storage._open("file", mode="invalid")
 
     def test__open_no_such_key(self):
-        self.mock_bucket.return_value.get_object.side_effect = self.mock_exc(
-            oss2.exceptions.NoSuchKey
+        self.mock_bucket.return_value.get_object_meta.side_effect = (
+            self.mock_exc(oss2.exceptions.NoSuchKey)
         )
         with self.assertRaises(OssError):
             self.storage._open("file")
 
     def test__open_error(self):
-        self.mock_bucket.return_value.get_object.side_effect = Exception()
+        self.mock_bucket.return_value.get_object_meta.side_effect = Exception()
         with self.assertRaises(OssError):
             self.storage._open("file")
 
@@ -167,6 +250,176 @@ class OssStorageTestCase(APITestCase):
         )
         self.assertEqual(res, "file")
 
+    @override_settings(ALIYUN_OSS={"MULTIPART_THRESHOLD": 8})
+    def test__save_below_threshold(self):
+        content = ContentFile(b"1234567")
+        self.storage._save("file", content)
+
+        self.mock_bucket.return_value.put_object.assert_called_once_with(
+            "base/file", content
+        )
+        self.mock_bucket.return_value.init_multipart_upload.assert_not_called()
+
+    @override_settings(
+        ALIYUN_OSS={
+            "MULTIPART_THRESHOLD": PART_SIZE,
+            "MULTIPART_PART_SIZE": PART_SIZE,
+            "MULTIPART_THREADS": 2,
+        }
+    )
+    def test__save_multipart(self):
+        bucket = self.mock_bucket.return_value
+        bucket.init_multipart_upload.return_value.upload_id = "upload_id"
+        bucket.upload_part.side_effect = lambda key, upload_id, n, data: (
+            MagicMock(etag="etag%d" % n, crc=n)
+        )
+        data = b"a" * PART_SIZE + b"b" * PART_SIZE + b"c" * 10
+        content = ContentFile(data)
+        content.read(3)
+
+        res = self.storage._save("file", content)
+
+        self.assertEqual(res, "file")
+        bucket.put_object.assert_not_called()
+        bucket.init_multipart_upload.assert_called_once_with("base/file")
+        self.assertEqual(
+            sorted(call.args for call in bucket.upload_part.call_args_list),
+            [
+                ("base/file", "upload_id", 1, b"a" * PART_SIZE),
+                ("base/file", "upload_id", 2, b"b" * PART_SIZE),
+                ("base/file", "upload_id", 3, b"c" * 10),
+            ],
+        )
+        key, upload_id, parts = bucket.complete_multipart_upload.call_args.args
+        self.assertEqual((key, upload_id), ("base/file", "upload_id"))
+        self.assertEqual(
+            [(p.part_number, p.etag, p.size) for p in parts],
+            [
+                (1, "etag1", PART_SIZE),
+                (2, "etag2", PART_SIZE),
+                (3, "etag3", 10),
+            ],
+        )
+
+    @override_settings(
+        ALIYUN_OSS={
+            "MULTIPART_THRESHOLD": PART_SIZE,
+            "MULTIPART_PART_SIZE": PART_SIZE,
+        }
+    )
+    def test__save_multipart_str(self):
+        bucket = self.mock_bucket.return_value
+        self.storage._save("file", "0" * (PART_SIZE * 2 + 1))
+
+        self.assertEqual(bucket.upload_part.call_count, 3)
+        bucket.complete_multipart_upload.assert_called_once()
+
+    @override_settings(
+        ALIYUN_OSS={
+            "MULTIPART_THRESHOLD": PART_SIZE,
+            "MULTIPART_PART_SIZE": PART_SIZE,
+            "MULTIPART_THREADS": 1,
+        }
+    )
+    def test__save_multipart_error(self):
+        bucket = self.mock_bucket.return_value
+        bucket.init_multipart_upload.return_value.upload_id = "upload_id"
+        bucket.upload_part.side_effect = [MagicMock(), Exception()]
+
+        with self.assertRaises(Exception):
+            self.storage._save("file", ContentFile(b"0" * PART_SIZE * 5))
+
+        self.assertEqual(bucket.upload_part.call_count, 2)
+        bucket.complete_multipart_upload.assert_not_called()
+        bucket.abort_multipart_upload.assert_called_once_with(
+            "base/file", "upload_id"
+        )
+
+    def test__save_content_addressed(self):
+        self.storage.content_addressed = True
+        self.mock_bucket.return_value.head_object.side_effect = self.mock_exc(
+            oss2.exceptions.NotFound
+        )
+        uploaded = []
+        self.mock_bucket.return_value.put_object.side_effect = (
+            lambda key, content: uploaded.append(content.read())
+        )
+        digest = hashlib.sha256(b"test").hexdigest()
+        content = ContentFile(b"test")
+
+        res = self.storage._save("avatar/file.PNG", content)
+
+        name = "sha256/%s/%s.png" % (digest[:2], digest[2:])
+        self.assertEqual(res, name)
+        self.mock_bucket.return_value.head_object.assert_called_once_with(
+            "base/" + name
+        )
+        self.mock_bucket.return_value.put_object.assert_called_once_with(
+            "base/" + name, content
+        )
+        self.assertEqual(uploaded, [b"test"])  # 计算哈希后回到开头上传
+
+    def test__save_content_addressed_exists(self):
+        self.storage.content_addressed = True
+        digest = hashlib.sha256(b"test").hexdigest()
+        name = "sha256/%s/%s" % (digest[:2], digest[2:])
+
+        self.assertTrue(self.storage.exists(name))
+        res = self.storage._save("file", b"test")
+        res2 = self.storage._save("other", "test")
+
+        self.assertEqual(res, name)
+        self.assertEqual(res2, name)
+        self.mock_bucket.return_value.head_object.assert_called_once()
+        self.mock_bucket.return_value.put_object.assert_not_called()
+
+    def test_save_content_addressed(self):
+        self.storage.content_addressed = True
+        self.mock_bucket.return_value.head_object.side_effect = self.mock_exc(
+            oss2.exceptions.NotFound
+        )
+        digest = hashlib.sha256(b"test").hexdigest()
+
+        res = self.storage.save("avatar/file.txt", ContentFile(b"test"))
+
+        self.assertEqual(res, "sha256/%s/%s.txt" % (digest[:2], digest[2:]))
+        # 只检查按内容命名的文件是否存在，不检查原文件名
+        self.mock_bucket.return_value.head_object.assert_called_once()
+
+    @override_settings(ALIYUN_OSS={"CONTENT_ADDRESSED": True})
+    def test_content_addressed_setting(self):
+        self.assertTrue(OssStorage().content_addressed)
+        self.assertFalse(OssStorage(content_addressed=False).content_addressed)
+
+    @patch("oss2.resumable_upload")
+    def test__save_resumable(self, mock_resumable_upload):
+        content = TemporaryUploadedFile("file", "text/plain", 10, None)
+        content.write(b"0123456789")
+
+        with override_settings(
+            ALIYUN_OSS={
+                "MULTIPART_THRESHOLD": 8,
+                "MULTIPART_PART_SIZE": 4,
+                "MULTIPART_THREADS": 3,
+                "MULTIPART_CHECKPOINT_DIR": "/tmp/checkpoint",
+            }
+        ):
+            self.storage._save("file", content)
+        content.close()
+
+        mock_resumable_upload.assert_called_once_with(
+            self.mock_bucket.return_value,
+            "base/file",
+            content.temporary_file_path(),
+            store=ANY,
+            multipart_threshold=8,
+            part_size=4,
+            num_threads=3,
+        )
+        store = mock_resumable_upload.call_args.kwargs["store"]
+        self.assertTrue(store.dir.startswith("/tmp/checkpoint"))
+        self.mock_bucket.return_value.put_object.assert_not_called()
+
     def test_create_dir(self):
         self.storage.create_dir("dir")
 
@@ -182,33 +435,107 @@ class OssStorageTestCase(APITestCase):
         )
 
     def test_exists(self):
-        self.mock_bucket.return_value.object_exists.return_value = True
         self.assertTrue(self.storage.exists("file"))
-        self.mock_bucket.return_value.object_exists.assert_called_once_with(
+        self.mock_bucket.return_value.head_object.assert_called_once_with(
             "base/file"
         )
 
-        self.mock_bucket.return_value.object_exists.return_value = False
-        self.assertFalse(self.storage.exists("file"))
-        self.mock_bucket.return_value.object_exists.assert_called_with(
-            "base/file"
+        self.mock_bucket.return_value.head_object.side_effect = self.mock_exc(
+            oss2.exceptions.NoSuchKey
         )
+        self.assertFalse(self.storage.exists("other"))
+        self.mock_bucket.return_value.head_object.assert_called_with(
+            "base/other"
+        )
+
+    def test_exists_no_such_bucket(self):
+        self.mock_bucket.return_value.head_object.side_effect = self.mock_exc(
+            oss2.exceptions.NoSuchBucket
+        )
+        with self.assertRaises(oss2.exceptions.NoSuchBucket):
+            self.storage.exists("file")
 
     def test_get_file_meta(self):
-        self.mock_bucket.return_value.get_object_meta.return_value = {
-            "Content-Length": 4,
-            "Content-Type": "text/plain",
-            "Last-Modified": "2020-01-01 00:00:00",
-        }
         res = self.storage.get_file_meta("file")
 
-        self.mock_bucket.return_value.get_object_meta.assert_called_once_with(
+        self.mock_bucket.return_value.head_object.assert_called_once_with(
             "base/file"
         )
         self.assertEqual(
-            res, self.mock_bucket.return_value.get_object_meta.return_value
+            res, self.mock_bucket.return_value.head_object.return_value
         )
 
+    def test_get_file_meta_cached(self):
+        head_object = self.mock_bucket.return_value.head_object
+        head_object.return_value.content_length = 4
+        head_object.return_value.content_type = "text/plain"
+        head_object.return_value.last_modified = now().timestamp()
+
+        self.assertTrue(self.storage.exists("file"))
+        self.assertEqual(self.storage.size("file"), 4)
+        self.assertEqual(self.storage.content_type("file"), "text/plain")
+        self.storage.modified_time("file")
+        self.storage.get_modified_time("file")
+        head_object.assert_called_once_with("base/file")
+
+    def test_get_file_meta_not_found_cached(self):
+        head_object = self.mock_bucket.return_value.head_object
+        head_object.side_effect = self.mock_exc(oss2.exceptions.NoSuchKey)
+
+        self.assertFalse(self.storage.exists("file"))
+        with self.assertRaises(oss2.exceptions.NotFound) as first:
+            self.storage.size("file")
+        with self.assertRaises(oss2.exceptions.NotFound) as second:
+            self.storage.size("file")
+        head_object.assert_called_once()
+        self.assertIsNot(first.exception, second.exception)
+        self.assertIsNot(first.exception, head_object.side_effect)
+
+    def test_get_file_meta_expired(self):
+        head_object = self.mock_bucket.return_value.head_object
+
+        with patch("time.monotonic", return_value=0):
+            self.storage.exists("file")
+        with patch("time.monotonic", return_value=4):
+            self.storage.exists("file")
+        self.assertEqual(head_object.call_count, 1)
+        with patch("time.monotonic", return_value=5):
+            self.storage.exists("file")
+        self.assertEqual(head_object.call_count, 2)
+
+    @override_settings(ALIYUN_OSS={"META_CACHE_TIMEOUT": 0})
+    def test_get_file_meta_no_cache(self):
+        storage = OssStorage()
+        storage.base_dir = "/base/"
+        storage.exists("file")
+        storage.size("file")
+        self.assertEqual(
+            self.mock_bucket.return_value.head_object.call_count, 2
+        )
+
+    def test_get_file_meta_invalidate(self):
+        head_object = self.mock_bucket.return_value.head_object
+        head_object.side_effect = self.mock_exc(oss2.exceptions.NoSuchKey)
+        self.assertFalse(self.storage.exists("file"))
+
+        self.storage._save("file", b"test")
+        head_object.side_effect = None
+        self.assertTrue(self.storage.exists("file"))
+        self.assertEqual(head_object.call_count, 2)
+
+        self.storage.delete("file")
+        self.storage.exists("file")
+        self.assertEqual(head_object.call_count, 3)
+
+        self.mock_batch_delete()
+        self.storage.delete_many(["file"])
+        self.storage.exists("file")
+        self.assertEqual(head_object.call_count, 4)
+
+        self.storage.clear_file_meta("file")
+        self.storage.exists("file")
+        self.assertEqual(head_object.call_count, 5)
+
     @patch("zq_django_util.utils.oss.backends.OssStorage.get_file_meta")
     def test_size(self, mock_meta: MagicMock):
         mock_meta.return_value.content_length = 4
@@ -325,19 +652,206 @@ class OssStorageTestCase(APITestCase):
             headers={},
         )
 
+    def test_iter_dir(self):
+        self.mock_list_objects(["base/dir/a", "base/dir/b", "base/dir/c"])
+
+        res = self.storage.iter_dir("dir", page_size=2)
+        list_objects = self.mock_bucket.return_value.list_objects
+        list_objects.assert_not_called()
+
+        first = next(res)
+        self.assertEqual(
+            first,
+            {
+                "key": "base/dir/a",
+                "is_dir": False,
+                "size": 4,
+                "last_modified": datetime.datetime(
+                    2020, 1, 1, tzinfo=datetime.timezone.utc
+                ),
+                "etag": "etag",
+            },
+        )
+        self.assertEqual(list_objects.call_count, 1)
+        self.assertEqual(
+            [obj["key"] for obj in res], ["base/dir/b", "base/dir/c"]
+        )
+        self.assertEqual(list_objects.call_count, 2)
+        self.assertEqual(list_objects.call_args.kwargs["prefix"], "base/dir/")
+        self.assertEqual(list_objects.call_args.kwargs["delimiter"], "/")
+        self.assertEqual(list_objects.call_args.kwargs["max_keys"], 2)
+        self.mock_bucket.return_value.head_object.assert_not_called()
+
+    def test_iter_dir_prefix(self):
+        self.mock_bucket.return_value.list_objects.return_value = MagicMock(
+            object_list=[],
+            prefix_list=["base/dd/"],
+            is_truncated=False,
+        )
+
+        res = list(self.storage.iter_dir("."))
+
+        self.assertEqual(
+            res,
+            [
+                {
+                    "key": "base/dd/",
+                    "is_dir": True,
+                    "size": 0,
+                    "last_modified": None,
+                    "etag": None,
+                }
+            ],
+        )
+        self.assertEqual(
+            self.mock_bucket.return_value.list_objects.call_args.kwargs[
+                "prefix"
+            ],
+            "base/",
+        )
+
+    def test_iter_dir_recursive(self):
+        self.mock_list_objects(["base/dir/a", "base/dir/b/c"])
+
+        res = list(self.storage.iter_dir("dir/", recursive=True))
+
+        self.assertEqual(
+            [obj["key"] for obj in res], ["base/dir/a", "base/dir/b/c"]
+        )
+        kwargs = self.mock_bucket.return_value.list_objects.call_args.kwargs
+        self.assertEqual(kwargs["delimiter"], "")
+        self.assertEqual(kwargs["max_keys"], 1000)
+
     def test_url_private(self):
         self.storage.bucket_acl = oss2.BUCKET_ACL_PRIVATE
         self.mock_bucket.return_value.sign_url.return_value = "url"
 
         self.assertEqual(self.storage.url("file"), "url")
+        self.mock_bucket.return_value.sign_url.assert_called_once_with(
+            "GET", "base/file", expires=60 * 60 * 24 * 30
+        )
 
     def test_url_public(self):
         self.storage.bucket_acl = oss2.BUCKET_ACL_PUBLIC_READ
-        self.mock_bucket.return_value.sign_url.return_value = (
-            "https:%2F%2Furl?token=token"
+        self.mock_bucket.return_value._make_url.return_value = (
+            "https://bucket.oss-cn-shanghai.aliyuncs.com/base%2Ffile"
+        )
+
+        self.assertEqual(
+            self.storage.url("file"),
+            "https://bucket.oss-cn-shanghai.aliyuncs.com/base/file",
+        )
+        self.mock_bucket.return_value._make_url.assert_called_once_with(
+            self.bucket_name, "base/file"
+        )
+        self.mock_bucket.return_value.sign_url.assert_not_called()
+
+    def test_image_url_private(self):
+        self.storage.bucket_acl = oss2.BUCKET_ACL_PRIVATE
+        self.mock_bucket.return_value.sign_url.return_value = "url"
+
+        self.assertEqual(
+            self.storage.image_url("file", "image/resize,w_64"), "url"
+        )
+        self.mock_bucket.return_value.sign_url.assert_called_once_with(
+            "GET",
+            "base/file",
+            expires=60 * 60 * 24 * 30,
+            params={"x-oss-process": "image/resize,w_64"},
+        )
+
+    def test_image_url_public(self):
+        self.storage.bucket_acl = oss2.BUCKET_ACL_PUBLIC_READ
+        self.mock_bucket.return_value._make_url.return_value = (
+            "https://bucket.oss-cn-shanghai.aliyuncs.com/base%2Ffile"
+        )
+
+        self.assertEqual(
+            self.storage.image_url("file", "image/resize,w_64"),
+            "https://bucket.oss-cn-shanghai.aliyuncs.com/base/file"
+            "?x-oss-process=image/resize,w_64",
+        )
+        self.mock_bucket.return_value.sign_url.assert_not_called()
+
+    def test_image_url_cached(self):
+        self.storage.bucket_acl = oss2.BUCKET_ACL_PRIVATE
+        self.mock_bucket.return_value.sign_url.side_effect = [
+            "url",
+            "url_64",
+            "url_128",
+        ]
+
+        self.assertEqual(self.storage.url("file"), "url")
+        self.assertEqual(
+            self.storage.image_url("file", "image/resize,w_64"), "url_64"
+        )
+        self.assertEqual(
+            self.storage.image_url("file", "image/resize,w_64"), "url_64"
+        )
+        self.assertEqual(
+            self.storage.image_url("file", "image/resize,w_128"), "url_128"
+        )
+        self.assertEqual(self.storage.url("file"), "url")
+        self.assertEqual(self.mock_bucket.return_value.sign_url.call_count, 3)
+
+    def test_image_url_preset(self):
+        self.storage.bucket_acl = oss2.BUCKET_ACL_PRIVATE
+        self.mock_bucket.return_value.sign_url.return_value = "url"
+
+        with override_settings(
+            ALIYUN_OSS={
+                "IMAGE_PRESETS": {
+                    "avatar": {"width": 64, "height": 64, "format": "webp"},
+                }
+            }
+        ):
+            self.storage.image_url("file", "avatar")
+        self.assertEqual(
+            self.mock_bucket.return_value.sign_url.call_args.kwargs["params"],
+            {"x-oss-process": "image/resize,m_lfit,w_64,h_64/format,webp"},
         )
 
-        self.assertEqual(self.storage.url("file"), "https://url")
+    def test_url_cached(self):
+        self.storage.bucket_acl = oss2.BUCKET_ACL_PRIVATE
+        self.mock_bucket.return_value.sign_url.side_effect = ["url", "url2"]
+
+        self.assertEqual(self.storage.url("file"), "url")
+        self.assertEqual(self.storage.url("file"), "url")
+        self.assertEqual(self.storage.url("other"), "url2")
+        self.assertEqual(self.mock_bucket.return_value.sign_url.call_count, 2)
+
+    @patch("zq_django_util.utils.cache.time.monotonic")
+    def test_url_cache_expire(self, mock_monotonic: MagicMock):
+        mock_monotonic.return_value = 0
+        self.storage.bucket_acl = oss2.BUCKET_ACL_PRIVATE
+        self.storage.expire_time = 60 * 60 * 25
+        self.mock_bucket.return_value.sign_url.side_effect = ["url", "url2"]
+
+        self.assertEqual(self.storage.url("file"), "url")
+        mock_monotonic.return_value = 60 * 60 - 10
+        self.assertEqual(self.storage.url("file"), "url")
+        mock_monotonic.return_value = 60 * 60  # 过期前 1 天不再使用
+        self.assertEqual(self.storage.url("file"), "url2")
+
+    def test_url_no_cache_short_expire(self):
+        self.storage.bucket_acl = oss2.BUCKET_ACL_PRIVATE
+        self.storage.expire_time = 60
+        self.mock_bucket.return_value.sign_url.return_value = "url"
+
+        self.storage.url("file")
+        self.storage.url("file")
+        self.assertEqual(self.mock_bucket.return_value.sign_url.call_count, 2)
+
+    def test_url_shared_cache(self):
+        cache.clear()
+        self.storage.bucket_acl = oss2.BUCKET_ACL_PRIVATE
+        self.mock_bucket.return_value.sign_url.return_value = "url"
+
+        with override_settings(ALIYUN_OSS={"URL_CACHE_ALIAS": "default"}):
+            self.assertEqual(self.storage.url("file"), "url")
+            self.storage.client.url_cache.clear()
+            self.assertEqual(self.storage.url("file"), "url")
+        self.mock_bucket.return_value.sign_url.assert_called_once()
 
     def test_delete(self):
         self.storage.delete("file")
@@ -345,16 +859,448 @@ class OssStorageTestCase(APITestCase):
             "base/file"
         )
 
+    def mock_batch_delete(self, failed=()):
+        self.mock_bucket.return_value.batch_delete_objects.side_effect = (
+            lambda keys: MagicMock(
+                deleted_keys=[key for key in keys if key not in failed]
+            )
+        )
+
+    def mock_list_objects(self, keys, page_size=2):
+        pages = [
+            keys[i : i + page_size] for i in range(0, len(keys), page_size)
+        ] or [[]]
+
+        def list_objects(prefix="", delimiter="", marker="", **kwargs):
+            index = int(marker or 0)
+            return MagicMock(
+                object_list=[
+                    oss2.models.SimplifiedObjectInfo(
+                        key, 1577836800, "etag", "Normal", 4, "Standard"
+                    )
+                    for key in pages[index]
+                ],
+                prefix_list=[],
+                is_truncated=index + 1 < len(pages),
+                next_marker=str(index + 1),
+            )
+
+        self.mock_bucket.return_value.list_objects.side_effect = list_objects
+
+    def test_delete_many(self):
+        self.mock_batch_delete()
+        progress = MagicMock()
+
+        res = self.storage.delete_many(
+            ["file%d" % i for i in range(2500)] + ["file0"],
+            progress_callback=progress,
+        )
+
+        batch_delete = self.mock_bucket.return_value.batch_delete_objects
+        self.assertEqual(
+            sorted(len(call.args[0]) for call in batch_delete.call_args_list),
+            [500, 1000, 1000],
+        )
+        self.assertEqual(res["deleted"], 2500)
+        self.assertEqual(res["failed"], [])
+        self.assertEqual(progress.call_count, 3)
+        progress.assert_called_with(2500, 0)
+
+    def test_delete_many_failed(self):
+        self.mock_batch_delete(failed=("base/file1",))
+
+        res = self.storage.delete_many(["file0", "file1"])
+
+        self.assertEqual(res, {"deleted": 1, "failed": ["base/file1"]})
+
+    def test_delete_many_error(self):
+        self.mock_bucket.return_value.batch_delete_objects.side_effect = (
+            Exception()
+        )
+
+        res = self.storage.delete_many(["file0", "file1"])
+
+        self.assertEqual(
+            res, {"deleted": 0, "failed": ["base/file0", "base/file1"]}
+        )
+
+    def test_delete_many_empty(self):
+        res = self.storage.delete_many([])
+
+        self.assertEqual(res, {"deleted": 0, "failed": []})
+        self.mock_bucket.return_value.batch_delete_objects.assert_not_called()
+
     def test_delete_dir_without_slash(self):
-        self.storage.delete_dir("dir")
-        self.mock_bucket.return_value.delete_object.assert_called_once_with(
-            "base/dir/"
+        self.mock_list_objects(["base/dir/", "base/dir/a", "base/dir/b/c"])
+        self.mock_batch_delete()
+
+        res = self.storage.delete_dir("dir")
+
+        list_kwargs = self.mock_bucket.return_value.list_objects.call_args
+        self.assertEqual(list_kwargs.kwargs["prefix"], "base/dir/")
+        self.assertEqual(list_kwargs.kwargs["delimiter"], "")
+        self.assertEqual(list_kwargs.kwargs["max_keys"], 1000)
+        self.assertEqual(res, {"deleted": 3, "failed": []})
+        self.mock_bucket.return_value.batch_delete_objects.assert_called_once_with(
+            ["base/dir/", "base/dir/a", "base/dir/b/c"]
         )
+        self.mock_bucket.return_value.delete_object.assert_not_called()
 
     def test_delete_dir_with_slash(self):
-        self.storage.delete_dir("dir/")
+        self.mock_list_objects(["base/dir/"])
+        self.mock_batch_delete()
+
+        res = self.storage.delete_dir("dir/")
+
+        self.mock_bucket.return_value.batch_delete_objects.assert_called_once_with(
+            ["base/dir/"]
+        )
+        self.assertEqual(res["deleted"], 1)
+
+    @override_settings(ALIYUN_OSS={"DELETE_THREADS": 2})
+    def test_delete_dir_batches(self):
+        keys = ["base/dir/%04d" % i for i in range(2345)]
+        self.mock_list_objects(keys, page_size=1000)
+        self.mock_batch_delete(failed=("base/dir/0001",))
+        progress = MagicMock()
+
+        res = self.storage.delete_dir("dir", progress_callback=progress)
+
+        self.assertEqual(
+            self.mock_bucket.return_value.batch_delete_objects.call_count, 3
+        )
+        self.assertEqual(res["deleted"], 2344)
+        self.assertEqual(res["failed"], ["base/dir/0001"])
+        progress.assert_called_with(2344, 1)
+
+    def test_delete_dir_empty(self):
+        self.mock_list_objects([])
+
+        res = self.storage.delete_dir("dir")
+
+        self.assertEqual(res, {"deleted": 0, "failed": []})
+        self.mock_bucket.return_value.batch_delete_objects.assert_not_called()
+
+    def test_copy(self):
+        self.mock_bucket.return_value.head_object.return_value = MagicMock(
+            content_length=4
+        )
+
+        res = self.storage.copy("a/file", "b/file")
+
+        self.assertEqual(res, "b/file")
+        self.mock_bucket.return_value.copy_object.assert_called_once_with(
+            self.bucket_name, "base/a/file", "base/b/file"
+        )
+        self.mock_bucket.return_value.get_object.assert_not_called()
+        self.mock_bucket.return_value.put_object.assert_not_called()
+
+    def test_copy_not_found(self):
+        self.mock_bucket.return_value.head_object.side_effect = self.mock_exc(
+            oss2.exceptions.NotFound
+        )
+
+        with self.assertRaises(oss2.exceptions.NotFound):
+            self.storage.copy("a/file", "b/file")
+        self.mock_bucket.return_value.copy_object.assert_not_called()
+
+    @override_settings(
+        ALIYUN_OSS={
+            "COPY_THRESHOLD": PART_SIZE,
+            "MULTIPART_PART_SIZE": PART_SIZE,
+        }
+    )
+    def test_copy_multipart(self):
+        size = PART_SIZE * 2 + 1
+        bucket = self.mock_bucket.return_value
+        bucket.head_object.return_value = MagicMock(
+            content_length=size,
+            headers={
+                "Content-Type": "image/png",
+                "Cache-Control": "max-age=60",
+                "Content-Length": str(size),
+                "ETag": '"etag"',
+                "x-oss-meta-owner": "user",
+                "x-oss-request-id": "request_id",
+            },
+        )
+        bucket.init_multipart_upload.return_value.upload_id = "upload"
+        bucket.upload_part_copy.side_effect = lambda *args: MagicMock(
+            etag="etag%d" % args[-1]
+        )
+
+        self.storage.copy("a/file", "b/file")
+
+        bucket.copy_object.assert_not_called()
+        bucket.head_object.assert_called_once_with("base/a/file")
+        bucket.init_multipart_upload.assert_called_once_with(
+            "base/b/file",
+            headers={
+                "Content-Type": "image/png",
+                "Cache-Control": "max-age=60",
+                "x-oss-meta-owner": "user",
+            },
+        )
+        self.assertEqual(
+            sorted(call.args[2] for call in bucket.upload_part_copy.mock_calls),
+            [
+                (0, PART_SIZE - 1),
+                (PART_SIZE, PART_SIZE * 2 - 1),
+                (PART_SIZE * 2, PART_SIZE * 2),
+            ],
+        )
+        key, upload_id, parts = bucket.complete_multipart_upload.call_args.args
+        self.assertEqual((key, upload_id), ("base/b/file", "upload"))
+        self.assertEqual(
+            [(part.part_number, part.etag) for part in parts],
+            [(1, "etag1"), (2, "etag2"), (3, "etag3")],
+        )
+        bucket.abort_multipart_upload.assert_not_called()
+
+    @override_settings(ALIYUN_OSS={"COPY_THRESHOLD": PART_SIZE})
+    def test_copy_multipart_failed(self):
+        bucket = self.mock_bucket.return_value
+        bucket.head_object.return_value = MagicMock(content_length=PART_SIZE)
+        bucket.init_multipart_upload.return_value.upload_id = "upload"
+        bucket.upload_part_copy.side_effect = Exception()
+
+        with self.assertRaises(Exception):
+            self.storage.copy("a/file", "b/file")
+        bucket.complete_multipart_upload.assert_not_called()
+        bucket.abort_multipart_upload.assert_called_once_with(
+            "base/b/file", "upload"
+        )
+
+    def test_move(self):
+        self.mock_bucket.return_value.head_object.return_value = MagicMock(
+            content_length=4
+        )
+
+        res = self.storage.move("a/file", "b/file")
+
+        self.assertEqual(res, "b/file")
+        self.mock_bucket.return_value.copy_object.assert_called_once_with(
+            self.bucket_name, "base/a/file", "base/b/file"
+        )
+        self.mock_bucket.return_value.delete_object.assert_called_once_with(
+            "base/a/file"
+        )
+
+    def test_move_same_key(self):
+        self.mock_bucket.return_value.head_object.return_value = MagicMock(
+            content_length=4
+        )
+
+        self.assertEqual(self.storage.move("a/file", "a/file"), "a/file")
+        self.assertEqual(self.storage.move("a/file", "a/./file"), "a/file")
+
+        self.mock_bucket.return_value.copy_object.assert_not_called()
+        self.mock_bucket.return_value.delete_object.assert_not_called()
+
+    def test_move_same_key_not_found(self):
+        self.mock_bucket.return_value.head_object.side_effect = self.mock_exc(
+            oss2.exceptions.NotFound
+        )
+
+        with self.assertRaises(oss2.exceptions.NotFound):
+            self.storage.move("a/file", "a/file")
+
+    @override_settings(
+        ALIYUN_OSS={
+            "COPY_THRESHOLD": PART_SIZE,
+            "MULTIPART_PART_SIZE": PART_SIZE,
+        }
+    )
+    def test_copy_dir_multipart_headers(self):
+        bucket = self.mock_bucket.return_value
+        bucket.list_objects.return_value = MagicMock(
+            object_list=[
+                oss2.models.SimplifiedObjectInfo(
+                    "base/a/x",
+                    1577836800,
+                    "etag",
+                    "Normal",
+                    PART_SIZE,
+                    "Standard",
+                )
+            ],
+            prefix_list=[],
+            is_truncated=False,
+        )
+        bucket.head_object.return_value = MagicMock(
+            headers={"Content-Type": "text/csv"}
+        )
+
+        res = self.storage.copy_dir("a", "b")
+
+        self.assertEqual(res, {"copied": 1, "failed": []})
+        bucket.head_object.assert_called_once_with("base/a/x")
+        bucket.init_multipart_upload.assert_called_once_with(
+            "base/b/x", headers={"Content-Type": "text/csv"}
+        )
+
+    def test_move_copy_failed(self):
+        self.mock_bucket.return_value.head_object.return_value = MagicMock(
+            content_length=4
+        )
+        self.mock_bucket.return_value.copy_object.side_effect = Exception()
+
+        with self.assertRaises(Exception):
+            self.storage.move("a/file", "b/file")
+        self.mock_bucket.return_value.delete_object.assert_not_called()
+
+    def test_copy_dir(self):
+        self.mock_list_objects(["base/a/", "base/a/x", "base/a/y/z"])
+        progress = MagicMock()
+
+        res = self.storage.copy_dir("a", "b/", progress_callback=progress)
+
+        self.assertEqual(res, {"copied": 3, "failed": []})
+        self.assertEqual(
+            sorted(
+                call.args
+                for call in self.mock_bucket.return_value.copy_object.mock_calls
+            ),
+            [
+                (self.bucket_name, "base/a/", "base/b/"),
+                (self.bucket_name, "base/a/x", "base/b/x"),
+                (self.bucket_name, "base/a/y/z", "base/b/y/z"),
+            ],
+        )
+        self.mock_bucket.return_value.head_object.assert_not_called()
+        self.assertEqual(progress.call_count, 3)
+        progress.assert_called_with(3, 0)
+
+    def test_copy_dir_into_itself(self):
+        with self.assertRaises(ValueError):
+            self.storage.copy_dir("a", "a/b")
+        self.mock_bucket.return_value.list_objects.assert_not_called()
+
+    @override_settings(ALIYUN_OSS={"COPY_THREADS": 2})
+    def test_move_dir(self):
+        keys = ["base/a/%03d" % i for i in range(10)]
+        self.mock_list_objects(keys, page_size=3)
+        self.mock_batch_delete(failed=("base/a/001",))
+        self.mock_bucket.return_value.copy_object.side_effect = (
+            lambda bucket, src, dst: (
+                (_ for _ in ()).throw(Exception())
+                if src == "base/a/000"
+                else MagicMock()
+            )
+        )
+
+        res = self.storage.move_dir("a", "b")
+
+        self.assertEqual(
+            self.mock_bucket.return_value.copy_object.call_count, 10
+        )
+        self.mock_bucket.return_value.batch_delete_objects.assert_called_once()
+        self.assertNotIn(
+            "base/a/000",
+            self.mock_bucket.return_value.batch_delete_objects.call_args.args[
+                0
+            ],
+        )
+        self.assertEqual(
+            sorted(
+                self.mock_bucket.return_value.batch_delete_objects.call_args.args[
+                    0
+                ]
+            ),
+            keys[1:],
+        )
+        self.assertEqual(res["copied"], 8)
+        self.assertEqual(sorted(res["failed"]), keys[:2])
+
+    @override_settings(ALIYUN_OSS={"COPY_THREADS": 4})
+    def test_move_dir_batches(self):
+        keys = ["base/a/%04d" % i for i in range(2345)]
+        self.mock_list_objects(keys, page_size=1000)
+        self.mock_batch_delete()
+
+        res = self.storage.move_dir("a", "b")
+
+        batch_delete = self.mock_bucket.return_value.batch_delete_objects
+        self.assertEqual(
+            [len(call.args[0]) for call in batch_delete.call_args_list],
+            [1000, 1000, 345],
+        )
+        self.assertEqual(res, {"copied": 2345, "failed": []})
+
+    async def test_asave(self):
+        self.mock_bucket.return_value.head_object.side_effect = self.mock_exc(
+            oss2.exceptions.NotFound
+        )
+        res = await self.storage.asave("file.txt", ContentFile(b"test"))
+
+        self.assertEqual(res, "file.txt")
+        self.mock_bucket.return_value.put_object.assert_called_once_with(
+            "base/file.txt", ANY
+        )
+
+    async def test_aopen(self):
+        self.mock_object(b"test")
+        res = await self.storage.aopen("file")
+
+        self.assertEqual(res.name, "base/file")
+        self.assertEqual(res.size, 4)
+
+    async def test_aexists(self):
+        with patch(
+            "zq_django_util.utils.oss.backends.run_async", wraps=run_async
+        ) as mock_run_async:
+            self.assertTrue(await self.storage.aexists("file"))
+            self.assertTrue(await self.storage.aexists("file"))
+        mock_run_async.assert_called_once()
+        self.mock_bucket.return_value.head_object.assert_called_once_with(
+            "base/file"
+        )
+
+    async def test_aexists_not_found(self):
+        self.mock_bucket.return_value.head_object.side_effect = self.mock_exc(
+            oss2.exceptions.NotFound
+        )
+        with patch(
+            "zq_django_util.utils.oss.backends.run_async", wraps=run_async
+        ) as mock_run_async:
+            self.assertFalse(await self.storage.aexists("file"))
+            self.assertFalse(await self.storage.aexists("file"))
+        mock_run_async.assert_called_once()
+
+    async def test_aexists_cached(self):
+        self.storage.client.meta_cache.set("base/file", object())
+
+        # 命中缓存时直接由缓存值判断，不再调用可能发起 HEAD 请求的 exists
+        with patch.object(self.storage, "exists") as mock_exists:
+            self.assertTrue(await self.storage.aexists("file"))
+        mock_exists.assert_not_called()
+
+    async def test_adelete(self):
+        await self.storage.adelete("file")
         self.mock_bucket.return_value.delete_object.assert_called_once_with(
-            "base/dir/"
+            "base/file"
+        )
+
+    async def test_aurl(self):
+        self.mock_bucket.return_value.get_bucket_acl.return_value.acl = (
+            oss2.BUCKET_ACL_PRIVATE
+        )
+        self.mock_bucket.return_value.sign_url.return_value = "url"
+
+        with patch(
+            "zq_django_util.utils.oss.backends.run_async", wraps=run_async
+        ) as mock_run_async:
+            self.assertEqual(await self.storage.aurl("file"), "url")
+            self.assertEqual(await self.storage.aurl("file"), "url")
+        mock_run_async.assert_called_once()  # acl 获取后直接计算
+        self.mock_bucket.return_value.sign_url.assert_called_once()
+
+    async def test_aimage_url(self):
+        self.storage.bucket_acl = oss2.BUCKET_ACL_PRIVATE
+        self.mock_bucket.return_value.sign_url.return_value = "url"
+
+        self.assertEqual(
+            await self.storage.aimage_url("file", "image/resize,w_64"), "url"
         )
 
     def test_get_object_acl(self):
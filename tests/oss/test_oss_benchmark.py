@@ -0,0 +1,113 @@
+import os
+import tempfile
+import time
+import unittest
+
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from zq_django_util.utils.oss.local import LocalOssStorage
+
+BENCHMARK_ROUNDS = int(os.environ.get("ZQ_BENCHMARK_ROUNDS", 200))
+BENCHMARK_LATENCY = float(os.environ.get("ZQ_BENCHMARK_OSS_LATENCY", 0.005))
+
+
+def throughput(func, rounds=BENCHMARK_ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return rounds / (time.perf_counter() - start)
+
+
+@unittest.skipUnless(
+    os.environ.get("ZQ_BENCHMARK"),
+    "设置环境变量 ZQ_BENCHMARK=1 以运行 OSS 存储性能测试",
+)
+class OssStorageBenchmarkTestCase(APITestCase):
+    """
+    OSS 存储性能测试，使用本地文件系统模拟 bucket 与网络延迟
+
+    ZQ_BENCHMARK=1 pytest -s tests/oss/test_oss_benchmark.py
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = LocalOssStorage(
+            self.tmp_dir.name, latency=BENCHMARK_LATENCY
+        )
+        self.storage.save("file.txt", ContentFile(b"0" * 1024))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def report(self, name, baseline, optimized, unit="ops/s"):
+        print(
+            f"\n{name}: {baseline:.0f} -> {optimized:.0f} {unit} "
+            f"({optimized / baseline:.2f}x)"
+        )
+
+    def test_file_meta(self):
+        def meta():
+            self.storage.exists("file.txt")
+            self.storage.size("file.txt")
+            self.storage.get_modified_time("file.txt")
+
+        rounds = max(BENCHMARK_ROUNDS // 10, 5)
+        with override_settings(ALIYUN_OSS={"META_CACHE_SIZE": 0}):
+            self.storage = LocalOssStorage(
+                self.tmp_dir.name, latency=BENCHMARK_LATENCY
+            )
+            baseline = throughput(meta, rounds)
+        self.storage = LocalOssStorage(
+            self.tmp_dir.name, latency=BENCHMARK_LATENCY
+        )
+        self.report("file meta", baseline, throughput(meta))
+
+    def test_url(self):
+        rounds = max(BENCHMARK_ROUNDS // 10, 5)
+        with override_settings(ALIYUN_OSS={"URL_CACHE_SIZE": 0}):
+            self.storage = LocalOssStorage(
+                self.tmp_dir.name, latency=BENCHMARK_LATENCY
+            )
+            baseline = throughput(lambda: self.storage.url("file.txt"), rounds)
+        self.storage = LocalOssStorage(
+            self.tmp_dir.name, latency=BENCHMARK_LATENCY
+        )
+        self.report(
+            "signed url",
+            baseline,
+            throughput(lambda: self.storage.url("file.txt")),
+        )
+
+    def test_delete_dir(self):
+        count = BENCHMARK_ROUNDS
+        for i in range(count):
+            self.storage.bucket.put_object("dir/%d" % i, b"")
+
+        start = time.perf_counter()
+        for i in range(count):
+            self.storage.delete("dir/%d" % i)
+        baseline = count / (time.perf_counter() - start)
+
+        for i in range(count):
+            self.storage.bucket.put_object("dir/%d" % i, b"")
+        start = time.perf_counter()
+        self.storage.delete_dir("dir")
+        optimized = count / (time.perf_counter() - start)
+
+        self.report("delete dir", baseline, optimized, "files/s")
+
+    def test_content_addressed_save(self):
+        content = b"0" * 64 * 1024
+        rounds = max(BENCHMARK_ROUNDS // 10, 5)
+
+        baseline = throughput(
+            lambda: self.storage.save("file.txt", ContentFile(content)), rounds
+        )
+        self.storage.content_addressed = True
+        optimized = throughput(
+            lambda: self.storage.save("file.txt", ContentFile(content)), rounds
+        )
+
+        self.report("repeated save", baseline, optimized)
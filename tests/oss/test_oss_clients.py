@@ -0,0 +1,135 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import oss2
+from django.core.exceptions import SuspiciousOperation
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from zq_django_util.utils.oss import clients
+from zq_django_util.utils.oss.backends import OssStorage
+from zq_django_util.utils.oss.clients import (
+    clear_clients,
+    get_client,
+    get_executor,
+    get_session,
+    run_async,
+)
+
+
+@override_settings(
+    ALIYUN_OSS={
+        "ACCESS_KEY_ID": "access_key_id",
+        "ACCESS_KEY_SECRET": "access_key_secret",
+        "ENDPOINT": "https://oss-cn-shanghai.aliyuncs.com",
+        "BUCKET_NAME": "bucket",
+        "CONNECTION_POOL_SIZE": 20,
+    }
+)
+class OssClientTestCase(APITestCase):
+    def setUp(self) -> None:
+        clear_clients()
+        self.patcher_bucket = patch("oss2.Bucket")
+        self.mock_bucket = self.patcher_bucket.start()
+
+    def tearDown(self) -> None:
+        self.patcher_bucket.stop()
+        clear_clients()
+
+    def test_storage_share_client(self):
+        storage = OssStorage()
+        other = OssStorage()
+
+        self.assertIs(storage.client, other.client)
+        self.assertIs(storage.bucket, other.bucket)
+        self.mock_bucket.assert_called_once()
+
+    def test_different_bucket(self):
+        storage = OssStorage()
+        other = OssStorage(bucket_name="other")
+
+        self.assertIsNot(storage.client, other.client)
+        self.assertEqual(self.mock_bucket.call_count, 2)
+
+    def test_session_shared(self):
+        client = get_client("id", "secret", "http://endpoint", "bucket")
+        other = get_client("id", "secret", "http://endpoint", "other")
+
+        session = get_session()
+        self.assertEqual(session.session.adapters["http://"]._pool_maxsize, 20)
+        self.assertIs(self.mock_bucket.call_args_list[0][1]["session"], session)
+        self.assertIs(self.mock_bucket.call_args_list[1][1]["session"], session)
+        self.assertIsNot(client, other)
+
+    def test_bucket_acl_cached(self):
+        self.mock_bucket.return_value.get_bucket_acl.return_value.acl = (
+            oss2.BUCKET_ACL_PUBLIC_READ
+        )
+        storage = OssStorage()
+        other = OssStorage()
+        self.mock_bucket.return_value.get_bucket_acl.assert_not_called()
+
+        self.assertEqual(storage.bucket_acl, oss2.BUCKET_ACL_PUBLIC_READ)
+        self.assertEqual(other.bucket_acl, oss2.BUCKET_ACL_PUBLIC_READ)
+        self.mock_bucket.return_value.get_bucket_acl.assert_called_once()
+
+    def test_no_such_bucket(self):
+        self.mock_bucket.return_value.get_bucket_acl.side_effect = (
+            oss2.exceptions.NoSuchBucket(404, {}, b"", {})
+        )
+        client = get_client("id", "secret", "http://endpoint", "bucket")
+
+        with self.assertRaises(SuspiciousOperation):
+            client.bucket_acl
+        self.assertFalse(client.bucket_acl_loaded)
+
+    def test_clear_on_setting_changed(self):
+        client = get_client("id", "secret", "http://endpoint", "bucket")
+
+        with override_settings(ALIYUN_OSS={"CONNECTION_POOL_SIZE": 5}):
+            self.assertEqual(clients._clients, {})
+            self.assertIsNot(
+                get_client("id", "secret", "http://endpoint", "bucket"),
+                client,
+            )
+
+
+@override_settings(ALIYUN_OSS={"ASYNC_THREADS": 4, "ASYNC_MAX_PENDING": 2})
+class RunAsyncTestCase(APITestCase):
+    def tearDown(self) -> None:
+        clear_clients()
+
+    async def test_dedicated_executor(self):
+        name = await run_async(lambda: threading.current_thread().name)
+        self.assertTrue(name.startswith("oss"))
+        self.assertEqual(get_executor()._max_workers, 4)
+
+    async def test_args(self):
+        self.assertEqual(await run_async(int, "11", base=2), 3)
+
+    async def test_exception(self):
+        with self.assertRaises(ZeroDivisionError):
+            await run_async(divmod, 1, 0)
+
+    async def test_max_pending(self):
+        lock = threading.Lock()
+        release = threading.Event()
+        running = 0
+        max_running = 0
+
+        def work():
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            release.wait(5)
+            with lock:
+                running -= 1
+
+        tasks = [asyncio.ensure_future(run_async(work)) for _ in range(5)]
+        await asyncio.sleep(0.1)
+        self.assertEqual(get_executor()._work_queue.qsize(), 0)
+        release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(max_running, 2)
@@ -0,0 +1,49 @@
+from unittest.mock import MagicMock
+
+from django.core.files.storage import FileSystemStorage
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from zq_django_util.utils.oss.fields import OssImageField
+
+
+class OssImageFieldTestCase(APITestCase):
+    def get_file(self, storage, name="avatar/a.png"):
+        return FieldFile(MagicMock(), MagicMock(storage=storage), name)
+
+    def test_to_representation(self):
+        storage = MagicMock()
+        storage.image_url.return_value = "url"
+        field = OssImageField(process="avatar")
+
+        self.assertEqual(field.to_representation(self.get_file(storage)), "url")
+        storage.image_url.assert_called_once_with("avatar/a.png", "avatar")
+
+    def test_to_representation_empty(self):
+        field = OssImageField(process="avatar")
+
+        self.assertIsNone(field.to_representation(None))
+        self.assertIsNone(field.to_representation(self.get_file(None, "")))
+
+    def test_to_representation_not_use_url(self):
+        storage = MagicMock()
+        field = OssImageField(process="avatar", use_url=False)
+
+        self.assertEqual(
+            field.to_representation(self.get_file(storage)), "avatar/a.png"
+        )
+        storage.image_url.assert_not_called()
+
+    def test_to_representation_other_storage(self):
+        class Serializer(serializers.Serializer):
+            avatar = OssImageField(process="avatar")
+
+        storage = FileSystemStorage(base_url="/media/")
+        request = APIRequestFactory().get("/")
+
+        data = Serializer(
+            {"avatar": self.get_file(storage)}, context={"request": request}
+        ).data
+
+        self.assertEqual(data["avatar"], "http://testserver/media/avatar/a.png")
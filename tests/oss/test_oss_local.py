@@ -0,0 +1,233 @@
+import tempfile
+import time
+from unittest import mock
+
+import oss2
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from zq_django_util.utils.oss.local import LocalBucket, LocalOssStorage
+
+PART_SIZE = oss2.defaults.min_part_size
+
+
+class LocalOssStorageTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = LocalOssStorage(self.tmp_dir.name, base_dir="/base/")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_save_open(self):
+        name = self.storage.save("dir/file.txt", ContentFile(b"0123456789"))
+
+        self.assertEqual(name, "dir/file.txt")
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.storage.size(name), 10)
+        self.assertEqual(self.storage.content_type(name), "text/plain")
+        with self.storage.open(name) as f:
+            f.seek(3)
+            self.assertEqual(f.read(4), b"3456")
+            self.assertEqual(f.read(), b"789")
+
+    def test_save_available_name(self):
+        self.storage.save("file.txt", ContentFile(b"a"))
+        name = self.storage.save("file.txt", ContentFile(b"b"))
+
+        self.assertNotEqual(name, "file.txt")
+        self.assertEqual(self.storage.open(name).read(), b"b")
+
+    @override_settings(
+        ALIYUN_OSS={
+            "MULTIPART_THRESHOLD": PART_SIZE,
+            "MULTIPART_PART_SIZE": PART_SIZE,
+        }
+    )
+    def test_save_multipart(self):
+        data = b"a" * PART_SIZE + b"b" * PART_SIZE + b"c"
+
+        self.storage.save("file", ContentFile(data))
+
+        self.assertEqual(self.storage.open("file").read(), data)
+
+    def test_not_found(self):
+        self.assertFalse(self.storage.exists("file"))
+        with self.assertRaises(oss2.exceptions.NotFound):
+            self.storage.get_file_meta("file")
+
+    def test_list(self):
+        for name in ("dir/a", "dir/b/c", "dir/b/d", "other"):
+            self.storage.save(name, ContentFile(b"test"))
+
+        self.assertEqual(
+            self.storage.listdir("dir"), (["base/dir/b/"], ["base/dir/a"])
+        )
+        self.assertEqual(
+            [
+                obj["key"]
+                for obj in self.storage.iter_dir(
+                    "dir", recursive=True, page_size=2
+                )
+            ],
+            ["base/dir/a", "base/dir/b/c", "base/dir/b/d"],
+        )
+
+    def test_delete(self):
+        self.storage.save("file", ContentFile(b"test"))
+        self.storage.delete("file")
+        self.assertFalse(self.storage.exists("file"))
+
+    def test_delete_dir(self):
+        for name in ("dir/a", "dir/b/c", "other"):
+            self.storage.save(name, ContentFile(b"test"))
+
+        res = self.storage.delete_dir("dir")
+
+        self.assertEqual(res, {"deleted": 2, "failed": []})
+        self.assertFalse(self.storage.exists("dir/a"))
+        self.assertTrue(self.storage.exists("other"))
+
+    @override_settings(
+        ALIYUN_OSS={
+            "COPY_THRESHOLD": PART_SIZE,
+            "MULTIPART_PART_SIZE": PART_SIZE,
+        }
+    )
+    def test_copy_move(self):
+        data = b"a" * PART_SIZE + b"b"
+        self.storage.save("a/big", ContentFile(data))
+        self.storage.save("a/small", ContentFile(b"small"))
+
+        self.storage.copy("a/big", "b/big")
+        res = self.storage.move_dir("a", "c")
+
+        self.assertEqual(self.storage.open("b/big").read(), data)
+        self.assertEqual(self.storage.open("c/big").read(), data)
+        self.assertEqual(self.storage.open("c/small").read(), b"small")
+        self.assertEqual(res["failed"], [])
+        self.assertFalse(self.storage.exists("a/big"))
+
+    def test_move_same_name(self):
+        self.storage.save("a.txt", ContentFile(b"test"))
+
+        self.assertEqual(self.storage.move("a.txt", "a.txt"), "a.txt")
+        self.assertEqual(self.storage.move("a.txt", "./a.txt"), "a.txt")
+
+        self.assertTrue(self.storage.exists("a.txt"))
+        self.assertEqual(self.storage.open("a.txt").read(), b"test")
+
+    def test_object_acl(self):
+        self.storage.save("file", ContentFile(b"test"))
+        self.storage.set_object_acl("file", oss2.OBJECT_ACL_PUBLIC_READ)
+        self.assertEqual(
+            self.storage.get_object_acl("file"), oss2.OBJECT_ACL_PUBLIC_READ
+        )
+
+    def test_url(self):
+        url = self.storage.url("dir/file")
+        self.assertTrue(
+            url.startswith("http://local.oss.localhost/base/dir/file?")
+        )
+        self.assertIn("Signature=", url)
+        self.assertIn(
+            "x-oss-process=image%2Fresize%2Cw_64",
+            self.storage.image_url("dir/file", "image/resize,w_64"),
+        )
+
+    def test_url_public(self):
+        storage = LocalOssStorage(
+            self.tmp_dir.name, acl=oss2.BUCKET_ACL_PUBLIC_READ
+        )
+        self.assertEqual(
+            storage.url("dir/file"), "http://local.oss.localhost/dir/file"
+        )
+
+    def test_content_addressed(self):
+        storage = LocalOssStorage(self.tmp_dir.name, content_addressed=True)
+
+        name = storage.save("a.txt", ContentFile(b"test"))
+        name2 = storage.save("b.txt", ContentFile(b"test"))
+
+        self.assertEqual(name, name2)
+        self.assertTrue(name.startswith("sha256/"))
+        self.assertEqual(storage.open(name).read(), b"test")
+
+
+class LocalBucketTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_latency(self):
+        bucket = LocalBucket(self.tmp_dir.name, latency=0.05)
+
+        start = time.perf_counter()
+        bucket.put_object("file", b"test")
+        bucket.head_object("file")
+
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+
+    def test_get_object_range(self):
+        bucket = LocalBucket(self.tmp_dir.name)
+        bucket.put_object("file", b"0123456789")
+
+        self.assertEqual(
+            bucket.get_object("file", byte_range=(2, 4)).read(), b"234"
+        )
+        self.assertEqual(
+            bucket.get_object("file", byte_range=(None, None)).read(),
+            b"0123456789",
+        )
+
+    def test_list_objects_pages(self):
+        bucket = LocalBucket(self.tmp_dir.name)
+        for key in ("a/1", "a/2", "b/1", "c"):
+            bucket.put_object(key, b"")
+
+        keys = [
+            obj.key
+            for obj in oss2.ObjectIterator(bucket, delimiter="/", max_keys=1)
+        ]
+
+        self.assertEqual(keys, ["a/", "b/", "c"])
+
+    def test_list_objects_index(self):
+        bucket = LocalBucket(self.tmp_dir.name)
+        for key in ("a", "b", "c"):
+            bucket.put_object(key, b"")
+        other = LocalBucket(self.tmp_dir.name)
+        other.delete_object("b")
+        other.put_object("d", b"")
+
+        with mock.patch("os.listdir") as listdir:
+            keys = [obj.key for obj in oss2.ObjectIterator(bucket, max_keys=1)]
+
+        self.assertEqual(keys, ["a", "c", "d"])
+        listdir.assert_not_called()
+
+    def test_list_objects_existing(self):
+        LocalBucket(self.tmp_dir.name).put_object("a/1", b"")
+        LocalBucket(self.tmp_dir.name).put_object("a/2", b"")
+
+        result = LocalBucket(self.tmp_dir.name).list_objects(prefix="a/")
+
+        self.assertEqual(
+            [obj.key for obj in result.object_list], ["a/1", "a/2"]
+        )
+        self.assertFalse(result.is_truncated)
+
+    def test_abort_multipart_upload(self):
+        bucket = LocalBucket(self.tmp_dir.name)
+        upload_id = bucket.init_multipart_upload("file").upload_id
+        bucket.upload_part("file", upload_id, 1, b"test")
+
+        bucket.abort_multipart_upload("file", upload_id)
+
+        with self.assertRaises(oss2.exceptions.NotFound):
+            bucket.upload_part("file", upload_id, 2, b"test")
+        with self.assertRaises(oss2.exceptions.NoSuchKey):
+            bucket.get_object("file")
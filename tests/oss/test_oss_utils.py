@@ -1,8 +1,15 @@
 import base64
+import hashlib
+import hmac
 import importlib
+import json
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
+from Crypto.Hash import MD5
 from Crypto.PublicKey import RSA
+from Crypto.Signature import PKCS1_v1_5
 from django.core.cache import cache
 from django.test import override_settings
 from rest_framework.request import Request
@@ -11,10 +18,18 @@ from rest_framework.test import APIRequestFactory, APITestCase
 import zq_django_util
 from zq_django_util.utils.oss.utils import (
     _get_pub_key_online,
+    build_image_process,
     check_callback_signature,
+    clear_pub_key_cache,
+    get_content_addressed_name,
+    get_image_process,
+    get_prefix_token,
     get_pub_key,
     get_random_name,
+    get_rsa_pub_key,
+    get_signing_material,
     get_token,
+    get_tokens,
     split_file_name,
 )
 
@@ -95,12 +110,66 @@ class FilenameUtilTestCase(APITestCase):
         self.assertRegex(name, f"^{self.random_rex}$")
 
 
+class ContentAddressedNameTestCase(APITestCase):
+    digest = "ab" + "c" * 62
+
+    def test_content_addressed_name(self):
+        self.assertEqual(
+            get_content_addressed_name("avatar/test.PNG", self.digest),
+            "sha256/ab/" + "c" * 62 + ".png",
+        )
+
+    def test_content_addressed_name_no_ext(self):
+        self.assertEqual(
+            get_content_addressed_name("dir.d/test", self.digest),
+            "sha256/ab/" + "c" * 62,
+        )
+
+
+class ImageProcessUtilTestCase(APITestCase):
+    def test_build_image_process(self):
+        self.assertEqual(
+            build_image_process(width=64, height=64, format="webp", quality=80),
+            "image/resize,m_lfit,w_64,h_64/format,webp/quality,q_80",
+        )
+
+    def test_build_image_process_crop(self):
+        self.assertEqual(
+            build_image_process(width=64, mode="fill", crop=(0, 10, 100, 100)),
+            "image/crop,x_0,y_10,w_100,h_100/resize,m_fill,w_64",
+        )
+
+    def test_build_image_process_empty(self):
+        with self.assertRaises(ValueError):
+            build_image_process()
+
+    @override_settings(
+        ALIYUN_OSS={
+            "IMAGE_PRESETS": {
+                "thumbnail": "image/resize,w_128",
+                "avatar": {"width": 64, "height": 64},
+            }
+        }
+    )
+    def test_get_image_process(self):
+        self.assertEqual(get_image_process("thumbnail"), "image/resize,w_128")
+        self.assertEqual(
+            get_image_process("avatar"), "image/resize,m_lfit,w_64,h_64"
+        )
+        self.assertEqual(
+            get_image_process("image/format,webp"), "image/format,webp"
+        )
+
+
 class CallbackUtilTestCase(APITestCase):
     access_key_id = "access_key_id"
     access_key_secret = "access_key_secret"
     bucket_name = "bucket"
     endpoint = "https://oss-cn-shanghai.aliyuncs.com"
 
+    def setUp(self) -> None:
+        clear_pub_key_cache()
+
     @override_settings(
         ALIYUN_OSS={
             "ACCESS_KEY_ID": access_key_id,
@@ -131,6 +200,142 @@ class CallbackUtilTestCase(APITestCase):
         self.assertIn("callback", token)
         self.assertIn("expire", token)
 
+    def assert_token_signed(self, token):
+        expected = base64.encodebytes(
+            hmac.new(
+                self.access_key_secret.encode(),
+                token["policy"].encode(),
+                hashlib.sha1,
+            ).digest()
+        ).strip()
+        self.assertEqual(token["signature"], expected.decode())
+
+    def decode_policy(self, token):
+        return json.loads(base64.b64decode(token["policy"]))
+
+    @override_settings(
+        ALIYUN_OSS={
+            "ACCESS_KEY_ID": access_key_id,
+            "ACCESS_KEY_SECRET": access_key_secret,
+            "ENDPOINT": endpoint,
+            "BUCKET_NAME": bucket_name,
+        }
+    )
+    def test_get_token_signature(self):
+        token = get_token(key="dir/test.txt", callback={})
+
+        self.assert_token_signed(token)
+        policy = self.decode_policy(token)
+        self.assertEqual(policy["expiration"], token["expire"])
+        self.assertIn(["eq", "$key", "dir/test.txt"], policy["conditions"])
+
+    def test_signing_material_reload(self):
+        with override_settings(
+            ALIYUN_OSS={"ENDPOINT": self.endpoint, "BUCKET_NAME": "a"}
+        ):
+            material = get_signing_material()
+            self.assertIs(get_signing_material(), material)
+            self.assertEqual(
+                material.host, "https://a.oss-cn-shanghai.aliyuncs.com"
+            )
+        with override_settings(
+            ALIYUN_OSS={"ENDPOINT": self.endpoint, "BUCKET_NAME": "b"}
+        ):
+            self.assertEqual(
+                get_signing_material().host,
+                "https://b.oss-cn-shanghai.aliyuncs.com",
+            )
+
+    @override_settings(
+        ALIYUN_OSS={
+            "ACCESS_KEY_ID": access_key_id,
+            "ACCESS_KEY_SECRET": access_key_secret,
+            "ENDPOINT": endpoint,
+            "BUCKET_NAME": bucket_name,
+        }
+    )
+    def test_get_tokens(self):
+        callback = {"callbackUrl": "http://testserver/callback/"}
+
+        tokens = get_tokens(["a.txt", "b.txt"], callback=callback)
+
+        self.assertEqual([token["key"] for token in tokens], ["a.txt", "b.txt"])
+        self.assertEqual(tokens[0]["expire"], tokens[1]["expire"])
+        self.assertEqual(
+            tokens[0]["callback"], get_token("a.txt", callback)["callback"]
+        )
+        for token in tokens:
+            self.assert_token_signed(token)
+            self.assertIn(
+                ["eq", "$key", token["key"]],
+                self.decode_policy(token)["conditions"],
+            )
+
+    @override_settings(
+        ALIYUN_OSS={
+            "ACCESS_KEY_ID": access_key_id,
+            "ACCESS_KEY_SECRET": access_key_secret,
+            "ENDPOINT": endpoint,
+            "BUCKET_NAME": bucket_name,
+        }
+    )
+    def test_get_tokens_policy(self):
+        policy = {"expiration": "2000-01-01T00:00:00Z", "conditions": []}
+
+        tokens = get_tokens(["a.txt", "b.txt"], callback={}, policy=policy)
+
+        self.assertEqual([token["key"] for token in tokens], ["a.txt", "b.txt"])
+        self.assertEqual(tokens[0]["signature"], tokens[1]["signature"])
+        self.assertEqual(self.decode_policy(tokens[0]), policy)
+        self.assert_token_signed(tokens[0])
+
+    @override_settings(
+        ALIYUN_OSS={
+            "ACCESS_KEY_ID": access_key_id,
+            "ACCESS_KEY_SECRET": access_key_secret,
+            "ENDPOINT": endpoint,
+            "BUCKET_NAME": bucket_name,
+            "TOKEN_EXPIRE_SECOND": 60,
+            "TOKEN_CACHE_MARGIN_SECOND": 30,
+        }
+    )
+    def test_get_prefix_token(self):
+        token = get_prefix_token("media/avatar/", callback={})
+
+        self.assertEqual(token["key"], "media/avatar/")
+        self.assert_token_signed(token)
+        self.assertIn(
+            ["starts-with", "$key", "media/avatar/"],
+            self.decode_policy(token)["conditions"],
+        )
+
+        with patch("zq_django_util.utils.oss.utils._build_token") as mock:
+            cached = get_prefix_token("media/avatar/", callback={})
+            self.assertEqual(cached, token)
+            self.assertIsNot(cached, token)
+            get_prefix_token("media/other/", callback={})
+            get_prefix_token("media/avatar/", callback={"a": "b"})
+        self.assertEqual(mock.call_count, 2)
+
+    @override_settings(
+        ALIYUN_OSS={
+            "ACCESS_KEY_ID": access_key_id,
+            "ACCESS_KEY_SECRET": access_key_secret,
+            "ENDPOINT": endpoint,
+            "BUCKET_NAME": bucket_name,
+            "TOKEN_EXPIRE_SECOND": 60,
+            "TOKEN_CACHE_MARGIN_SECOND": 60,
+        }
+    )
+    def test_get_prefix_token_not_cached(self):
+        get_prefix_token("media/", callback={})
+
+        with patch(
+            "zq_django_util.utils.oss.utils._build_token", return_value={}
+        ) as mock:
+            get_prefix_token("media/", callback={})
+        mock.assert_called_once()
+
     @patch("urllib.request.urlopen")
     def test__get_pub_key_online(self, mock_urlopen: MagicMock):
         importlib.reload(zq_django_util.utils.oss.utils)
@@ -166,6 +371,115 @@ class CallbackUtilTestCase(APITestCase):
             res = get_pub_key("url")
             self.assertEqual(res, "pub_key")
 
+    @override_settings(ALIYUN_OSS={"PUB_KEY_FETCH_TIMEOUT": 3})
+    @patch("zq_django_util.utils.oss.utils.urlopen")
+    def test__get_pub_key_online_timeout(self, mock_urlopen: MagicMock):
+        _get_pub_key_online("https://testserver/")
+        mock_urlopen.assert_called_once_with("https://testserver/", timeout=3)
+
+    @override_settings(ALIYUN_OSS={"PUB_KEY_CACHE_TIMEOUT": 100})
+    @patch("zq_django_util.utils.oss.utils._get_pub_key_online")
+    @patch("zq_django_util.utils.oss.utils.cache")
+    def test_get_pub_key_timeout(
+        self, mock_cache: MagicMock, mock_get_online: MagicMock
+    ):
+        mock_cache.get.return_value = None
+        mock_get_online.return_value = "pub_key"
+
+        get_pub_key("url")
+
+        mock_cache.set.assert_called_once_with(
+            "oss:pub_key:url", "pub_key", 100
+        )
+
+    @patch("zq_django_util.utils.oss.utils.get_pub_key")
+    def test_get_rsa_pub_key(self, mock_get_pub_key: MagicMock):
+        key = RSA.generate(1024)
+        mock_get_pub_key.return_value = key.publickey().export_key()
+
+        rsa_pub = get_rsa_pub_key("url")
+
+        self.assertEqual(rsa_pub, key.publickey())
+        self.assertIs(get_rsa_pub_key("url"), rsa_pub)
+        mock_get_pub_key.assert_called_once_with("url")
+
+    @override_settings(ALIYUN_OSS={"PUB_KEY_CACHE_SIZE": 0})
+    @patch("zq_django_util.utils.oss.utils.get_pub_key")
+    def test_get_rsa_pub_key_not_cached(self, mock_get_pub_key: MagicMock):
+        mock_get_pub_key.return_value = (
+            RSA.generate(1024).publickey().export_key()
+        )
+
+        get_rsa_pub_key("url")
+        get_rsa_pub_key("url")
+
+        self.assertEqual(mock_get_pub_key.call_count, 2)
+
+    @patch("zq_django_util.utils.oss.utils.get_pub_key")
+    def test_get_rsa_pub_key_single_flight(self, mock_get_pub_key: MagicMock):
+        pub_key = RSA.generate(1024).publickey().export_key()
+
+        def get_pub_key(url):
+            time.sleep(0.1)
+            return pub_key
+
+        mock_get_pub_key.side_effect = get_pub_key
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_rsa_pub_key("url"))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        mock_get_pub_key.assert_called_once_with("url")
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    @patch("zq_django_util.utils.oss.utils.get_pub_key")
+    def test_get_rsa_pub_key_failed(self, mock_get_pub_key: MagicMock):
+        mock_get_pub_key.side_effect = OSError()
+
+        with self.assertRaises(OSError):
+            get_rsa_pub_key("url")
+        with self.assertRaises(OSError):
+            get_rsa_pub_key("url")
+        self.assertEqual(mock_get_pub_key.call_count, 2)
+
+    def signed_request(self, key, body, sign_body=None):
+        auth_str = "/test/\n" + (sign_body or body)
+        signature = PKCS1_v1_5.new(key).sign(MD5.new(auth_str.encode()))
+        return Request(
+            APIRequestFactory().post(
+                path="/test/",
+                data=body,
+                content_type="application/x-www-form-urlencoded",
+                HTTP_AUTHORIZATION=base64.b64encode(signature),
+                HTTP_X_OSS_PUB_KEY_URL=base64.b64encode(
+                    b"https://gosspublic.alicdn.com/url"
+                ),
+            )
+        )
+
+    @patch("zq_django_util.utils.oss.utils.get_pub_key")
+    def test_check_callback_signature_verify(self, mock_get_pub_key: MagicMock):
+        key = RSA.generate(1024)
+        mock_get_pub_key.return_value = key.publickey().export_key()
+
+        self.assertTrue(
+            check_callback_signature(self.signed_request(key, "a=1"))
+        )
+        self.assertFalse(
+            check_callback_signature(
+                self.signed_request(key, "a=1", sign_body="a=2")
+            )
+        )
+        mock_get_pub_key.assert_called_once()
+
     @patch("Crypto.Signature.pkcs1_15.PKCS115_SigScheme")
     @patch("zq_django_util.utils.oss.utils.get_pub_key")
     def test_check_callback_signature_simple_path(
@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from zq_django_util.utils.cache import LRUCache
+
+
+class LRUCacheTestCase(SimpleTestCase):
+    def test_get_set(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("b", 2), 2)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+
+    def test_evict_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    @patch("zq_django_util.utils.cache.time.monotonic")
+    def test_timeout(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        cache = LRUCache(timeout=10)
+        cache.set("a", 1)
+        cache.set("b", 2, timeout=20)
+
+        mock_monotonic.return_value = 110
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+
+        mock_monotonic.return_value = 120
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 0)
+
+    def test_disabled(self):
+        cache = LRUCache(maxsize=0)
+        cache.set("a", 1)
+        self.assertNotIn("a", cache)
+
+        cache = LRUCache(timeout=0)
+        cache.set("a", 1)
+        self.assertNotIn("a", cache)
+
+    def test_delete_clear(self):
+        cache = LRUCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.delete("a")
+        cache.delete("not_exist")
+        self.assertNotIn("a", cache)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    @patch("zq_django_util.utils.cache.time.monotonic")
+    def test_items(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        cache = LRUCache()
+        cache.set("a", 1, timeout=10)
+        cache.set("b", 2)
+
+        mock_monotonic.return_value = 110
+        self.assertEqual(cache.items(), [("b", 2)])
@@ -1,6 +1,50 @@
+from django.test import TestCase, override_settings
+from model_bakery import baker
+
 from tests.models import User
 
 
 def test_abstract_user_str():
     user = User(username="username")
     assert str(user) == user.username
+
+
+class PasswordHasherPolicyTestCase(TestCase):
+    def setUp(self):
+        self.user = baker.make(User)
+        self.user.set_password("password")
+        self.user.save()
+
+    @override_settings(
+        PASSWORD_HASHERS=[
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+            "django.contrib.auth.hashers.SHA1PasswordHasher",
+        ],
+        ZQ_AUTH={"PASSWORD_HASHER": "sha1"},
+    )
+    def test_upgrade_on_login(self):
+        self.assertTrue(self.user.password.startswith("md5$"))
+
+        self.assertTrue(self.user.check_password("password"))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("sha1$"))
+
+        with self.assertNumQueries(0):  # 已是指定算法，不再升级
+            self.assertTrue(self.user.check_password("password"))
+        self.assertFalse(self.user.check_password("wrong"))
+
+    @override_settings(
+        PASSWORD_HASHERS=[
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+            "django.contrib.auth.hashers.SHA1PasswordHasher",
+        ],
+        ZQ_AUTH={"PASSWORD_HASHER": "sha1"},
+    )
+    def test_set_password(self):
+        self.user.set_password("new")
+        self.assertTrue(self.user.password.startswith("sha1$"))
+        self.assertTrue(self.user.check_password("new"))
+
+    def test_default(self):
+        self.assertTrue(self.user.check_password("password"))
+        self.assertTrue(self.user.password.startswith("md5$"))
@@ -1,11 +1,66 @@
 import json
+import uuid
+from decimal import Decimal
+from unittest import skipIf
+from unittest.mock import patch
 
-from rest_framework.request import Request
+from django.db.models import QuerySet
+from django.test import override_settings
+from django.utils.timezone import now
+from django.utils.translation import gettext_lazy
+from model_bakery import baker
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Empty, Request
+from rest_framework.response import Response
 from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework.utils.serializer_helpers import ReturnList
 
+from tests.models import User
+from tests.sites.serializers import UserSerializer
 from zq_django_util.exceptions import ApiException
 from zq_django_util.response import ApiResponse, ResponseType
-from zq_django_util.response.renderers import CustomRenderer
+from zq_django_util.response.renderers import (
+    CustomRenderer,
+    OrjsonRenderer,
+    orjson,
+)
+from zq_django_util.response.streaming import StreamingApiResponse
+from zq_django_util.response.templates import get_response_template
+
+
+class ResponseTypeTestCase(APITestCase):
+    def test_attributes(self):
+        self.assertEqual(ResponseType.NotLogin.code, "A0310")
+        self.assertEqual(ResponseType.NotLogin.detail, "用户未登录")
+        self.assertEqual(ResponseType.NotLogin.status_code, 401)
+
+    def test_get_by_code(self):
+        for response_type in ResponseType:
+            if response_type is ResponseType.RefreshTokenInvalid:
+                continue
+            self.assertIs(
+                ResponseType.get_by_code(response_type.code), response_type
+            )
+
+    def test_get_by_code_duplicate(self):
+        self.assertIs(
+            ResponseType.get_by_code(ResponseType.RefreshTokenInvalid.code),
+            ResponseType.TokenInvalid,
+        )
+
+    def test_get_by_code_not_exist(self):
+        self.assertIsNone(ResponseType.get_by_code("Z9999"))
+
+    def test_get_by_status_code(self):
+        self.assertTupleEqual(
+            ResponseType.get_by_status_code(404),
+            (ResponseType.APINotFound, ResponseType.ResourceNotFound),
+        )
+        self.assertTupleEqual(ResponseType.get_by_status_code(999), ())
+
+    def test_index_immutable(self):
+        with self.assertRaises(TypeError):
+            ResponseType._code_map["Z9999"] = ResponseType.Success
 
 
 class ApiResponseTestCase(APITestCase):
@@ -27,6 +82,7 @@ class ApiResponseTestCase(APITestCase):
 
 
 class ApiResponseRenderTestCase(APITestCase):
+    @override_settings(DRF_LOGGER={"DATABASE": True})
     def test_render_prepare_log_success(self):
         request = Request(APIRequestFactory().get("/test/"))
         response = self.client.get("/test/")
@@ -37,7 +93,7 @@ class ApiResponseRenderTestCase(APITestCase):
             renderer_context={"request": request, "response": response},
         )
 
-        self.assertIs(response.api_request_data, request.data)
+        self.assertDictEqual(response.api_request_data, {})
 
         render_data = json.loads(render_response.decode("utf-8"))
 
@@ -46,6 +102,51 @@ class ApiResponseRenderTestCase(APITestCase):
         self.assertEqual(render_data["msg"], ResponseType.Success.detail)
         self.assertDictEqual(render_data["data"], response.data)
 
+    @override_settings(DRF_LOGGER={"DATABASE": False, "SIGNAL": False})
+    def test_render_prepare_log_disabled(self):
+        request = Request(APIRequestFactory().post("/test/", {"a": 1}))
+        response = self.client.get("/test/")
+
+        CustomRenderer().render(
+            data=response.data,
+            accepted_media_type="application/json",
+            renderer_context={"request": request, "response": response},
+        )
+
+        self.assertFalse(hasattr(response, "api_request_data"))
+        self.assertIs(request._full_data, Empty)
+
+    @override_settings(
+        DRF_LOGGER={"DATABASE": True, "SKIP_URL_NAME": ["test-list"]}
+    )
+    def test_render_prepare_log_skipped(self):
+        request = Request(APIRequestFactory().post("/test/", {"a": 1}))
+        response = self.client.get("/test/")
+
+        CustomRenderer().render(
+            data=response.data,
+            accepted_media_type="application/json",
+            renderer_context={"request": request, "response": response},
+        )
+
+        self.assertFalse(hasattr(response, "api_request_data"))
+        self.assertIs(request._full_data, Empty)
+
+    def test_render_success_template(self):
+        request = Request(APIRequestFactory().get("/test/"))
+        response = self.client.get("/test/")
+
+        render_response = CustomRenderer().render(
+            data=response.data,
+            accepted_media_type="application/json",
+            renderer_context={"request": request, "response": response},
+        )
+
+        self.assertEqual(
+            render_response,
+            JSONRenderer().render(ApiResponse(data=response.data).__dict__()),
+        )
+
     def test_render_prepare_log_fail(self):
         request = APIRequestFactory().get("/test/")
         response = self.client.get("/test/")
@@ -57,3 +158,229 @@ class ApiResponseRenderTestCase(APITestCase):
         )
 
         self.assertFalse(hasattr(response, "api_request_data"))
+
+
+class ErrorTemplateRenderTestCase(APITestCase):
+    def render(self, data, response, accepted_media_type="application/json"):
+        request = Request(APIRequestFactory().get("/test/"))
+        return CustomRenderer().render(
+            data=data,
+            accepted_media_type=accepted_media_type,
+            renderer_context={"request": request, "response": response},
+        )
+
+    def get_error_response(self, exc: ApiException) -> Response:
+        data = exc.response_data
+        data["data"]["details"] = {"type": "client_error", "errors": []}
+        response = Response(data, status=exc.response_type.status_code)
+        response.exception = True
+        return response
+
+    def test_render_error_template(self):
+        exc = ApiException(ResponseType.NotLogin)
+        response = self.get_error_response(exc)
+
+        with patch(
+            "zq_django_util.response.renderers.get_response_template",
+            wraps=get_response_template,
+        ) as mock_template:
+            res = self.render(response.data, response)
+            mock_template.assert_called_once_with(
+                ResponseType.NotLogin, False, True
+            )
+
+        self.assertEqual(res, JSONRenderer().render(response.data))
+        render_data = json.loads(res.decode("utf-8"))
+        self.assertEqual(render_data["code"], ResponseType.NotLogin.code)
+        self.assertEqual(render_data["msg"], ResponseType.NotLogin.detail)
+        self.assertIsNone(render_data["data"]["eid"])
+
+    def test_render_custom_msg_without_template(self):
+        exc = ApiException(ResponseType.NotLogin, msg="请先登录 ")
+        response = self.get_error_response(exc)
+
+        with patch(
+            "zq_django_util.response.renderers.get_response_template"
+        ) as mock_template:
+            res = self.render(response.data, response)
+            mock_template.assert_not_called()
+
+        self.assertEqual(res, JSONRenderer().render(response.data))
+        self.assertEqual(json.loads(res.decode("utf-8"))["msg"], "请先登录 ")
+
+    def test_render_error_template_cached(self):
+        first = get_response_template(ResponseType.NotLogin)
+        second = get_response_template(ResponseType.NotLogin)
+
+        self.assertIs(first, second)
+
+    def test_render_record_exception_without_template(self):
+        exc = ApiException(ResponseType.ServerError)
+        response = self.get_error_response(exc)
+        response.exception_data = exc
+
+        with patch(
+            "zq_django_util.response.renderers.get_response_template"
+        ) as mock_template:
+            res = self.render(response.data, response)
+            mock_template.assert_not_called()
+
+        self.assertEqual(res, JSONRenderer().render(response.data))
+
+    def test_render_indent_without_template(self):
+        exc = ApiException(ResponseType.NotLogin)
+        response = self.get_error_response(exc)
+
+        with patch(
+            "zq_django_util.response.renderers.get_response_template"
+        ) as mock_template:
+            res = self.render(
+                response.data, response, "application/json; indent=4"
+            )
+            mock_template.assert_not_called()
+
+        self.assertEqual(
+            res,
+            JSONRenderer().render(response.data, "application/json; indent=4"),
+        )
+
+
+@skipIf(orjson is None, "orjson is not installed")
+class OrjsonRendererTestCase(APITestCase):
+    def get_data(self):
+        return {
+            "time": now(),
+            "date": now().date(),
+            "decimal": Decimal("1.50"),
+            "uuid": uuid.uuid4(),
+            "lazy": gettext_lazy("lazy"),
+            "text": "中文\u2028",
+            "list": ReturnList([{"a": 1, 2: None}], serializer=None),
+        }
+
+    def render(self, renderer, data):
+        request = Request(APIRequestFactory().get("/test/"))
+        response = Response(data)
+        return renderer.render(
+            data=data,
+            accepted_media_type="application/json",
+            renderer_context={"request": request, "response": response},
+        )
+
+    def test_render_same_as_custom_renderer(self):
+        data = self.get_data()
+
+        self.assertEqual(
+            self.render(OrjsonRenderer(), data),
+            self.render(CustomRenderer(), data),
+        )
+
+    def test_render_use_orjson(self):
+        with patch(
+            "zq_django_util.response.renderers.orjson.dumps",
+            wraps=orjson.dumps,
+        ) as mock_dumps:
+            self.render(OrjsonRenderer(), {"a": 1})
+            mock_dumps.assert_called_once()
+
+    def test_render_fallback_unsupported_data(self):
+        data = {"big": 2**64}
+
+        self.assertEqual(
+            self.render(OrjsonRenderer(), data),
+            self.render(CustomRenderer(), data),
+        )
+
+    def test_render_float(self):
+        data = {"big": 1e16, "small": 1e-7, "float": 0.1, "none": None}
+        res = self.render(OrjsonRenderer(), data)
+
+        self.assertEqual(
+            json.loads(res), json.loads(self.render(CustomRenderer(), data))
+        )
+
+    def test_render_non_finite_strict(self):
+        for value in (float("nan"), float("inf"), Decimal("-Infinity")):
+            data = {"list": [1, {"value": value}]}
+            with self.assertRaises(ValueError):
+                self.render(CustomRenderer(), data)
+            with self.assertRaises(ValueError):
+                self.render(OrjsonRenderer(), data)
+
+    def test_render_non_finite_not_strict(self):
+        renderer = OrjsonRenderer()
+        renderer.strict = False
+        custom_renderer = CustomRenderer()
+        custom_renderer.strict = False
+        data = {"nan": float("nan"), "inf": float("inf"), "none": None}
+
+        res = self.render(renderer, data)
+        self.assertEqual(res, self.render(custom_renderer, data))
+        self.assertIn(b"NaN", res)
+
+    def test_render_fallback_without_orjson(self):
+        data = self.get_data()
+
+        with patch("zq_django_util.response.renderers.orjson", None):
+            res = self.render(OrjsonRenderer(), data)
+
+        self.assertEqual(res, self.render(CustomRenderer(), data))
+
+
+class StreamingApiResponseTestCase(APITestCase):
+    def get_content(self, response: StreamingApiResponse) -> bytes:
+        return b"".join(response.streaming_content)
+
+    def test_stream_generator(self):
+        time = now()
+        data = [{"id": i, "time": time} for i in range(5)]
+
+        response = StreamingApiResponse(
+            ({"id": i, "time": time} for i in range(5)), chunk_size=2
+        )
+
+        self.assertEqual(
+            self.get_content(response),
+            JSONRenderer().render(ApiResponse(data=data).__dict__()),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+
+    def test_stream_empty(self):
+        response = StreamingApiResponse([])
+
+        self.assertEqual(
+            self.get_content(response),
+            JSONRenderer().render(ApiResponse(data=[]).__dict__()),
+        )
+
+    def test_stream_response_type(self):
+        response = StreamingApiResponse(
+            [1, 2], response_type=ResponseType.ResourceNotFound, msg="msg"
+        )
+
+        render_data = json.loads(self.get_content(response))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            render_data["code"], ResponseType.ResourceNotFound.code
+        )
+        self.assertEqual(render_data["msg"], "msg")
+        self.assertEqual(render_data["data"], [1, 2])
+
+    def test_stream_queryset(self):
+        baker.make(User, _quantity=5)
+        queryset = User.objects.all()
+
+        with patch.object(
+            QuerySet, "iterator", autospec=True, side_effect=QuerySet.iterator
+        ) as mock_iterator:
+            response = StreamingApiResponse(
+                queryset, serializer_class=UserSerializer, chunk_size=2
+            )
+            render_data = json.loads(self.get_content(response))
+            mock_iterator.assert_called_once_with(queryset, chunk_size=2)
+
+        self.assertEqual(
+            [item["id"] for item in render_data["data"]],
+            list(queryset.values_list("id", flat=True)),
+        )
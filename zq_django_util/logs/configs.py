@@ -19,6 +19,7 @@ DrfLoggerSettingDict = TypedDict(
         "METHODS": Optional[List[str]],
         "STATUS_CODES": Optional[List[int]],
         "SENSITIVE_KEYS": List[str],
+        "REQUEST_DATA_MAX_SIZE": int,  # byte
         "ADMIN_SLOW_API_ABOVE": int,  # ms
         "ADMIN_TIMEDELTA": int,  # minute
     },
@@ -41,6 +42,7 @@ class DrfLoggerSettings(PackageSettings):
         "METHODS": None,
         "STATUS_CODES": None,
         "SENSITIVE_KEYS": ["password", "token", "access", "refresh"],
+        "REQUEST_DATA_MAX_SIZE": 64 * 1024,
         "ADMIN_SLOW_API_ABOVE": 500,
         "ADMIN_TIMEDELTA": 0,
     }
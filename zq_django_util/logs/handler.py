@@ -8,7 +8,6 @@ from typing import Dict, List, Optional
 
 from django.core.files.uploadedfile import UploadedFile
 from django.db.utils import OperationalError
-from django.urls import resolve
 from django.utils import timezone
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -27,6 +26,7 @@ from zq_django_util.logs.utils import (
     close_old_database_connections,
     get_client_ip,
     get_headers,
+    is_request_skipped,
     mask_sensitive_data,
 )
 from zq_django_util.response.types import ApiExceptionResponse, JSONVal
@@ -85,16 +85,7 @@ class HandleLogAsync(Thread):
         if not drf_logger_settings.DATABASE and not drf_logger_settings.SIGNAL:
             return
 
-        url_name = resolve(request.path_info).url_name
-        namespace = resolve(request.path_info).namespace
-
-        # Always skip Admin panel
-        if (
-            namespace == "admin"
-            or namespace == "__debug__"
-            or url_name in drf_logger_settings.SKIP_URL_NAME
-            or namespace in drf_logger_settings.SKIP_NAMESPACE
-        ):
+        if is_request_skipped(request):  # 跳过的路径与方法
             return
 
         # Only log required status codes if matching
@@ -104,13 +95,6 @@ class HandleLogAsync(Thread):
         ):
             return
 
-        # Log only registered methods if available.
-        if (
-            drf_logger_settings.METHODS is not None
-            and request.method not in drf_logger_settings.METHODS
-        ):
-            return
-
         # endregion
         data = self.get_request_log_data(
             request, response, start_time, end_time
@@ -1,8 +1,10 @@
+import io
 import re
-from typing import Dict
+from typing import Dict, Optional
 
 from django.db import close_old_connections
-from rest_framework.request import Request
+from django.urls import resolve
+from rest_framework.request import Empty, Request
 
 from zq_django_util.logs.configs import drf_logger_settings
 from zq_django_util.response.types import JSONVal
@@ -41,6 +43,90 @@ def database_log_enabled() -> bool:
     return drf_logger_settings.DATABASE
 
 
+def is_request_skipped(request: Request) -> bool:
+    """
+    判断请求是否跳过日志记录(admin、debug 及配置中跳过的 url name、namespace 与方法)
+    """
+    resolver_match = getattr(request, "resolver_match", None) or resolve(
+        request.path_info
+    )
+    url_name = resolver_match.url_name
+    namespace = resolver_match.namespace
+
+    # Always skip Admin panel
+    if (
+        namespace == "admin"
+        or namespace == "__debug__"
+        or url_name in drf_logger_settings.SKIP_URL_NAME
+        or namespace in drf_logger_settings.SKIP_NAMESPACE
+    ):
+        return True
+
+    # Log only registered methods if available.
+    if (
+        drf_logger_settings.METHODS is not None
+        and request.method not in drf_logger_settings.METHODS
+    ):
+        return True
+
+    return False
+
+
+def get_request_body_size(request: Request) -> Optional[int]:
+    """
+    获取请求体大小(不读取请求体)
+
+    优先使用 Content-Length，否则使用已读取的请求体或可定位的请求流(如 ASGI)
+    :return: 请求体大小，无法确定时为 None
+    """
+    try:
+        return int(request.META["CONTENT_LENGTH"])
+    except (KeyError, ValueError, TypeError):
+        pass
+
+    http_request = getattr(request, "_request", request)
+    body = getattr(http_request, "_body", None)
+    if body is not None:
+        return len(body)
+
+    stream = getattr(http_request, "_stream", None)
+    try:
+        if stream is not None and stream.seekable():
+            position = stream.tell()
+            size = stream.seek(0, io.SEEK_END)
+            stream.seek(position)
+            return size
+    except (AttributeError, OSError, ValueError):
+        pass
+    return None
+
+
+def get_request_data(request: Request) -> Dict[str, JSONVal]:
+    """
+    获取用于日志记录的请求数据
+
+    视图已解析过的请求数据直接使用(上传文件由日志处理记录文件信息)；
+    未解析且请求体超过 REQUEST_DATA_MAX_SIZE 时不解析，避免解析大文件上传
+    """
+    if getattr(request, "_full_data", Empty) is not Empty:
+        return request.data
+
+    size = get_request_body_size(request)
+    if size is not None and size > drf_logger_settings.REQUEST_DATA_MAX_SIZE:
+        return {"__content__": f"not parsed (size: {size})"}
+
+    if "CONTENT_LENGTH" not in request.META:
+        # drf 不解析无 Content-Length 的请求体(如 chunked)，仅记录大小
+        if size:
+            return {"__content__": f"not parsed (size: {size})"}
+        if "chunked" in request.META.get("HTTP_TRANSFER_ENCODING", "").lower():
+            return {"__content__": "not parsed (size: unknown)"}
+        return {}
+    if not size:  # 无请求体
+        return {}
+    return request.data
+
+
 def mask_sensitive_data(data: JSONVal) -> JSONVal:
     """
     Hides sensitive keys specified in sensitive_keys settings.
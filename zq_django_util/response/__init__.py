@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from enum import Enum, unique
-from typing import TYPE_CHECKING, Optional
+from enum import Enum, EnumMeta, unique
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple
 
 from django.http import JsonResponse
 
@@ -9,33 +10,71 @@ if TYPE_CHECKING:
     from zq_django_util.response.types import JSONVal, ResponseData
 
 
-class ResponseTypeEnum(Enum):
-    @property
-    def code(self) -> str:
-        """
-        根据枚举名称取状态码code
+class ResponseTypeMeta(EnumMeta):
+    """
+    ResponseType 元类，在类创建时建立 code、status_code 索引
+    """
 
-        :return: 状态码code
-        """
-        return self.value[0]
+    def __new__(mcs, *args: Any, **kwargs: Any):
+        enum_class = super().__new__(mcs, *args, **kwargs)
+
+        code_map: Dict[str, "ResponseTypeEnum"] = {}
+        status_code_map: Dict[int, List["ResponseTypeEnum"]] = {}
+        for member in enum_class:
+            code_map.setdefault(member.code, member)  # 重复 code 取首个定义
+            status_code_map.setdefault(member.status_code, []).append(member)
+
+        enum_class._code_map = MappingProxyType(code_map)
+        enum_class._status_code_map = MappingProxyType(
+            {k: tuple(v) for k, v in status_code_map.items()}
+        )
+        return enum_class
+
+
+class ResponseTypeEnum(Enum, metaclass=ResponseTypeMeta):
+    """
+    ResponseType 基类
+
+    成员值为 (code, detail, status_code)，创建时解析为成员属性:
+
+    - code: 状态码code
+    - detail: 状态说明message
+    - status_code: 状态码status_code
+    """
+
+    code: str
+    detail: str
+    status_code: int
+
+    _code_map: Mapping[str, "ResponseTypeEnum"]
+    _status_code_map: Mapping[int, Tuple["ResponseTypeEnum", ...]]
+
+    def __init__(self, code: str, detail: str, status_code: int) -> None:
+        self.code = code
+        self.detail = detail
+        self.status_code = status_code
 
-    @property
-    def detail(self) -> str:
+    @classmethod
+    def get_by_code(cls, code: str) -> Optional["ResponseTypeEnum"]:
         """
-        根据枚举名称取状态说明message
+        根据状态码code获取响应类型(code 重复时返回首个定义的类型)
 
-        :return: 状态说明message
+        :param code: 状态码code
+        :return: 响应类型，不存在时为 None
         """
-        return self.value[1]
+        return cls._code_map.get(code)
 
-    @property
-    def status_code(self) -> int:
+    @classmethod
+    def get_by_status_code(
+        cls, status_code: int
+    ) -> Tuple["ResponseTypeEnum", ...]:
         """
-        根据枚举名称取状态码status_code
+        根据状态码status_code获取响应类型
 
-        :return: 状态码status_code
+        :param status_code: 状态码status_code
+        :return: 响应类型元组，按定义顺序排列
         """
-        return self.value[2]
+        return cls._status_code_map.get(status_code, ())
 
 
 # region ResponseType
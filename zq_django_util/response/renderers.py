@@ -1,11 +1,33 @@
 # 自定义返回格式
-from typing import Any, Mapping, Optional
+import math
+from decimal import Decimal
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, Optional
 
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
 from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import json
 
-from zq_django_util.response import ApiResponse
+from zq_django_util.logs.utils import (
+    get_request_data,
+    is_api_logger_enabled,
+    is_request_skipped,
+)
+from zq_django_util.response import ApiResponse, ResponseType
+from zq_django_util.response.templates import (
+    ResponseTemplate,
+    escape_line_separators,
+    get_default_response_type,
+    get_response_template,
+    is_response_data,
+)
 from zq_django_util.response.types import ApiExceptionResponse
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 class CustomRenderer(JSONRenderer):
     # 重构render方法
@@ -18,12 +40,212 @@ class CustomRenderer(JSONRenderer):
         if renderer_context:
             response: ApiExceptionResponse = renderer_context["response"]
             try:  # 记录请求数据，便于日志处理
-                request_data = renderer_context["request"].data
-                response.api_request_data = request_data
+                request = renderer_context["request"]
+                if is_api_logger_enabled() and not is_request_skipped(request):
+                    response.api_request_data = get_request_data(request)
             except Exception:
                 pass
 
             if not response.exception:  # 如果不是异常
-                data = ApiResponse(data=data).__dict__()  # 将data包装成ApiResponse
+                if self.can_use_template(accepted_media_type, renderer_context):
+                    return self.render_success_template(data)
+                data = ApiResponse(
+                    data=data
+                ).__dict__()  # 将data包装成ApiResponse
+            elif self.can_use_error_template(
+                data, response, accepted_media_type, renderer_context
+            ):  # 不记录的异常使用预编码模板
+                return self.render_error_template(data)
 
         return super().render(data, accepted_media_type, renderer_context)
+
+    def can_use_template(
+        self,
+        accepted_media_type: Optional[str],
+        renderer_context: Mapping[str, Any],
+    ) -> bool:
+        """
+        判断能否使用预编码模板(需要缩进时使用标准渲染)
+        """
+        return self.get_indent(accepted_media_type, renderer_context) is None
+
+    def can_use_error_template(
+        self,
+        data: Any,
+        response: ApiExceptionResponse,
+        accepted_media_type: Optional[str],
+        renderer_context: Mapping[str, Any],
+    ) -> bool:
+        """
+        判断异常响应能否使用预编码模板
+
+        需记录的异常 detail 与 msg 中包含 eid，每次均不同，不使用模板；
+        自定义 detail 或 msg 的异常同样使用标准渲染
+        """
+        return (
+            not getattr(response, "exception_data", None)
+            and is_response_data(data)
+            and get_default_response_type(data) is not None
+            and self.can_use_template(accepted_media_type, renderer_context)
+        )
+
+    def render_success_template(self, data: Any) -> bytes:
+        """
+        使用预编码模板渲染正常响应，无需构建 ApiResponse 字典
+        :param data: 响应内容
+        :return: 响应体
+        """
+        template = get_response_template(
+            ResponseType.Success, self.ensure_ascii, self.compact
+        )
+        return template.render(self.encode(data))
+
+    def render_error_template(self, data: Any) -> bytes:
+        """
+        使用预编码模板渲染异常响应，仅编码 data 部分
+        :param data: 异常响应数据
+        :return: 响应体
+        """
+        template = get_response_template(
+            get_default_response_type(data), self.ensure_ascii, self.compact
+        )
+        return template.render(self.encode(data["data"]))
+
+    def encode(self, data: Any) -> bytes:
+        """
+        与 JSONRenderer 相同配置的 json 编码
+        :param data: 待编码数据
+        :return: 编码结果
+        """
+        ret = json.dumps(
+            data,
+            cls=self.encoder_class,
+            ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict,
+            separators=SHORT_SEPARATORS if self.compact else LONG_SEPARATORS,
+        )
+        return escape_line_separators(ret).encode()
+
+
+class OrjsonRenderer(CustomRenderer):
+    """
+    基于 orjson 的高性能渲染器
+
+    datetime、Decimal、lazy string 等类型仍交由 drf 的 JSONEncoder 处理，
+    orjson 无法编码的数据(如超过 64 位的整数)、包含 NaN 或 Infinity 的数据
+    以及未安装 orjson 时回退至标准 json 编码
+
+    注意：浮点数的指数形式与标准 json 不同(如 1e16 与 1e+16)，数值一致
+    """
+
+    def encode(self, data: Any) -> bytes:
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().encode(data)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except TypeError:  # orjson.JSONEncodeError 为 TypeError 子类
+            return super().encode(data)
+
+        # orjson 将 NaN 与 Infinity 输出为 null，交由标准 json 编码(strict 时抛出异常)
+        if b"null" in ret and has_non_finite(data):
+            return super().encode(data)
+
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+def has_non_finite(data: Any) -> bool:
+    """
+    数据中是否包含 NaN 或 Infinity
+    :param data: 待编码数据
+    :return: 是否包含
+    """
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, Decimal):
+        return not data.is_finite()
+    if isinstance(data, dict):
+        return any(has_non_finite(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(has_non_finite(value) for value in data)
+    return False
+
+
+class StreamingRenderer(CustomRenderer):
+    """
+    流式响应渲染器
+
+    依次输出 `{"code":..,"detail":..,"msg":..,"data":[` 前缀、分批编码的数据项与结尾，
+    配合 StreamingApiResponse 以恒定内存返回大量数据
+
+    如需使用 orjson，可同时继承 OrjsonRenderer
+    """
+
+    def render_stream(
+        self,
+        items: Iterable[Any],
+        response_type: ResponseType = ResponseType.Success,
+        msg: Optional[str] = None,
+        chunk_size: int = 1000,
+        serialize: Optional[Callable[[List[Any]], Iterable[Any]]] = None,
+    ) -> Iterator[bytes]:
+        """
+        流式渲染
+        :param items: 数据项(可为生成器)
+        :param response_type: 响应类型
+        :param msg: 面向用户的响应消息
+        :param chunk_size: 每批编码的数据项数量
+        :param serialize: 每批数据项的序列化函数
+        :return: 响应体分块
+        """
+        if msg and msg != response_type.detail:  # 自定义提示信息不缓存模板
+            template = ResponseTemplate(
+                response_type.code,
+                response_type.detail,
+                msg,
+                self.ensure_ascii,
+                self.compact,
+            )
+        else:
+            template = get_response_template(
+                response_type, self.ensure_ascii, self.compact
+            )
+        yield template.prefix + b"["
+
+        separator = b"," if self.compact else b", "
+        first = True
+        for chunk in self.get_chunks(items, chunk_size):
+            if serialize is not None:
+                chunk = serialize(chunk)
+            body = separator.join(self.encode(item) for item in chunk)
+            if not body:
+                continue
+            yield body if first else separator + body
+            first = False
+
+        yield b"]}"
+
+    @staticmethod
+    def get_chunks(
+        items: Iterable[Any], chunk_size: int
+    ) -> Iterator[List[Any]]:
+        """
+        将数据项分批
+        :param items: 数据项
+        :param chunk_size: 每批数量
+        :return: 分批数据项
+        """
+        iterator = iter(items)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield chunk
@@ -0,0 +1,59 @@
+from typing import Any, Dict, Iterable, List, Optional, Type
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework.serializers import BaseSerializer
+
+from zq_django_util.response import ResponseType
+from zq_django_util.response.renderers import StreamingRenderer
+
+
+class StreamingApiResponse(StreamingHttpResponse):
+    """
+    流式 API 响应
+
+    以标准响应格式 `{code, detail, msg, data: [...]}` 分批输出数据，
+    用于不分页的大量数据导出等场景
+    """
+
+    def __init__(
+        self,
+        items: Iterable[Any],
+        serializer_class: Optional[Type[BaseSerializer]] = None,
+        serializer_context: Optional[Dict[str, Any]] = None,
+        response_type: ResponseType = ResponseType.Success,
+        msg: Optional[str] = None,
+        chunk_size: int = 1000,
+        renderer_class: Type[StreamingRenderer] = StreamingRenderer,
+        **kwargs: Any,
+    ) -> None:
+        """
+        流式 API 响应
+        :param items: 数据项，可为生成器或 QuerySet(将使用 iterator 逐批读取)
+        :param serializer_class: 序列化器，每批数据项使用 many=True 序列化
+        :param serializer_context: 序列化器 context
+        :param response_type: 响应类型
+        :param msg: 面向用户的响应消息
+        :param chunk_size: 每批数据项数量
+        :param renderer_class: 流式渲染器
+        """
+        if isinstance(items, QuerySet):  # 不缓存查询结果
+            items = items.iterator(chunk_size=chunk_size)
+
+        def serialize(chunk: List[Any]) -> Iterable[Any]:
+            return serializer_class(
+                chunk, many=True, context=serializer_context or {}
+            ).data
+
+        kwargs.setdefault("status", response_type.status_code)
+        kwargs.setdefault("content_type", renderer_class.media_type)
+        super().__init__(
+            renderer_class().render_stream(
+                items,
+                response_type=response_type,
+                msg=msg,
+                chunk_size=chunk_size,
+                serialize=serialize if serializer_class else None,
+            ),
+            **kwargs,
+        )
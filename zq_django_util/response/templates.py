@@ -0,0 +1,122 @@
+# 响应预编码模板
+import json
+from functools import lru_cache
+from typing import Any, Optional
+
+from zq_django_util.response import ResponseType, ResponseTypeEnum
+
+RESPONSE_TEMPLATE_CACHE_SIZE = 256
+
+
+def escape_line_separators(value: str) -> str:
+    """
+    与 drf JSONRenderer 保持一致，转义 U+2028 与 U+2029
+    """
+    return value.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+
+
+class ResponseTemplate:
+    """
+    响应模板
+
+    预先编码 `{"code":..,"detail":..,"msg":..,"data":` 前缀，
+    渲染时只编码可变的 data 部分并拼接，无需构建中间字典
+    """
+
+    __slots__ = ("code", "detail", "msg", "prefix")
+
+    code: str
+    detail: str
+    msg: str
+    prefix: bytes
+
+    def __init__(
+        self,
+        code: str,
+        detail: str,
+        msg: str,
+        ensure_ascii: bool = False,
+        compact: bool = True,
+    ) -> None:
+        """
+        响应模板
+        :param code: 状态码
+        :param detail: 响应详情
+        :param msg: 用户提示
+        :param ensure_ascii: 是否转义非 ascii 字符
+        :param compact: 是否使用紧凑分隔符
+        """
+        self.code = code
+        self.detail = detail
+        self.msg = msg
+
+        item_sep, key_sep = (",", ":") if compact else (", ", ": ")
+        fields = [
+            f"{json.dumps(key)}{key_sep}{json.dumps(value, ensure_ascii=ensure_ascii)}"
+            for key, value in (("code", code), ("detail", detail), ("msg", msg))
+        ]
+        prefix = "{" + item_sep.join(fields) + f'{item_sep}"data"{key_sep}'
+        self.prefix = escape_line_separators(prefix).encode()
+
+    def render(self, data: bytes) -> bytes:
+        """
+        将已编码的 data 拼接至模板
+        :param data: 已编码的 data 部分
+        :return: 完整响应体
+        """
+        return self.prefix + data + b"}"
+
+
+@lru_cache(maxsize=RESPONSE_TEMPLATE_CACHE_SIZE)
+def get_response_template(
+    response_type: ResponseTypeEnum,
+    ensure_ascii: bool = False,
+    compact: bool = True,
+) -> ResponseTemplate:
+    """
+    获取响应类型默认提示信息的响应模板(按 ResponseType 缓存)
+
+    自定义 detail 或 msg 的响应不使用模板，避免缓存数量随提示信息增长
+    :param response_type: 响应类型
+    :param ensure_ascii: 是否转义非 ascii 字符
+    :param compact: 是否使用紧凑分隔符
+    :return: 响应模板
+    """
+    return ResponseTemplate(
+        response_type.code,
+        response_type.detail,
+        response_type.detail,
+        ensure_ascii,
+        compact,
+    )
+
+
+def get_default_response_type(data: Any) -> Optional[ResponseTypeEnum]:
+    """
+    获取响应数据对应的响应类型(仅 detail 与 msg 均为默认值时)
+    :param data: 标准结构的响应数据
+    :return: 响应类型，不存在或提示信息非默认值时为 None
+    """
+    response_type = ResponseType.get_by_code(data["code"])
+    if (
+        response_type is None
+        or data["detail"] != response_type.detail
+        or data["msg"] != response_type.detail
+    ):
+        return None
+    return response_type
+
+
+def is_response_data(data: Any) -> bool:
+    """
+    判断数据是否为标准响应结构
+    :param data: 响应数据
+    :return: 是否为标准结构
+    """
+    return (
+        type(data) is dict
+        and list(data) == ["code", "detail", "msg", "data"]
+        and type(data["code"]) is str
+        and type(data["detail"]) is str
+        and type(data["msg"]) is str
+    )
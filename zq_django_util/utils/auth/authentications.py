@@ -4,9 +4,11 @@ from typing import Any, Dict, Optional
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
 
 from zq_django_util.exceptions import ApiException
 from zq_django_util.response import ResponseType
+from zq_django_util.utils.auth.cache import token_cache, user_cache
 
 
 class ActiveUserAuthentication(JWTAuthentication):
@@ -20,6 +22,19 @@ class ActiveUserAuthentication(JWTAuthentication):
         super().__init__(*args, **kwargs)
         self.user_model = self.AuthUser
 
+    def get_validated_token(self, raw_token: bytes) -> Token:
+        """
+        验证 token，开启 TOKEN_CACHE 时复用已验证的 token
+        """
+        if not token_cache.enabled:
+            return super().get_validated_token(raw_token)
+
+        validated_token = token_cache.get(raw_token)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            token_cache.set(raw_token, validated_token)
+        return validated_token
+
     def get_user(self, validated_token: Dict[str, Any]) -> Optional[AuthUser]:
         """
         Attempts to find and return a user using the given validated token.
@@ -33,14 +48,19 @@ class ActiveUserAuthentication(JWTAuthentication):
             )  # token 不存在, 认证失败
 
         # 获取用户模型
-        try:
-            user = self.user_model.objects.get(
-                **{api_settings.USER_ID_FIELD: user_id}
-            )
-        except self.user_model.DoesNotExist:
-            raise ApiException(
-                ResponseType.ResourceNotFound, "用户不存在", record=True
-            )  # 用户不存在, 认证失败
+        user = user_cache.get(user_id) if user_cache.enabled else None
+        if user is None:
+            try:
+                user = self.user_model.objects.get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise ApiException(
+                    ResponseType.ResourceNotFound, "用户不存在", record=True
+                )  # 用户不存在, 认证失败
+
+            if user_cache.enabled:
+                user_cache.set(user_id, user)
 
         self.check_activate(user)  # 检查用户激活类型
 
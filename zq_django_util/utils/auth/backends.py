@@ -2,13 +2,16 @@
 # 由于项目不使用django认证权限管理，backend不通过django的认证模块调用
 # https://docs.djangoproject.com/zh-hans/4.1/topics/auth/customizing/
 
-from typing import Any, Optional
+from contextlib import contextmanager, suppress
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import BaseBackend
 from rest_framework.request import Request
+from rest_framework_simplejwt.settings import api_settings
 
+from zq_django_util.utils.auth.cache import user_cache
 from zq_django_util.utils.auth.exceptions import (
     OpenIdNotBound,
     OpenIdNotProvided,
@@ -26,6 +29,8 @@ class OpenIdBackend(BaseBackend):
         settings, "OPENID_FIELD", "openid"
     )  # 获取 openid 字段名
 
+    chunk_size: int = 500  # 批量查询时每条 IN 语句的最大参数数量
+
     def __init__(self, auth_user_model=None):
         super().__init__()
         if auth_user_model:
@@ -49,21 +54,66 @@ class OpenIdBackend(BaseBackend):
 
         :return: openid 对应用户对象
         """
+        openid = self.get_openid(kwargs, raise_exception)
+        if openid is None:
+            return None
+
+        with self.handle_not_bound(openid, raise_exception):
+            return self.AuthUser.objects.get(**{self.openid_field: openid})
+        return None
+
+    async def aauthenticate(
+        self,
+        request: Optional[Request] = None,
+        raise_exception: bool = False,
+        **kwargs: Any,
+    ) -> Optional[AuthUser]:
+        """
+        异步认证方法，使用 django 异步 ORM，参数与 authenticate 一致
+        """
+        openid = self.get_openid(kwargs, raise_exception)
+        if openid is None:
+            return None
+
+        with self.handle_not_bound(openid, raise_exception):
+            return await self.AuthUser.objects.aget(
+                **{self.openid_field: openid}
+            )
+        return None
+
+    def get_openid(
+        self, kwargs: Dict[str, Any], raise_exception: bool = False
+    ) -> Optional[str]:
+        """
+        从认证参数中获取 openid
+
+        :param kwargs: 认证参数
+
+        :param raise_exception: 未传入 openid 时是否抛出 OpenIdNotProvided
+
+        :return: openid，未传入时为 None
+        """
         openid = kwargs.get(self.openid_field, None)
+        if openid is None and raise_exception:
+            raise OpenIdNotProvided
+        return openid
+
+    @contextmanager
+    def handle_not_bound(
+        self, openid: str, raise_exception: bool = False
+    ) -> Iterator[None]:
+        """
+        处理 openid 对应用户不存在
+
+        :param openid: openid
 
+        :param raise_exception: 是否抛出 OpenIdNotBound，否则忽略
+        """
         try:
-            # 未传入openid 认证失败
-            if openid is None:
-                raise OpenIdNotProvided
-            # 获取 openid 对应用户
-            try:
-                return self.AuthUser.objects.get(**{self.openid_field: openid})
-            except self.AuthUser.DoesNotExist:
-                raise OpenIdNotBound(openid)
-        except (OpenIdNotProvided, OpenIdNotBound) as e:
+            yield
+        except self.AuthUser.DoesNotExist:
             if raise_exception:
-                raise e
-            return None
+                raise OpenIdNotBound(openid)
 
     def get_user(self, user_id: int) -> Optional[AuthUser]:
         """
@@ -73,8 +123,71 @@ class OpenIdBackend(BaseBackend):
 
         :return: 用户对象
         """
-        try:
-            user = self.AuthUser.objects.get(pk=user_id)
-        except self.AuthUser.DoesNotExist:  # 用户不存在, 返回 None
-            return None
-        return user
+        with suppress(self.AuthUser.DoesNotExist):  # 用户不存在, 返回 None
+            return self.AuthUser.objects.get(pk=user_id)
+        return None
+
+    async def aget_user(self, user_id: int) -> Optional[AuthUser]:
+        """
+        异步用户获取方法，参数与 get_user 一致
+        """
+        with suppress(self.AuthUser.DoesNotExist):  # 用户不存在, 返回 None
+            return await self.AuthUser.objects.aget(pk=user_id)
+        return None
+
+    def authenticate_many(self, openids: Iterable[str]) -> Dict[str, AuthUser]:
+        """
+        批量认证
+
+        :param openids: openid 列表
+
+        :return: openid -> 用户对象，未绑定的 openid 不包含在结果中
+        """
+        return self._get_users_by(self.openid_field, openids)
+
+    def get_users(self, user_ids: Iterable[int]) -> Dict[int, AuthUser]:
+        """
+        批量获取用户
+
+        :param user_ids: uid 列表
+
+        :return: uid -> 用户对象，不存在的 uid 不包含在结果中
+        """
+        return self._get_users_by("pk", user_ids)
+
+    def _get_users_by(
+        self, field_name: str, values: Iterable[Any]
+    ) -> Dict[Any, AuthUser]:
+        """
+        按字段分批使用 IN 查询用户，并写入认证用户缓存
+
+        :param field_name: 查询字段名
+
+        :param values: 字段值列表
+
+        :return: 字段值 -> 用户对象
+        """
+        values: List[Any] = list(
+            dict.fromkeys(value for value in values if value is not None)
+        )  # 去重并保持顺序
+        attname = (
+            self.AuthUser._meta.pk.attname if field_name == "pk" else field_name
+        )
+
+        users = {}
+        for i in range(0, len(values), self.chunk_size):
+            chunk = values[i : i + self.chunk_size]
+            for user in self.AuthUser.objects.filter(
+                **{f"{field_name}__in": chunk}
+            ):
+                users[getattr(user, attname)] = user
+
+        if user_cache.enabled and self.AuthUser is get_user_model():
+            user_cache.set_many(
+                {
+                    getattr(user, api_settings.USER_ID_FIELD): user
+                    for user in users.values()
+                }
+            )
+
+        return users
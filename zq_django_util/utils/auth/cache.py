@@ -0,0 +1,249 @@
+# 认证用户缓存
+import copy
+import time
+from typing import Any, Dict, Optional, Union
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from zq_django_util.utils.auth.configs import zq_auth_settings
+from zq_django_util.utils.cache import LRUCache
+
+AuthUser = get_user_model()
+
+
+class UserCache:
+    """
+    认证用户缓存
+
+    进程内 LRU(较短过期时间) + django cache 两级缓存，按 USER_ID_FIELD 缓存用户对象，
+    用户保存或删除时自动失效
+    """
+
+    KEY_PREFIX = "zq_auth:user"
+
+    local: LRUCache
+
+    def __init__(self) -> None:
+        self.local = LRUCache(maxsize=zq_auth_settings.USER_CACHE_LOCAL_SIZE)
+
+    @property
+    def enabled(self) -> bool:
+        return zq_auth_settings.USER_CACHE
+
+    def get_key(self, user_id: Any) -> str:
+        """
+        获取缓存 key
+        :param user_id: USER_ID_FIELD 对应的值
+        :return: 缓存 key
+        """
+        return f"{self.KEY_PREFIX}:{api_settings.USER_ID_FIELD}:{user_id}"
+
+    def get(self, user_id: Any) -> Optional[AuthUser]:
+        """
+        获取缓存的用户(返回副本，修改不影响缓存)
+        :param user_id: USER_ID_FIELD 对应的值
+        :return: 用户对象，未缓存时为 None
+        """
+        key = self.get_key(user_id)
+        user = self.local.get(key)
+        if user is None:
+            try:
+                user = cache.get(key)
+            except Exception:  # 缓存服务异常，回退至数据库查询
+                return None
+            if user is None:
+                return None
+            self.local.set(key, user, zq_auth_settings.USER_CACHE_LOCAL_TIMEOUT)
+        return copy.copy(user)
+
+    def set(self, user_id: Any, user: AuthUser) -> None:
+        """
+        缓存用户
+        :param user_id: USER_ID_FIELD 对应的值
+        :param user: 用户对象
+        :return:
+        """
+        key = self.get_key(user_id)
+        user = copy.copy(user)
+        self.local.set(key, user, zq_auth_settings.USER_CACHE_LOCAL_TIMEOUT)
+        try:
+            cache.set(key, user, zq_auth_settings.USER_CACHE_TIMEOUT)
+        except Exception:
+            pass
+
+    def set_many(self, users: Dict[Any, AuthUser]) -> None:
+        """
+        批量缓存用户
+        :param users: USER_ID_FIELD 对应的值 -> 用户对象
+        :return:
+        """
+        data = {}
+        for user_id, user in users.items():
+            key = self.get_key(user_id)
+            user = copy.copy(user)
+            self.local.set(key, user, zq_auth_settings.USER_CACHE_LOCAL_TIMEOUT)
+            data[key] = user
+        try:
+            cache.set_many(data, zq_auth_settings.USER_CACHE_TIMEOUT)
+        except Exception:
+            pass
+
+    def delete(self, user_id: Any) -> None:
+        """
+        删除缓存
+        :param user_id: USER_ID_FIELD 对应的值
+        :return:
+        """
+        key = self.get_key(user_id)
+        self.local.delete(key)
+        try:
+            cache.delete(key)
+        except Exception:
+            pass
+
+
+user_cache = UserCache()
+
+
+def invalidate_user_cache(
+    sender: Any, instance: AuthUser, **kwargs: Any
+) -> None:
+    """
+    用户保存或删除时清除缓存(包括 is_active 变更)
+    """
+    user_cache.delete(getattr(instance, api_settings.USER_ID_FIELD))
+
+
+post_save.connect(
+    invalidate_user_cache,
+    sender=AuthUser,
+    dispatch_uid="zq_auth_user_cache_post_save",
+)
+post_delete.connect(
+    invalidate_user_cache,
+    sender=AuthUser,
+    dispatch_uid="zq_auth_user_cache_post_delete",
+)
+
+
+class TokenCache:
+    """
+    已验证 token 缓存
+
+    进程内 LRU 缓存，按原始 token 缓存验证后的 token 对象，过期时间与 token 的 exp 一致，
+    命中时跳过签名校验与 payload 解码
+    """
+
+    local: LRUCache
+
+    def __init__(self) -> None:
+        self.local = LRUCache(maxsize=zq_auth_settings.TOKEN_CACHE_SIZE)
+
+    @property
+    def enabled(self) -> bool:
+        return zq_auth_settings.TOKEN_CACHE
+
+    @staticmethod
+    def get_key(raw_token: Union[bytes, str]) -> str:
+        """
+        获取缓存 key
+        :param raw_token: 原始 token
+        :return: 缓存 key
+        """
+        if isinstance(raw_token, bytes):
+            return raw_token.decode("latin-1")
+        return raw_token
+
+    def get(self, raw_token: Union[bytes, str]) -> Optional[Token]:
+        """
+        获取已验证的 token
+        :param raw_token: 原始 token
+        :return: token 对象，未缓存或已过期时为 None
+        """
+        return self.local.get(self.get_key(raw_token))
+
+    def set(self, raw_token: Union[bytes, str], token: Token) -> None:
+        """
+        缓存已验证的 token，在 token 过期时失效
+        :param raw_token: 原始 token
+        :param token: 验证后的 token 对象
+        :return:
+        """
+        exp = token.get("exp")
+        if exp is None:  # 无过期时间的 token 不缓存
+            return
+        self.local.set(self.get_key(raw_token), token, exp - time.time())
+
+    def revoke(self, raw_token: Union[bytes, str]) -> None:
+        """
+        撤销单个 token 的缓存
+        :param raw_token: 原始 token
+        :return:
+        """
+        self.local.delete(self.get_key(raw_token))
+
+    def purge_user(self, user_id: Any) -> None:
+        """
+        撤销某一用户所有 token 的缓存
+        :param user_id: USER_ID_FIELD 对应的值(如 UUID)或 USER_ID_CLAIM 中的值
+        :return:
+        """
+        user_id = self.normalize_user_id(user_id)
+        for key, token in self.local.items():
+            claim = token.get(api_settings.USER_ID_CLAIM)
+            if claim is not None and self.normalize_user_id(claim) == user_id:
+                self.local.delete(key)
+
+    @staticmethod
+    def normalize_user_id(user_id: Any) -> Union[int, str]:
+        """
+        与 Token.for_user 一致，非 int 类型的用户 id 转换为 str
+        :param user_id: 用户 id
+        :return: token 中的用户 id
+        """
+        if isinstance(user_id, int):
+            return user_id
+        return str(user_id)
+
+    def clear(self) -> None:
+        """
+        清空缓存
+        :return:
+        """
+        self.local.clear()
+
+
+token_cache = TokenCache()
+
+
+def revoke_blacklisted_token(sender: Any, instance: Any, **kwargs: Any) -> None:
+    """
+    token 加入黑名单时清除缓存
+
+    access token 与 refresh token 无关联，因此清除该用户的全部缓存 token
+    """
+    outstanding = instance.token
+    token_cache.revoke(outstanding.token)
+    if outstanding.user is None:
+        token_cache.clear()
+    else:
+        token_cache.purge_user(
+            getattr(outstanding.user, api_settings.USER_ID_FIELD)
+        )
+
+
+if apps.is_installed("rest_framework_simplejwt.token_blacklist"):
+    from rest_framework_simplejwt.token_blacklist.models import (
+        BlacklistedToken,
+    )
+
+    post_save.connect(
+        revoke_blacklisted_token,
+        sender=BlacklistedToken,
+        dispatch_uid="zq_auth_token_cache_blacklist",
+    )
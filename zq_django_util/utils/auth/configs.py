@@ -0,0 +1,60 @@
+from typing import List, Optional, TypedDict
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from zq_django_util.utils.package_settings import PackageSettings
+
+ZqAuthSettingDict = TypedDict(
+    "ZqAuthSettingDict",
+    {
+        "USER_CACHE": bool,
+        "USER_CACHE_TIMEOUT": int,  # second
+        "USER_CACHE_LOCAL_SIZE": int,
+        "USER_CACHE_LOCAL_TIMEOUT": int,  # second
+        "TOKEN_CACHE": bool,
+        "TOKEN_CACHE_SIZE": int,
+        "WECHAT_APP_ID": Optional[str],
+        "WECHAT_APP_SECRET": Optional[str],
+        "WECHAT_API_BASE": str,
+        "WECHAT_CONNECT_TIMEOUT": float,  # second
+        "WECHAT_READ_TIMEOUT": float,  # second
+        "WECHAT_RETRIES": int,
+        "WECHAT_POOL_SIZE": int,
+        "WECHAT_CODE_CACHE_TIMEOUT": int,  # second
+        "PASSWORD_HASHER": Optional[str],
+    },
+    total=True,
+)
+
+
+class ZqAuthSettings(PackageSettings):
+    setting_name = "ZQ_AUTH"
+
+    DEFAULTS: ZqAuthSettingDict = {
+        "USER_CACHE": False,  # 缓存认证用户
+        "USER_CACHE_TIMEOUT": 60,
+        "USER_CACHE_LOCAL_SIZE": 1024,
+        "USER_CACHE_LOCAL_TIMEOUT": 5,
+        "TOKEN_CACHE": False,  # 缓存已验证的 token
+        "TOKEN_CACHE_SIZE": 4096,
+        "WECHAT_APP_ID": None,  # 小程序 appid
+        "WECHAT_APP_SECRET": None,
+        "WECHAT_API_BASE": "https://api.weixin.qq.com",
+        "WECHAT_CONNECT_TIMEOUT": 3,
+        "WECHAT_READ_TIMEOUT": 5,
+        "WECHAT_RETRIES": 2,  # 连接失败与 5xx 时的重试次数
+        "WECHAT_POOL_SIZE": 10,
+        "WECHAT_CODE_CACHE_TIMEOUT": 60,  # 重复 code 去重时间
+        "PASSWORD_HASHER": None,  # 用户密码哈希算法，None 为 PASSWORD_HASHERS 首项
+    }
+
+    IMPORT_STRINGS: List[str] = []
+
+
+zq_auth_settings = ZqAuthSettings()
+
+
+@receiver(setting_changed)
+def reload_settings(*args, **kwargs):
+    zq_auth_settings.reload_package_settings(*args, **kwargs)
@@ -2,9 +2,12 @@ from datetime import datetime
 from typing import Any, Dict
 
 import rest_framework_simplejwt.settings
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.serializers import (
     PasswordField,
     TokenObtainPairSerializer,
@@ -15,11 +18,76 @@ from zq_django_util.exceptions import ApiException
 from zq_django_util.response import ResponseType
 from zq_django_util.utils.auth.backends import OpenIdBackend
 from zq_django_util.utils.auth.exceptions import OpenIdNotBound
+from zq_django_util.utils.auth.tokens import token_factory
+from zq_django_util.utils.auth.wechat import WechatClient, wechat_client
 
 AuthUser = get_user_model()
 
 
-class OpenIdLoginSerializer(serializers.Serializer):
+class AsyncValidationMixin:
+    """
+    异步验证 mixin
+
+    字段验证与 `is_valid` 一致，对象级验证调用异步的 `avalidate`
+    """
+
+    async def ais_valid(
+        self: serializers.Serializer, *, raise_exception: bool = False
+    ) -> bool:
+        """
+        异步版本的 is_valid
+        """
+        assert hasattr(self, "initial_data"), (
+            "Cannot call `.ais_valid()` as no `data=` keyword argument was "
+            "passed when instantiating the serializer instance."
+        )
+
+        if not hasattr(self, "_validated_data"):
+            try:
+                self._validated_data = await self.arun_validation(
+                    self.initial_data
+                )
+            except ValidationError as exc:
+                self._validated_data = {}
+                self._errors = exc.detail
+            else:
+                self._errors = {}
+
+        if self._errors and raise_exception:
+            raise ValidationError(self.errors)
+
+        return not bool(self._errors)
+
+    async def arun_validation(
+        self: serializers.Serializer, data: Any
+    ) -> Dict[str, Any]:
+        """
+        异步版本的 run_validation
+        """
+        is_empty_value, data = self.validate_empty_values(data)
+        if is_empty_value:
+            return data
+
+        value = self.to_internal_value(data)
+        try:
+            self.run_validators(value)
+            value = await self.avalidate(value)
+            assert (
+                value is not None
+            ), ".avalidate() should return the validated data"
+        except (ValidationError, DjangoValidationError) as exc:
+            raise ValidationError(detail=serializers.as_serializer_error(exc))
+
+        return value
+
+    async def avalidate(self, attrs: Dict[str, Any]) -> dict:
+        """
+        异步对象级验证，默认在线程池中调用 validate
+        """
+        return await sync_to_async(self.validate)(attrs)
+
+
+class OpenIdLoginSerializer(AsyncValidationMixin, serializers.Serializer):
     """
     OpenID Token 获取序列化器
     """
@@ -72,18 +140,54 @@ class OpenIdLoginSerializer(serializers.Serializer):
         except OpenIdNotBound:  # openid 未绑定用户
             user = self.handle_new_openid(openid)  # 处理新 openid
 
-        # token 获取
+        return self.get_token_result(user)
+
+    async def avalidate(self, attrs: Dict[str, Any]) -> dict:
+        """
+        异步验证器
+
+        :param attrs: 序列化器中待验证的数据
+
+        :return: 已验证数据，返回前端
+        """
+        openid = await self.aget_open_id(attrs)
+        # 验证 openid
+        authenticate_kwargs = {
+            self.openid_field: openid
+        }  # 给 openid 验证模块准备 openid
+        try:
+            #  给 openid 验证模块准备请求数据
+            authenticate_kwargs["request"] = self.context["request"]
+        except KeyError:
+            pass
+
+        try:
+            user: AuthUser = await self.backend.aauthenticate(
+                **authenticate_kwargs, raise_exception=True
+            )  # 调用 openid 验证模块进行权限验证
+        except OpenIdNotBound:  # openid 未绑定用户
+            user = await self.ahandle_new_openid(openid)  # 处理新 openid
+
+        # token 签发可能写入数据库(如启用 token_blacklist)，在线程池中执行
+        return await sync_to_async(self.get_token_result)(user)
+
+    def get_token_result(self, user: AuthUser) -> dict:
+        """
+        生成用户 token 并返回结果
+
+        :param user: 用户对象
+
+        :return: token 结果
+        """
         user_id_field = (
             rest_framework_simplejwt.settings.api_settings.USER_ID_FIELD
         )  # 读取 settings 中定义的 user 主键字段名
-        refresh = self.get_token(user)  # 获取 token
+        access, refresh, expire_time = token_factory.issue(
+            self.get_token(user)
+        )  # 获取 token
 
         return self.generate_token_result(
-            user,
-            user_id_field,
-            refresh.access_token.current_time + refresh.access_token.lifetime,
-            str(refresh.access_token),
-            str(refresh),
+            user, user_id_field, expire_time, access, refresh
         )
 
     def get_open_id(self, attrs: Dict[str, Any]) -> str:
@@ -92,6 +196,12 @@ class OpenIdLoginSerializer(serializers.Serializer):
         """
         return attrs[self.openid_field]
 
+    async def aget_open_id(self, attrs: Dict[str, Any]) -> str:
+        """
+        异步获取 openid
+        """
+        return self.get_open_id(attrs)
+
     def generate_token_result(
         self,
         user: AuthUser,
@@ -128,6 +238,12 @@ class OpenIdLoginSerializer(serializers.Serializer):
             detail="openid未绑定",
         )
 
+    async def ahandle_new_openid(self, openid: str) -> AuthUser:
+        """
+        异步处理新 openid，默认在线程池中调用 handle_new_openid
+        """
+        return await sync_to_async(self.handle_new_openid)(openid)
+
 
 class AbstractWechatLoginSerializer(OpenIdLoginSerializer):
     """
@@ -147,8 +263,30 @@ class AbstractWechatLoginSerializer(OpenIdLoginSerializer):
         """
         raise NotImplementedError("请在此返回openid")
 
+    async def aget_open_id(self, attrs: Dict[str, Any]) -> str:
+        """
+        异步获取 open_id
+
+        默认在线程池中调用 get_open_id，可重写为异步请求以避免阻塞线程
+        """
+        return await sync_to_async(self.get_open_id)(attrs)
+
+
+class WechatLoginSerializer(AbstractWechatLoginSerializer):
+    """
+    微信登录序列化器(使用内置客户端将 code 转化为 openid)
+    """
+
+    client: WechatClient = wechat_client
+
+    def get_open_id(self, attrs: Dict[str, Any]) -> str:
+        """
+        调用微信登录凭证校验接口获取 openid
+        """
+        return self.client.get_open_id(attrs["code"])
+
 
-class PasswordLoginSerializer(TokenObtainPairSerializer):
+class PasswordLoginSerializer(AsyncValidationMixin, TokenObtainPairSerializer):
     def validate(self, attrs: Dict[str, Any]) -> dict:
         super(TokenObtainPairSerializer, self).validate(attrs)  # 获取 self.user
 
@@ -156,14 +294,12 @@ class PasswordLoginSerializer(TokenObtainPairSerializer):
             rest_framework_simplejwt.settings.api_settings.USER_ID_FIELD
         )  # 读取 settings 中定义的 user 主键字段名
 
-        refresh = self.get_token(self.user)
+        access, refresh, expire_time = token_factory.issue(
+            self.get_token(self.user)
+        )
 
         return self.generate_token_result(
-            self.user,
-            user_id_field,
-            refresh.access_token.current_time + refresh.access_token.lifetime,
-            str(refresh.access_token),
-            str(refresh),
+            self.user, user_id_field, expire_time, access, refresh
         )
 
     def generate_token_result(
@@ -0,0 +1,78 @@
+# token 签发
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+
+
+class TokenFactory:
+    """
+    token 签发工厂
+
+    由同一个 refresh token 的 claims 生成 access token，两者各签名一次；
+    签名密钥预先解析并缓存(RSA/ECDSA 私钥无需每次签名时重新解析 PEM)
+    """
+
+    _key_source: Optional[Tuple[str, Any]]
+    _key: Any
+    _lock: Lock
+
+    def __init__(self) -> None:
+        self._key_source = None
+        self._key = None
+        self._lock = Lock()
+
+    def get_signing_key(self, backend: TokenBackend) -> Any:
+        """
+        获取预先解析的签名密钥，算法或密钥修改后重新解析
+        :param backend: simple-jwt token backend
+        :return: 签名密钥对象
+        """
+        source = (backend.algorithm, backend.signing_key)
+        with self._lock:
+            if self._key_source != source:
+                algorithm = jwt.get_algorithm_by_name(backend.algorithm)
+                self._key = algorithm.prepare_key(backend.signing_key)
+                self._key_source = source
+            return self._key
+
+    def encode(self, token: Token) -> str:
+        """
+        签名 token，结果与 str(token) 一致
+        :param token: simple-jwt token 对象
+        :return: 编码后的 token
+        """
+        backend = token.get_token_backend()
+
+        payload: Dict[str, Any] = token.payload.copy()
+        if backend.audience is not None:
+            payload["aud"] = backend.audience
+        if backend.issuer is not None:
+            payload["iss"] = backend.issuer
+
+        return jwt.encode(
+            payload,
+            self.get_signing_key(backend),
+            algorithm=backend.algorithm,
+            # simple-jwt 5.1 之前的 TokenBackend 无 json_encoder
+            json_encoder=getattr(backend, "json_encoder", None),
+        )
+
+    def issue(self, refresh: RefreshToken) -> Tuple[str, str, datetime]:
+        """
+        由 refresh token 签发 access 与 refresh token
+        :param refresh: refresh token 对象(已包含用户 claims)
+        :return: access token, refresh token, access token 过期时间
+        """
+        access = refresh.access_token  # access_token 每次访问都会重新生成
+        return (
+            self.encode(access),
+            self.encode(refresh),
+            access.current_time + access.lifetime,
+        )
+
+
+token_factory = TokenFactory()
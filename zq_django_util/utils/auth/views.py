@@ -1,9 +1,10 @@
-from typing import TYPE_CHECKING, Any
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator
 
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 from zq_django_util.exceptions import ApiException
@@ -12,6 +13,7 @@ from zq_django_util.utils.auth.serializers import (
     OpenIdLoginSerializer,
     PasswordLoginSerializer,
 )
+from zq_django_util.utils.mixins import AsyncAPIViewMixin
 
 if TYPE_CHECKING:
     from rest_framework.request import Request
@@ -27,14 +29,13 @@ class OpenIdLoginView(TokenObtainPairView):
     queryset = AuthUser.objects.all()
     serializer_class = OpenIdLoginSerializer
 
-    def post(self, request: "Request", *args: Any, **kwargs: Any) -> Response:
+    @contextmanager
+    def handle_token_error(self) -> Iterator[None]:
         """
-        增加 post 方法, 支持 open id 登录
+        将生成 token 时的 TokenError 转换为第三方登录失败异常
         """
-        serializer = self.get_serializer(data=request.data)
-
         try:
-            serializer.is_valid(raise_exception=True)
+            yield
         except TokenError:
             raise ApiException(
                 ResponseType.ThirdLoginFailed,
@@ -43,6 +44,15 @@ class OpenIdLoginView(TokenObtainPairView):
                 record=True,
             )
 
+    def post(self, request: "Request", *args: Any, **kwargs: Any) -> Response:
+        """
+        增加 post 方法, 支持 open id 登录
+        """
+        serializer = self.get_serializer(data=request.data)
+
+        with self.handle_token_error():
+            serializer.is_valid(raise_exception=True)
+
         return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
 
@@ -52,3 +62,43 @@ class PasswordLoginView(TokenObtainPairView):
     """
 
     serializer_class = PasswordLoginSerializer
+
+
+class AsyncOpenIdLoginView(AsyncAPIViewMixin, OpenIdLoginView):
+    """
+    异步 open id 登录视图(ASGI 下使用)
+    """
+
+    async def post(
+        self, request: "Request", *args: Any, **kwargs: Any
+    ) -> Response:
+        """
+        异步 open id 登录
+        """
+        serializer = self.get_serializer(data=request.data)
+
+        with self.handle_token_error():
+            await serializer.ais_valid(raise_exception=True)
+
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
+
+
+class AsyncPasswordLoginView(AsyncAPIViewMixin, PasswordLoginView):
+    """
+    异步密码登录视图(ASGI 下使用)
+    """
+
+    async def post(
+        self, request: "Request", *args: Any, **kwargs: Any
+    ) -> Response:
+        """
+        异步密码登录，密码校验在线程池中执行
+        """
+        serializer = self.get_serializer(data=request.data)
+
+        try:
+            await serializer.ais_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
@@ -0,0 +1,311 @@
+# 微信小程序登录凭证校验
+# https://developers.weixin.qq.com/miniprogram/dev/OpenApiDoc/user-login/code2Session.html
+
+import hashlib
+import math
+import time
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple, TypedDict
+
+import requests
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from zq_django_util.exceptions import ApiException
+from zq_django_util.response import ResponseType
+from zq_django_util.utils.auth.configs import zq_auth_settings
+
+
+class WechatSessionDict(TypedDict, total=False):
+    openid: str
+    session_key: str
+    unionid: str
+
+
+class WechatClient:
+    """
+    微信接口客户端
+
+    使用连接池复用 HTTP 连接，重复的 code 在短时间内直接返回上次的结果，
+    access_token 通过 django cache 在多个进程间共享
+    """
+
+    CODE_KEY_PREFIX = "zq_auth:wechat:code"
+    ACCESS_TOKEN_KEY_PREFIX = "zq_auth:wechat:access_token"
+    ACCESS_TOKEN_MARGIN = 300  # access_token 提前过期时间(秒)
+
+    INVALID_CODE_ERRCODES = (40029, 40163)  # code 无效, code 已被使用
+    CODE_WAIT_INTERVAL = 0.05  # 等待并发请求结果的轮询间隔(秒)
+
+    _session: Optional[requests.Session]
+    _session_config: Optional[Tuple[int, int]]
+    _lock: Lock
+
+    def __init__(
+        self, app_id: Optional[str] = None, app_secret: Optional[str] = None
+    ) -> None:
+        """
+        微信接口客户端
+        :param app_id: 小程序 appid，默认使用 WECHAT_APP_ID 配置
+        :param app_secret: 小程序 secret，默认使用 WECHAT_APP_SECRET 配置
+        """
+        self._app_id = app_id
+        self._app_secret = app_secret
+        self._session = None
+        self._session_config = None
+        self._lock = Lock()
+
+    @property
+    def app_id(self) -> str:
+        return self._app_id or zq_auth_settings.WECHAT_APP_ID
+
+    @property
+    def app_secret(self) -> str:
+        return self._app_secret or zq_auth_settings.WECHAT_APP_SECRET
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        带连接池与重试的 HTTP session，连接池配置修改后重新创建
+        """
+        config = (
+            zq_auth_settings.WECHAT_POOL_SIZE,
+            zq_auth_settings.WECHAT_RETRIES,
+        )
+        with self._lock:
+            if self._session is None or self._session_config != config:
+                if self._session is not None:
+                    self._session.close()
+                self._session = self.create_session(*config)
+                self._session_config = config
+            return self._session
+
+    @staticmethod
+    def create_session(pool_size: int, retries: int) -> requests.Session:
+        """
+        创建 HTTP session
+        :param pool_size: 连接池大小
+        :param retries: 重试次数(仅在连接失败与网关错误时重试，请求发出后的读取超时不重试)
+        :return: session
+        """
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            backoff_factor=0.1,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def close(self) -> None:
+        """
+        关闭连接池
+        :return:
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._session_config = None
+
+    def request(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        请求微信接口
+        :param method: 请求方法
+        :param path: 接口路径
+        :param kwargs: requests 参数
+        :return: 响应数据
+        """
+        kwargs.setdefault(
+            "timeout",
+            (
+                zq_auth_settings.WECHAT_CONNECT_TIMEOUT,
+                zq_auth_settings.WECHAT_READ_TIMEOUT,
+            ),
+        )
+        try:
+            response = self.session.request(
+                method, zq_auth_settings.WECHAT_API_BASE + path, **kwargs
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.Timeout as e:
+            raise ApiException(
+                ResponseType.ThirdServiceTimeoutError,
+                detail="微信接口请求超时",
+                inner=e,
+            )
+        except (requests.RequestException, ValueError) as e:
+            raise ApiException(
+                ResponseType.ThirdServiceError,
+                detail="微信接口请求失败",
+                inner=e,
+            )
+
+    def get_code_key(self, code: str) -> str:
+        """
+        获取 code 去重缓存 key
+        :param code: 登录 code
+        :return: 缓存 key
+        """
+        digest = hashlib.sha256(code.encode()).hexdigest()
+        return f"{self.CODE_KEY_PREFIX}:{self.app_id}:{digest}"
+
+    def get_code_lock_timeout(self) -> float:
+        """
+        code 换取结果的等待上限(秒)，不小于一次请求(含重试)的最长耗时
+        :return: 超时时间
+        """
+        return (
+            zq_auth_settings.WECHAT_CONNECT_TIMEOUT
+            * (zq_auth_settings.WECHAT_RETRIES + 1)
+            + zq_auth_settings.WECHAT_READ_TIMEOUT
+            + 1
+        )
+
+    def code_to_session(self, code: str) -> WechatSessionDict:
+        """
+        登录凭证校验，使用 code 换取 openid 与 session_key
+
+        同一 code 在 WECHAT_CODE_CACHE_TIMEOUT 内重复提交时直接返回上次的结果；
+        并发提交时仅第一个请求调用微信接口(通过 cache.add 加锁)，其余请求等待其结果
+        :param code: 前端获取的登录 code
+        :return: openid, session_key, unionid(若有)
+        """
+        key = self.get_code_key(code)
+        lock_key = f"{key}:lock"
+        lock_timeout = self.get_code_lock_timeout()
+        deadline = time.monotonic() + lock_timeout
+
+        while True:
+            try:
+                result = cache.get(key)
+            except Exception:
+                result = None
+            if result is not None:
+                return result
+
+            try:
+                locked = cache.add(lock_key, 1, math.ceil(lock_timeout))
+            except Exception:  # 缓存不可用时直接请求
+                locked = True
+            if locked:
+                break
+            if time.monotonic() >= deadline:  # 等待超时，自行请求
+                break
+            time.sleep(self.CODE_WAIT_INTERVAL)
+
+        try:
+            result = self.request_session(code)
+            try:
+                cache.set(
+                    key, result, zq_auth_settings.WECHAT_CODE_CACHE_TIMEOUT
+                )
+            except Exception:
+                pass
+            return result
+        finally:
+            if locked:
+                try:
+                    cache.delete(lock_key)
+                except Exception:
+                    pass
+
+    def request_session(self, code: str) -> WechatSessionDict:
+        """
+        调用登录凭证校验接口
+        :param code: 前端获取的登录 code
+        :return: openid, session_key, unionid(若有)
+        """
+        data = self.request(
+            "GET",
+            "/sns/jscode2session",
+            params={
+                "appid": self.app_id,
+                "secret": self.app_secret,
+                "js_code": code,
+                "grant_type": "authorization_code",
+            },
+        )
+        errcode = data.get("errcode", 0)
+        if errcode in self.INVALID_CODE_ERRCODES:
+            raise ApiException(
+                ResponseType.ThirdLoginFailed,
+                detail=f"微信 code 无效: {data.get('errmsg')}",
+                msg="微信登录失败，请重试",
+            )
+        if errcode or "openid" not in data:
+            raise ApiException(
+                ResponseType.ThirdServiceError,
+                detail=f"微信登录凭证校验失败: {errcode} {data.get('errmsg')}",
+            )
+
+        return {
+            k: data[k]
+            for k in ("openid", "session_key", "unionid")
+            if k in data
+        }
+
+    def get_open_id(self, code: str) -> str:
+        """
+        使用 code 换取 openid
+        :param code: 前端获取的登录 code
+        :return: openid
+        """
+        return self.code_to_session(code)["openid"]
+
+    def get_access_token(self, force_refresh: bool = False) -> str:
+        """
+        获取接口调用凭证(稳定版)，在 django cache 中缓存至过期前 ACCESS_TOKEN_MARGIN 秒
+        :param force_refresh: 是否强制刷新
+        :return: access_token
+        """
+        key = f"{self.ACCESS_TOKEN_KEY_PREFIX}:{self.app_id}"
+        if not force_refresh:
+            try:
+                access_token = cache.get(key)
+            except Exception:
+                access_token = None
+            if access_token is not None:
+                return access_token
+
+        data = self.request(
+            "POST",
+            "/cgi-bin/stable_token",
+            json={
+                "grant_type": "client_credential",
+                "appid": self.app_id,
+                "secret": self.app_secret,
+                "force_refresh": force_refresh,
+            },
+        )
+        if "access_token" not in data:
+            raise ApiException(
+                ResponseType.ThirdServiceError,
+                detail=(
+                    "微信 access_token 获取失败: "
+                    f"{data.get('errcode')} {data.get('errmsg')}"
+                ),
+            )
+
+        access_token = data["access_token"]
+        timeout = data.get("expires_in", 7200) - self.ACCESS_TOKEN_MARGIN
+        if timeout > 0:
+            try:
+                cache.set(key, access_token, timeout)
+            except Exception:
+                pass
+        return access_token
+
+
+wechat_client = WechatClient()
@@ -0,0 +1,108 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, List, Optional, Tuple
+
+
+class LRUCache:
+    """
+    线程安全的进程内 LRU 缓存，支持过期时间
+    """
+
+    maxsize: int
+    timeout: Optional[float]
+
+    _data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]"
+    _lock: Lock
+
+    def __init__(self, maxsize: int = 128, timeout: Optional[float] = None):
+        """
+        LRU 缓存
+        :param maxsize: 最大缓存数量
+        :param timeout: 默认过期时间(秒)，None 为不过期
+        """
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        获取缓存
+        :param key: 键
+        :param default: 不存在或已过期时的默认值
+        :return: 缓存值
+        """
+        with self._lock:
+            try:
+                value, expire_at = self._data[key]
+            except KeyError:
+                return default
+
+            if expire_at is not None and expire_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(
+        self, key: Hashable, value: Any, timeout: Optional[float] = None
+    ) -> None:
+        """
+        设置缓存
+        :param key: 键
+        :param value: 值
+        :param timeout: 过期时间(秒)，None 使用默认过期时间
+        :return:
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if self.maxsize <= 0 or (timeout is not None and timeout <= 0):
+            return
+        expire_at = time.monotonic() + timeout if timeout is not None else None
+
+        with self._lock:
+            self._data[key] = (value, expire_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        删除缓存
+        :param key: 键
+        :return:
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """
+        获取未过期的缓存项快照(不影响 LRU 顺序)
+        :return: (键, 值) 列表
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value)
+                for key, (value, expire_at) in self._data.items()
+                if expire_at is None or expire_at > now
+            ]
+
+    def clear(self) -> None:
+        """
+        清空缓存
+        :return:
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
@@ -1,16 +1,31 @@
+import asyncio
+import inspect
 from typing import TYPE_CHECKING, Any
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from rest_framework.response import Response
 
 if TYPE_CHECKING:
+    from django.http import HttpRequest
     from rest_framework.request import Request
+    from rest_framework.views import APIView
     from rest_framework.viewsets import GenericViewSet
 
 CACHE_TTL = getattr(settings, "CACHE_TTL", 60 * 60 * 1)
 
+try:
+    from asgiref.sync import markcoroutinefunction
+except ImportError:  # asgiref < 3.6
+
+    def markcoroutinefunction(func: Any) -> Any:
+        if hasattr(inspect, "markcoroutinefunction"):
+            return inspect.markcoroutinefunction(func)
+        func._is_coroutine = asyncio.coroutines._is_coroutine
+        return func
+
 
 class CacheListModelMixin:
     @method_decorator(cache_page(CACHE_TTL))
@@ -36,3 +51,61 @@ class CacheRetrieveModelMixin:
         instance = self.get_object()
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
+
+
+class AsyncAPIViewMixin:
+    """
+    异步 APIView mixin
+
+    需放在 APIView 之前，视图中可使用 `async def post(...)` 等异步处理方法（同步方法仍可使用）。
+    认证、权限与限流检查以及异常处理可能访问数据库，在线程池中执行
+    """
+
+    view_is_async = True
+
+    @classmethod
+    def as_view(cls, **initkwargs: Any) -> Any:
+        view = super().as_view(**initkwargs)
+        return markcoroutinefunction(view)  # csrf_exempt 包装后需重新标记
+
+    async def dispatch(
+        self: "APIView", request: "HttpRequest", *args: Any, **kwargs: Any
+    ) -> Response:
+        """
+        异步版本的 dispatch
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            if (
+                self.authentication_classes
+                or self.permission_classes
+                or self.throttle_classes
+            ):
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+            else:
+                self.initial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self,
+                    request.method.lower(),
+                    self.http_method_not_allowed,
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
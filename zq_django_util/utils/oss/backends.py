@@ -1,27 +1,84 @@
+import hashlib
+import io
 import logging
 import os
-import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from tempfile import SpooledTemporaryFile
-from typing import BinaryIO, List, Optional, Union
-from urllib.parse import urljoin
+from itertools import islice
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    TypedDict,
+    Union,
+)
+from urllib.parse import quote, urljoin
 
 import oss2
 import oss2.exceptions
-import oss2.utils
 from django.conf import settings
-from django.core.exceptions import SuspiciousOperation
+from django.core.cache import caches
 from django.core.files import File
 from django.core.files.storage import Storage
 from django.utils.deconstruct import deconstructible
 from django.utils.encoding import force_str
-from oss2.models import GetObjectMetaResult
+from oss2.models import HeadObjectResult, PartInfo
 
+from .clients import OssClient, get_client, run_async
 from .configs import oss_settings
 from .exceptions import OssError
+from .utils import get_content_addressed_name, get_image_process
 
 logger = logging.getLogger("oss")
 
+BATCH_DELETE_SIZE = 1000  # OSS 单次批量删除的最大数量
+
+_NOT_FOUND = object()  # 文件不存在的缓存标记
+
+# 分片复制时从源对象保留的响应头(x-oss-meta-* 自定义元数据同样保留)
+COPY_HEADERS = frozenset(
+    (
+        "content-type",
+        "cache-control",
+        "content-disposition",
+        "content-encoding",
+        "content-language",
+        "expires",
+    )
+)
+
+
+class DeleteResult(TypedDict):
+    deleted: int  # 已删除的对象数量
+    failed: List[str]  # 删除失败的对象 key
+
+
+DeleteProgressCallback = Callable[[int, int], None]
+
+
+class CopyResult(TypedDict):
+    copied: int  # 已复制(移动)的对象数量
+    failed: List[str]  # 复制(移动)失败的源对象 key
+
+
+CopyProgressCallback = Callable[[int, int], None]
+
+
+class OssObjectInfo(TypedDict):
+    key: str  # 对象 key
+    is_dir: bool  # 是否为文件夹(非递归列出时的公共前缀)
+    size: int  # 文件大小，文件夹为 0
+    last_modified: Optional[datetime]  # 修改时间，文件夹为 None
+    etag: Optional[str]  # ETag，文件夹为 None
+
 
 @deconstructible
 class OssStorage(Storage):
@@ -35,12 +92,13 @@ class OssStorage(Storage):
     bucket_name: str
     expire_time: int
 
+    client: OssClient
     auth: oss2.Auth
     service: oss2.Service
     bucket: oss2.Bucket
-    bucket_acl: str
 
     base_dir: str  # 基本路径
+    content_addressed: bool  # 是否按内容哈希命名文件
 
     def __init__(
         self,
@@ -49,6 +107,7 @@ class OssStorage(Storage):
         end_point: Optional[str] = None,
         bucket_name: Optional[str] = None,
         expire_time: Optional[int] = None,
+        content_addressed: Optional[bool] = None,
     ):
         self.access_key_id = access_key_id or oss_settings.ACCESS_KEY_ID
         self.access_key_secret = (
@@ -59,18 +118,36 @@ class OssStorage(Storage):
         )
         self.bucket_name = bucket_name or oss_settings.BUCKET_NAME
         self.expire_time = expire_time or oss_settings.URL_EXPIRE_SECOND
+        self.content_addressed = (
+            oss_settings.CONTENT_ADDRESSED
+            if content_addressed is None
+            else content_addressed
+        )
 
-        self.auth = oss2.Auth(self.access_key_id, self.access_key_secret)
-        self.service = oss2.Service(self.auth, self.end_point)
-        self.bucket = oss2.Bucket(self.auth, self.end_point, self.bucket_name)
+        self.client = self._get_client()
+        self.auth = self.client.auth
+        self.service = self.client.service
+        self.bucket = self.client.bucket
 
-        # try to get bucket acl to check bucket exist or not
-        try:
-            self.bucket_acl = self.bucket.get_bucket_acl().acl
-        except oss2.exceptions.NoSuchBucket:
-            raise SuspiciousOperation(
-                "Bucket '%s' does not exist." % self.bucket_name
-            )
+    def _get_client(self) -> OssClient:
+        # 相同配置的存储共享客户端与连接池
+        return get_client(
+            self.access_key_id,
+            self.access_key_secret,
+            self.end_point,
+            self.bucket_name,
+        )
+
+    @property
+    def bucket_acl(self) -> str:
+        """
+        bucket 访问权限(首次使用时获取，bucket 不存在时抛出 SuspiciousOperation)
+        """
+        return self.client.bucket_acl
+
+    @bucket_acl.setter
+    def bucket_acl(self, acl: str) -> None:
+        self.client.bucket_acl = acl
 
     @staticmethod
     def _normalize_endpoint(endpoint: str) -> str:
@@ -116,34 +193,229 @@ class OssStorage(Storage):
         target_name = self._get_key_name(name)
         logger.debug("target name: %s", target_name)
         try:
-            # Load the key into a temporary file
-            tmp_file = SpooledTemporaryFile(max_size=10 * 1024 * 1024)  # 10MB
-            obj = self.bucket.get_object(target_name)
-            logger.info(
-                "content length: %d, requestid: %s",
-                obj.content_length,
-                obj.request_id,
-            )
-            if obj.content_length is None:
-                shutil.copyfileobj(obj, tmp_file)
-            else:
-                oss2.utils.copyfileobj_and_verify(
-                    obj, tmp_file, obj.content_length, request_id=obj.request_id
-                )
-            tmp_file.seek(0)
-            return OssFile(tmp_file, target_name, self)
+            meta = self.bucket.get_object_meta(target_name)
         except oss2.exceptions.NoSuchKey:
             raise OssError("%s does not exist" % name)
         except Exception:
             raise OssError("Failed to open %s" % name)
 
+        logger.debug(
+            "content length: %d, requestid: %s",
+            meta.content_length,
+            meta.request_id,
+        )
+        # 按需分段读取，不下载整个文件
+        reader = io.BufferedReader(
+            OssObjectReader(self.bucket, target_name, meta.content_length),
+            buffer_size=oss_settings.READ_BUFFER_SIZE,
+        )
+        return OssFile(reader, target_name, self)
+
     def _save(self, name: str, content: Union[File, bytes, str]) -> str:
+        if self.content_addressed:
+            # 相同内容的文件已存在时直接复用，不再上传
+            name = get_content_addressed_name(
+                name, self._get_content_hash(content)
+            )
+            if self.exists(name):
+                logger.debug("content exists, skip upload: %s", name)
+                return os.path.normpath(name)
+
         target_name = self._get_key_name(name)
         logger.debug("target name: %s", target_name)
         logger.debug("content: %s", content)
-        self.bucket.put_object(target_name, content)
+
+        size = self._get_content_size(content)
+        try:
+            self._put(target_name, content, size)
+        finally:
+            self.client.meta_cache.delete(target_name)
         return os.path.normpath(name)
 
+    def _put(
+        self,
+        target_name: str,
+        content: Union[File, bytes, str],
+        size: Optional[int],
+    ) -> None:
+        """
+        上传文件，超过 MULTIPART_THRESHOLD 时分片上传
+        :param target_name: 文件 key
+        :param content: 上传内容
+        :param size: 内容大小
+        :return:
+        """
+        if size is None or size < oss_settings.MULTIPART_THRESHOLD:
+            self.bucket.put_object(target_name, content)
+        elif (
+            hasattr(content, "temporary_file_path")
+            and oss_settings.MULTIPART_CHECKPOINT_DIR
+        ):
+            self._resumable_upload(target_name, content.temporary_file_path())
+        else:
+            self._multipart_upload(target_name, content, size)
+
+    def get_available_name(
+        self, name: str, max_length: Optional[int] = None
+    ) -> str:
+        if self.content_addressed:  # 保存时按内容重新命名，无需检查原文件名
+            return name
+        return super().get_available_name(name, max_length)
+
+    @classmethod
+    def _get_content_hash(cls, content: Union[File, bytes, str]) -> str:
+        """
+        分块读取上传内容计算 sha256，读取后将文件流恢复至开头
+        :param content: 上传内容
+        :return: 十六进制摘要
+        """
+        sha256 = hashlib.sha256()
+        for data in cls._iter_parts(content, oss_settings.READ_BUFFER_SIZE):
+            sha256.update(data)
+
+        try:
+            content.seek(0)
+        except (AttributeError, io.UnsupportedOperation):
+            pass
+        return sha256.hexdigest()
+
+    @staticmethod
+    def _get_content_size(content: Union[File, bytes, str]) -> Optional[int]:
+        """
+        获取上传内容大小
+        :param content: 上传内容
+        :return: 大小，无法确定时为 None
+        """
+        if isinstance(content, str):
+            return len(content.encode())
+        if isinstance(content, bytes):
+            return len(content)
+        try:
+            return content.size
+        except (AttributeError, OSError):
+            return None
+
+    def _resumable_upload(self, target_name: str, filename: str) -> None:
+        """
+        断点续传上传本地文件(如 TemporaryUploadedFile)
+        :param target_name: 文件 key
+        :param filename: 本地文件路径
+        :return:
+        """
+        logger.debug("resumable upload: %s -> %s", filename, target_name)
+        oss2.resumable_upload(
+            self.bucket,
+            target_name,
+            filename,
+            store=oss2.ResumableStore(
+                root=oss_settings.MULTIPART_CHECKPOINT_DIR
+            ),
+            multipart_threshold=oss_settings.MULTIPART_THRESHOLD,
+            part_size=oss_settings.MULTIPART_PART_SIZE,
+            num_threads=oss_settings.MULTIPART_THREADS,
+        )
+
+    def _multipart_upload(
+        self, target_name: str, content: Union[File, bytes, str], size: int
+    ) -> None:
+        """
+        分片并行上传
+
+        分片从文件流中依次读取，同时上传中的分片不超过 MULTIPART_THREADS 个，
+        内存占用与文件大小无关；上传失败时取消分片上传
+        :param target_name: 文件 key
+        :param content: 上传内容
+        :param size: 内容大小
+        :return:
+        """
+        part_size = oss2.determine_part_size(
+            size, preferred_size=oss_settings.MULTIPART_PART_SIZE
+        )
+        threads = max(oss_settings.MULTIPART_THREADS, 1)
+        upload_id = self.bucket.init_multipart_upload(target_name).upload_id
+        logger.debug(
+            "multipart upload: %s, upload id: %s, part size: %d",
+            target_name,
+            upload_id,
+            part_size,
+        )
+
+        futures: List[Future] = []
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                pending: Set[Future] = set()
+                for part_number, data in enumerate(
+                    self._iter_parts(content, part_size), start=1
+                ):
+                    if len(pending) >= threads:
+                        done, pending = wait(
+                            pending, return_when=FIRST_COMPLETED
+                        )
+                        for future in done:
+                            future.result()  # 分片失败时尽早退出
+
+                    future = executor.submit(
+                        self._upload_part,
+                        target_name,
+                        upload_id,
+                        part_number,
+                        data,
+                    )
+                    pending.add(future)
+                    futures.append(future)
+
+                parts = [future.result() for future in futures]
+
+            self.bucket.complete_multipart_upload(target_name, upload_id, parts)
+        except Exception:
+            try:
+                self.bucket.abort_multipart_upload(target_name, upload_id)
+            except Exception:
+                logger.warning(
+                    "Failed to abort multipart upload %s of %s",
+                    upload_id,
+                    target_name,
+                )
+            raise
+
+    @staticmethod
+    def _iter_parts(
+        content: Union[File, bytes, str], part_size: int
+    ) -> Iterator[bytes]:
+        """
+        按分片大小依次读取上传内容
+        :param content: 上传内容
+        :param part_size: 分片大小
+        :return: 分片数据
+        """
+        if isinstance(content, str):
+            content = content.encode()
+        if isinstance(content, bytes):
+            content = io.BytesIO(content)
+
+        try:
+            content.seek(0)
+        except (AttributeError, io.UnsupportedOperation):
+            pass
+
+        while True:
+            data = content.read(part_size)
+            if not data:
+                break
+            if isinstance(data, str):
+                data = data.encode()
+            yield data
+
+    def _upload_part(
+        self, target_name: str, upload_id: str, part_number: int, data: bytes
+    ) -> PartInfo:
+        result = self.bucket.upload_part(
+            target_name, upload_id, part_number, data
+        )
+        return PartInfo(
+            part_number, result.etag, size=len(data), part_crc=result.crc
+        )
+
     def create_dir(self, dirname: str) -> None:
         """
         创建目录
@@ -155,20 +427,56 @@ class OssStorage(Storage):
             target_name += "/"
 
         self.bucket.put_object(target_name, "")
+        self.client.meta_cache.delete(target_name)
 
     def exists(self, name: str) -> bool:
-        target_name = self._get_key_name(name)
-        logger.debug("name: %s, target name: %s", name, target_name)
-        return self.bucket.object_exists(target_name)
+        try:
+            self.get_file_meta(name)
+        except oss2.exceptions.NoSuchBucket:
+            raise
+        except oss2.exceptions.NotFound:
+            return False
+        return True
 
-    def get_file_meta(self, name: str) -> GetObjectMetaResult:
+    def get_file_meta(self, name: str) -> HeadObjectResult:
         """
         获取文件信息
+
+        同一文件的信息(包括不存在)在 META_CACHE_TIMEOUT 秒内缓存，
+        exists、size、modified_time、content_type 共用一次 HEAD 请求
         :param name: 文件名
-        :return:
+        :return: 文件信息，文件不存在时抛出 oss2.exceptions.NotFound
         """
         name = self._get_key_name(name)
-        return self.bucket.get_object_meta(name)
+        meta = self.client.meta_cache.get(name)
+        if meta is None:
+            try:
+                meta = self.bucket.head_object(name)
+            except oss2.exceptions.NoSuchBucket:
+                raise
+            except oss2.exceptions.NotFound:
+                self.client.meta_cache.set(name, _NOT_FOUND)
+                raise
+            self.client.meta_cache.set(name, meta)
+
+        if meta is _NOT_FOUND:
+            # 每次抛出新的异常，避免共享异常对象及其 traceback
+            raise oss2.exceptions.NotFound(
+                status=404,
+                headers={},
+                body=b"",
+                details={"Code": "NoSuchKey", "Key": name},
+            )
+        return meta
+
+    def clear_file_meta(self, *names: str) -> None:
+        """
+        清除文件信息缓存
+        :param names: 文件名
+        :return:
+        """
+        for name in names:
+            self.client.meta_cache.delete(self._get_key_name(name))
 
     def size(self, name: str) -> int:
         file_meta = self.get_file_meta(name)
@@ -182,22 +490,36 @@ class OssStorage(Storage):
 
     def get_modified_time(self, name: str) -> datetime:
         file_meta = self.get_file_meta(name)
+        return self._get_datetime(file_meta.last_modified)
 
+    @staticmethod
+    def _get_datetime(timestamp: int) -> datetime:
+        """
+        时间戳转换为 datetime，USE_TZ 时为 UTC 时间
+        :param timestamp: 时间戳
+        :return: datetime
+        """
         if settings.USE_TZ:
-            return datetime.utcfromtimestamp(file_meta.last_modified).replace(
+            return datetime.utcfromtimestamp(timestamp).replace(
                 tzinfo=timezone.utc
             )
         else:
-            return datetime.fromtimestamp(file_meta.last_modified)
+            return datetime.fromtimestamp(timestamp)
 
     get_created_time = get_accessed_time = get_modified_time
 
     def content_type(self, name: str) -> str:
-        name = self._get_key_name(name)
-        file_info = self.bucket.head_object(name)
-        return file_info.content_type
+        file_meta = self.get_file_meta(name)
+        return file_meta.content_type
 
     def listdir(self, name: str) -> (List[str], List[str]):
+        """
+        列出文件夹中的文件夹与文件(完整 key)
+
+        结果全部加载到内存中，文件较多时请使用 iter_dir
+        :param name: 文件夹路径
+        :return: 文件夹列表，文件列表
+        """
         if name == ".":
             name = ""
         name = self._get_key_name(name)
@@ -218,18 +540,144 @@ class OssStorage(Storage):
         logger.debug("files: %s", files)
         return dirs, files
 
+    def iter_dir(
+        self,
+        prefix: str = "",
+        recursive: bool = False,
+        page_size: int = 1000,
+    ) -> Iterator[OssObjectInfo]:
+        """
+        逐页列出文件夹中的对象
+
+        惰性生成器，每次只请求一页(page_size 个，最大 1000)，
+        文件大小与修改时间来自列举结果，无需额外 HEAD 请求
+        :param prefix: 文件夹路径
+        :param recursive: 是否递归列出子文件夹中的文件，否则子文件夹作为 is_dir 项返回
+        :param page_size: 每页数量
+        :return: 对象信息
+        """
+        if prefix == ".":
+            prefix = ""
+        prefix = self._get_key_name(prefix)
+        if not prefix.endswith("/"):
+            prefix += "/"
+        logger.debug("iter dir: %s, recursive: %s", prefix, recursive)
+
+        for obj in oss2.ObjectIterator(
+            self.bucket,
+            prefix=prefix,
+            delimiter="" if recursive else "/",
+            max_keys=page_size,
+        ):
+            if obj.is_prefix():
+                yield {
+                    "key": obj.key,
+                    "is_dir": True,
+                    "size": 0,
+                    "last_modified": None,
+                    "etag": None,
+                }
+            else:
+                yield {
+                    "key": obj.key,
+                    "is_dir": False,
+                    "size": obj.size,
+                    "last_modified": self._get_datetime(obj.last_modified),
+                    "etag": obj.etag,
+                }
+
     def url(self, name: str) -> str:
         """
         获取文件的url(带token)
         :param name: 文件名
         :return: url
         """
-        key = self._get_key_name(name)
-        url = self.bucket.sign_url("GET", key, expires=self.expire_time)
-        if self.bucket_acl != oss2.BUCKET_ACL_PRIVATE:
-            idx = url.find("?")
-            if idx > 0:
-                url = url[:idx].replace("%2F", "/")
+        return self._get_url(self._get_key_name(name))
+
+    def image_url(self, name: str, process: str) -> str:
+        """
+        获取图片处理(缩放、裁剪、格式转换等)后的 url
+
+        图片由 OSS 处理，私有 bucket 的签名 url 按处理参数分别缓存
+        :param name: 文件名
+        :param process: IMAGE_PRESETS 中的预设名或图片处理参数
+        :return: url
+        """
+        return self._get_url(
+            self._get_key_name(name), get_image_process(process)
+        )
+
+    def _get_url(self, key: str, process: Optional[str] = None) -> str:
+        if self.bucket_acl != oss2.BUCKET_ACL_PRIVATE:  # 公共读无需签名
+            url = self.bucket._make_url(self.bucket_name, key).replace(
+                "%2F", "/"
+            )
+            if process is not None:
+                url += "?x-oss-process=" + quote(process, safe="/,")
+            return url
+        return self.get_signed_url(key, process)
+
+    def _sign_url(self, key: str, process: Optional[str] = None) -> str:
+        if process is None:
+            return self.bucket.sign_url("GET", key, expires=self.expire_time)
+        return self.bucket.sign_url(
+            "GET",
+            key,
+            expires=self.expire_time,
+            params={"x-oss-process": process},
+        )
+
+    def get_signed_url(self, key: str, process: Optional[str] = None) -> str:
+        """
+        获取签名 url
+
+        签名 url 在进程内 LRU 与 URL_CACHE_ALIAS 对应的共享缓存中缓存，
+        直至过期前 URL_CACHE_MARGIN_SECOND 秒
+        :param key: 文件 key
+        :param process: 图片处理参数
+        :return: 签名 url
+        """
+        timeout = self.expire_time - oss_settings.URL_CACHE_MARGIN_SECOND
+        if timeout <= 0:
+            return self._sign_url(key, process)
+
+        local_key = (self.expire_time, key, process)
+        url = self.client.url_cache.get(local_key)
+        if url is not None:
+            return url
+
+        shared_cache = (
+            caches[oss_settings.URL_CACHE_ALIAS]
+            if oss_settings.URL_CACHE_ALIAS
+            else None
+        )
+        shared_key = "oss:url:%s:%d:%s" % (
+            self.bucket_name,
+            self.expire_time,
+            hashlib.sha1(
+                (key if process is None else f"{key}?{process}").encode()
+            ).hexdigest(),
+        )
+
+        cached = None
+        if shared_cache is not None:
+            try:
+                cached = shared_cache.get(shared_key)
+            except Exception:  # 共享缓存异常时直接签名
+                pass
+
+        if cached is not None:
+            url, cache_until = cached
+        else:
+            url = self._sign_url(key, process)
+            cache_until = time.time() + timeout
+            if shared_cache is not None:
+                try:
+                    shared_cache.set(shared_key, (url, cache_until), timeout)
+                except Exception:
+                    pass
+
+        self.client.url_cache.set(local_key, url, cache_until - time.time())
         return url
 
     def delete(self, name: str) -> None:
@@ -241,20 +689,437 @@ class OssStorage(Storage):
         """
         name = self._get_key_name(name)
         logger.debug("delete name: %s", name)
-        self.bucket.delete_object(name)
+        try:
+            self.bucket.delete_object(name)
+        finally:
+            self.client.meta_cache.delete(name)
 
-    def delete_dir(self, dirname: str) -> None:
+    def delete_many(
+        self,
+        names: Iterable[str],
+        progress_callback: Optional[DeleteProgressCallback] = None,
+    ) -> DeleteResult:
         """
-        删除文件夹
+        批量删除文件
 
-        :param dirname:
-        :return:
+        每 1000 个文件一次批量删除请求，多个请求并行执行
+        :param names: 文件名
+        :param progress_callback: 进度回调，参数为已删除数量与失败数量
+        :return: 删除结果
+        """
+        keys = dict.fromkeys(self._get_key_name(name) for name in names)
+        return self._delete_keys(keys, progress_callback)
+
+    def delete_dir(
+        self,
+        dirname: str,
+        progress_callback: Optional[DeleteProgressCallback] = None,
+    ) -> DeleteResult:
+        """
+        删除文件夹及其中的所有文件
+
+        按前缀分页列出文件，边列出边并行批量删除
+        :param dirname: 文件夹路径
+        :param progress_callback: 进度回调，参数为已删除数量与失败数量
+        :return: 删除结果
         """
         name = self._get_key_name(dirname)
         if not name.endswith("/"):
             name += "/"
-        logger.debug("delete name: %s", name)
-        self.bucket.delete_object(name)
+        logger.debug("delete dir: %s", name)
+
+        keys = (
+            obj["key"]
+            for obj in self.iter_dir(
+                dirname, recursive=True, page_size=BATCH_DELETE_SIZE
+            )
+        )
+        result = self._delete_keys(keys, progress_callback)
+        logger.info(
+            "delete dir: %s, deleted: %d, failed: %d",
+            name,
+            result["deleted"],
+            len(result["failed"]),
+        )
+        return result
+
+    def _delete_keys(
+        self,
+        keys: Iterable[str],
+        progress_callback: Optional[DeleteProgressCallback] = None,
+    ) -> DeleteResult:
+        """
+        分批并行删除对象，同时执行的批次不超过 DELETE_THREADS 个
+
+        只保留已删除数量与删除失败的 key，内存占用与对象总数无关
+        :param keys: 对象 key
+        :param progress_callback: 进度回调
+        :return: 删除结果
+        """
+        result: DeleteResult = {"deleted": 0, "failed": []}
+        threads = max(oss_settings.DELETE_THREADS, 1)
+
+        def collect(futures: Iterable[Future]) -> None:
+            for future in futures:
+                deleted, failed = future.result()
+                result["deleted"] += len(deleted)
+                result["failed"].extend(failed)
+                if progress_callback is not None:
+                    progress_callback(result["deleted"], len(result["failed"]))
+
+        iterator = iter(keys)
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            pending: Set[Future] = set()
+            while batch := list(islice(iterator, BATCH_DELETE_SIZE)):
+                if len(pending) >= threads:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(executor.submit(self._delete_batch, batch))
+            collect(wait(pending).done)
+
+        return result
+
+    def _delete_batch(self, keys: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        批量删除一批对象
+        :param keys: 对象 key(不超过 1000 个)
+        :return: 已删除的 key，删除失败的 key
+        """
+        try:
+            deleted = self.bucket.batch_delete_objects(keys).deleted_keys
+        except Exception:
+            logger.exception("Failed to delete %d objects", len(keys))
+            return [], keys
+        finally:
+            for key in keys:
+                self.client.meta_cache.delete(key)
+
+        deleted_keys = set(deleted)
+        failed = [key for key in keys if key not in deleted_keys]
+        if failed:
+            logger.warning("Failed to delete objects: %s", failed)
+        return deleted, failed
+
+    def copy(self, src: str, dst: str) -> str:
+        """
+        服务端复制文件，无需下载与重新上传
+
+        超过 COPY_THRESHOLD 的文件使用分片复制(upload_part_copy)并行复制
+        :param src: 源文件名
+        :param dst: 目标文件名
+        :return: 目标文件名
+        """
+        src_key = self._get_key_name(src)
+        meta = self.get_file_meta(src)
+        self._copy_key(
+            src_key, self._get_key_name(dst), meta.content_length, meta.headers
+        )
+        return os.path.normpath(dst)
+
+    def move(self, src: str, dst: str) -> str:
+        """
+        服务端移动(重命名)文件，复制成功后删除源文件
+        :param src: 源文件名
+        :param dst: 目标文件名
+        :return: 目标文件名
+        """
+        if self._get_key_name(src) == self._get_key_name(dst):
+            self.get_file_meta(src)  # 源文件不存在时抛出 NotFound
+            return os.path.normpath(dst)
+
+        name = self.copy(src, dst)
+        self.delete(src)
+        return name
+
+    def copy_dir(
+        self,
+        src_dir: str,
+        dst_dir: str,
+        progress_callback: Optional[CopyProgressCallback] = None,
+    ) -> CopyResult:
+        """
+        复制文件夹及其中的所有文件
+
+        按前缀分页列出文件，同时复制的文件不超过 COPY_THREADS 个
+        :param src_dir: 源文件夹路径
+        :param dst_dir: 目标文件夹路径
+        :param progress_callback: 进度回调，参数为已复制数量与失败数量
+        :return: 复制结果
+        """
+        return self._copy_dir(src_dir, dst_dir, progress_callback)
+
+    def move_dir(
+        self,
+        src_dir: str,
+        dst_dir: str,
+        progress_callback: Optional[CopyProgressCallback] = None,
+    ) -> CopyResult:
+        """
+        移动文件夹及其中的所有文件
+
+        边复制边批量删除已复制的源文件，copied 为复制并删除成功的数量，
+        复制或删除失败的文件计入 failed
+        :param src_dir: 源文件夹路径
+        :param dst_dir: 目标文件夹路径
+        :param progress_callback: 进度回调，参数为已复制数量与失败数量
+        :return: 移动结果
+        """
+        copied_keys: List[str] = []
+        deleted = 0
+        delete_failed: List[str] = []
+
+        def delete_copied() -> None:
+            nonlocal deleted
+            if copied_keys:
+                batch = copied_keys.copy()
+                copied_keys.clear()
+                batch_deleted, batch_failed = self._delete_batch(batch)
+                deleted += len(batch_deleted)
+                delete_failed.extend(batch_failed)
+
+        def on_copied(src_key: str) -> None:
+            copied_keys.append(src_key)
+            if len(copied_keys) >= BATCH_DELETE_SIZE:
+                delete_copied()
+
+        result = self._copy_dir(src_dir, dst_dir, progress_callback, on_copied)
+        delete_copied()
+        result["copied"] = deleted
+        result["failed"].extend(delete_failed)
+        return result
+
+    def _copy_dir(
+        self,
+        src_dir: str,
+        dst_dir: str,
+        progress_callback: Optional[CopyProgressCallback] = None,
+        on_copied: Optional[Callable[[str], None]] = None,
+    ) -> CopyResult:
+        src_prefix = self._get_key_name(src_dir).rstrip("/") + "/"
+        dst_prefix = self._get_key_name(dst_dir).rstrip("/") + "/"
+        if dst_prefix.startswith(src_prefix):
+            raise ValueError(
+                "Cannot copy %s into its subdirectory %s"
+                % (src_prefix, dst_prefix)
+            )
+        logger.debug("copy dir: %s -> %s", src_prefix, dst_prefix)
+
+        result: CopyResult = {"copied": 0, "failed": []}
+        threads = max(oss_settings.COPY_THREADS, 1)
+
+        def collect(futures: Iterable[Future]) -> None:
+            for future in futures:
+                src_key = futures_keys.pop(future)
+                try:
+                    future.result()
+                except Exception:
+                    logger.exception("Failed to copy %s", src_key)
+                    result["failed"].append(src_key)
+                else:
+                    result["copied"] += 1
+                    if on_copied is not None:
+                        on_copied(src_key)
+                if progress_callback is not None:
+                    progress_callback(result["copied"], len(result["failed"]))
+
+        futures_keys: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            pending: Set[Future] = set()
+            for obj in self.iter_dir(
+                src_dir, recursive=True, page_size=BATCH_DELETE_SIZE
+            ):
+                if len(pending) >= threads:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                src_key = obj["key"]
+                future = executor.submit(
+                    self._copy_key,
+                    src_key,
+                    dst_prefix + src_key[len(src_prefix) :],
+                    obj["size"],
+                )
+                futures_keys[future] = src_key
+                pending.add(future)
+            collect(wait(pending).done)
+
+        logger.info(
+            "copy dir: %s -> %s, copied: %d, failed: %d",
+            src_prefix,
+            dst_prefix,
+            result["copied"],
+            len(result["failed"]),
+        )
+        return result
+
+    def _copy_key(
+        self,
+        src_key: str,
+        dst_key: str,
+        size: int,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """
+        服务端复制对象
+        :param src_key: 源对象 key
+        :param dst_key: 目标对象 key
+        :param size: 对象大小
+        :param headers: 源对象 HEAD 响应头，分片复制时使用，None 时重新获取
+        :return:
+        """
+        try:
+            if size < oss_settings.COPY_THRESHOLD:
+                self.bucket.copy_object(self.bucket_name, src_key, dst_key)
+            else:
+                if headers is None:
+                    headers = self.bucket.head_object(src_key).headers
+                self._multipart_copy(src_key, dst_key, size, headers)
+        finally:
+            self.client.meta_cache.delete(dst_key)
+
+    def _multipart_copy(
+        self,
+        src_key: str,
+        dst_key: str,
+        size: int,
+        headers: Mapping[str, str],
+    ) -> None:
+        """
+        分片并行复制，复制失败时取消分片上传
+
+        与 CopyObject 一致，保留源对象的 Content-Type 等响应头与自定义元数据
+        :param src_key: 源对象 key
+        :param dst_key: 目标对象 key
+        :param size: 对象大小
+        :param headers: 源对象 HEAD 响应头
+        :return:
+        """
+        part_size = oss2.determine_part_size(
+            size, preferred_size=oss_settings.MULTIPART_PART_SIZE
+        )
+        upload_id = self.bucket.init_multipart_upload(
+            dst_key, headers=self._get_copy_headers(headers)
+        ).upload_id
+        logger.debug(
+            "multipart copy: %s -> %s, upload id: %s, part size: %d",
+            src_key,
+            dst_key,
+            upload_id,
+            part_size,
+        )
+
+        def copy_part(part_number: int) -> PartInfo:
+            start = (part_number - 1) * part_size
+            end = min(start + part_size, size)
+            result = self.bucket.upload_part_copy(
+                self.bucket_name,
+                src_key,
+                (start, end - 1),
+                dst_key,
+                upload_id,
+                part_number,
+            )
+            return PartInfo(part_number, result.etag, size=end - start)
+
+        part_count = (size + part_size - 1) // part_size
+        try:
+            with ThreadPoolExecutor(
+                max_workers=max(oss_settings.MULTIPART_THREADS, 1)
+            ) as executor:
+                parts = list(executor.map(copy_part, range(1, part_count + 1)))
+            self.bucket.complete_multipart_upload(dst_key, upload_id, parts)
+        except Exception:
+            try:
+                self.bucket.abort_multipart_upload(dst_key, upload_id)
+            except Exception:
+                logger.warning(
+                    "Failed to abort multipart copy %s of %s",
+                    upload_id,
+                    dst_key,
+                )
+            raise
+
+    @staticmethod
+    def _get_copy_headers(headers: Mapping[str, str]) -> Dict[str, str]:
+        """
+        获取复制时需保留的源对象响应头
+        :param headers: 源对象 HEAD 响应头
+        :return: 上传请求头
+        """
+        return {
+            name: value
+            for name, value in headers.items()
+            if name.lower() in COPY_HEADERS
+            or name.lower().startswith("x-oss-meta-")
+        }
+
+    async def asave(
+        self,
+        name: Optional[str],
+        content: Union[File, bytes, str],
+        max_length: Optional[int] = None,
+    ) -> str:
+        """
+        异步保存文件，在 OSS 专用线程池中执行
+        :param name: 文件名
+        :param content: 文件内容
+        :param max_length: 文件名最大长度
+        :return: 实际保存的文件名
+        """
+        return await run_async(self.save, name, content, max_length=max_length)
+
+    async def aopen(self, name: str, mode: str = "rb") -> "OssFile":
+        """
+        异步打开文件(仅获取文件信息)
+
+        返回的文件读取时仍为阻塞调用，可配合 run_async 使用
+        :param name: 文件名
+        :param mode: 打开模式
+        :return: 文件
+        """
+        return await run_async(self.open, name, mode)
+
+    async def aexists(self, name: str) -> bool:
+        """
+        异步判断文件是否存在，命中文件信息缓存时不切换线程
+        :param name: 文件名
+        :return: 是否存在
+        """
+        # 只读取一次缓存，避免判断后缓存过期导致在事件循环中发起 HEAD 请求
+        meta = self.client.meta_cache.get(self._get_key_name(name))
+        if meta is not None:
+            return meta is not _NOT_FOUND
+        return await run_async(self.exists, name)
+
+    async def adelete(self, name: str) -> None:
+        """
+        异步删除文件
+        :param name: 文件名
+        :return:
+        """
+        await run_async(self.delete, name)
+
+    async def aurl(self, name: str) -> str:
+        """
+        异步获取文件 url
+
+        bucket 访问权限已获取且未配置共享签名缓存时 url 仅需本地计算，直接返回
+        :param name: 文件名
+        :return: url
+        """
+        if self.client.bucket_acl_loaded and not oss_settings.URL_CACHE_ALIAS:
+            return self.url(name)
+        return await run_async(self.url, name)
+
+    async def aimage_url(self, name: str, process: str) -> str:
+        """
+        异步获取图片处理后的 url
+        :param name: 文件名
+        :param process: IMAGE_PRESETS 中的预设名或图片处理参数
+        :return: url
+        """
+        if self.client.bucket_acl_loaded and not oss_settings.URL_CACHE_ALIAS:
+            return self.image_url(name, process)
+        return await run_async(self.image_url, name, process)
 
     def get_object_acl(self, name: str) -> str:
         """
@@ -290,14 +1155,82 @@ class OssStaticStorage(OssStorage):
         super(OssStaticStorage, self).__init__()
 
 
+class OssObjectReader(io.RawIOBase):
+    """
+    OSS 文件分段读取流
+
+    每次读取使用 Range 请求获取所需部分，配合 io.BufferedReader 实现预读
+    """
+
+    def __init__(self, bucket: oss2.Bucket, key: str, size: int):
+        super().__init__()
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError("invalid whence (%r)" % whence)
+
+        if position < 0:
+            raise ValueError("negative seek position %d" % position)
+        self._position = position
+        return position
+
+    def readinto(self, buffer: Union[bytearray, memoryview]) -> int:
+        data = self._read_range(self._position + len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def readall(self) -> bytes:
+        # 一次范围请求读取剩余内容，避免 RawIOBase 默认按 8KB 分段读取
+        return self._read_range(self.size)
+
+    def _read_range(self, end: int) -> bytes:
+        """
+        读取当前位置至 end 的内容
+        :param end: 结束位置(不包含)
+        :return: 内容
+        """
+        start = self._position
+        end = min(end, self.size)
+        if start >= end:
+            return b""
+
+        obj = self.bucket.get_object(self.key, byte_range=(start, end - 1))
+        data = obj.read()
+        if len(data) != end - start:
+            raise OssError(
+                "Incomplete read of %s: expected %d bytes, got %d"
+                % (self.key, end - start, len(data))
+            )
+
+        self._position += len(data)
+        return data
+
+
 class OssFile(File):
     """
     A file returned from AliCloud OSS
     """
 
-    def __init__(
-        self, content: SpooledTemporaryFile, name: str, storage: OssStorage
-    ):
+    def __init__(self, content: BinaryIO, name: str, storage: OssStorage):
         super(OssFile, self).__init__(content, name)
         self._storage = storage
 
@@ -0,0 +1,220 @@
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from weakref import WeakKeyDictionary
+
+import oss2
+import oss2.exceptions
+from django.core.exceptions import SuspiciousOperation
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from zq_django_util.utils.cache import LRUCache
+
+from .configs import oss_settings
+
+logger = logging.getLogger("oss")
+
+ClientKey = Tuple[str, str, str, str]
+T = TypeVar("T")
+
+
+class OssClient:
+    """
+    OSS bucket 客户端
+
+    同一进程内相同 access key、endpoint 与 bucket 的存储共享一个客户端与连接池，
+    bucket acl 在首次使用时获取并缓存
+    """
+
+    access_key_id: str
+    access_key_secret: str
+    end_point: str
+    bucket_name: str
+
+    auth: oss2.Auth
+    service: oss2.Service
+    bucket: oss2.Bucket
+    url_cache: LRUCache
+    meta_cache: LRUCache
+
+    _bucket_acl: Optional[str]
+    _lock: Lock
+
+    def __init__(
+        self,
+        access_key_id: str,
+        access_key_secret: str,
+        end_point: str,
+        bucket_name: str,
+        session: Optional[oss2.Session] = None,
+    ):
+        self.access_key_id = access_key_id
+        self.access_key_secret = access_key_secret
+        self.end_point = end_point
+        self.bucket_name = bucket_name
+
+        self.auth = oss2.Auth(access_key_id, access_key_secret)
+        self.service = oss2.Service(self.auth, end_point, session=session)
+        self.bucket = oss2.Bucket(
+            self.auth, end_point, bucket_name, session=session
+        )
+
+        self.url_cache = LRUCache(maxsize=oss_settings.URL_CACHE_SIZE)
+        self.meta_cache = LRUCache(
+            maxsize=oss_settings.META_CACHE_SIZE,
+            timeout=oss_settings.META_CACHE_TIMEOUT,
+        )
+
+        self._bucket_acl = None
+        self._lock = Lock()
+
+    @property
+    def bucket_acl(self) -> str:
+        """
+        bucket 访问权限(首次使用时获取)
+        """
+        if self._bucket_acl is None:
+            with self._lock:
+                if self._bucket_acl is None:
+                    try:
+                        self._bucket_acl = self.bucket.get_bucket_acl().acl
+                    except oss2.exceptions.NoSuchBucket:
+                        raise SuspiciousOperation(
+                            "Bucket '%s' does not exist." % self.bucket_name
+                        )
+                    logger.debug(
+                        "bucket: %s, acl: %s",
+                        self.bucket_name,
+                        self._bucket_acl,
+                    )
+        return self._bucket_acl
+
+    @bucket_acl.setter
+    def bucket_acl(self, acl: str) -> None:
+        self._bucket_acl = acl
+
+    @property
+    def bucket_acl_loaded(self) -> bool:
+        """
+        bucket 访问权限是否已获取
+        """
+        return self._bucket_acl is not None
+
+
+_session: Optional[oss2.Session] = None
+_clients: Dict[ClientKey, OssClient] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_semaphores: (
+    "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]"
+) = WeakKeyDictionary()
+_lock = Lock()
+
+
+def get_session() -> oss2.Session:
+    """
+    获取进程内共享的 oss2 session(连接池)
+    :return: session
+    """
+    global _session
+
+    with _lock:
+        if _session is None:
+            _session = oss2.Session(pool_size=oss_settings.CONNECTION_POOL_SIZE)
+        return _session
+
+
+def get_client(
+    access_key_id: str,
+    access_key_secret: str,
+    end_point: str,
+    bucket_name: str,
+) -> OssClient:
+    """
+    获取 bucket 客户端，相同配置在进程内复用
+    :param access_key_id: access key id
+    :param access_key_secret: access key secret
+    :param end_point: endpoint
+    :param bucket_name: bucket 名称
+    :return: 客户端
+    """
+    key = (access_key_id, access_key_secret, end_point, bucket_name)
+    client = _clients.get(key)
+    if client is None:
+        session = get_session()
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = OssClient(*key, session=session)
+                _clients[key] = client
+    return client
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    获取异步操作专用的线程池，不占用事件循环默认线程池
+    :return: 线程池
+    """
+    global _executor
+
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=oss_settings.ASYNC_THREADS,
+                thread_name_prefix="oss",
+            )
+        return _executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(oss_settings.ASYNC_MAX_PENDING)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def run_async(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    在 OSS 专用线程池中执行阻塞操作
+
+    同一事件循环中已提交的操作达到 ASYNC_MAX_PENDING 个时，
+    新的操作在提交前等待，避免线程池队列无限增长
+    :param func: 阻塞函数
+    :param args: 位置参数
+    :param kwargs: 关键字参数
+    :return: 函数返回值
+    """
+    async with _get_semaphore():
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor(),
+            functools.partial(context.run, func, *args, **kwargs),
+        )
+
+
+def clear_clients() -> None:
+    """
+    清空客户端、连接池与线程池(配置修改后重新创建)
+    :return:
+    """
+    global _session, _executor
+
+    with _lock:
+        _clients.clear()
+        _session = None
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+        _semaphores.clear()
+
+
+@receiver(setting_changed)
+def reload_clients(*, setting: str, **kwargs) -> None:
+    if setting == oss_settings.setting_name:
+        clear_clients()
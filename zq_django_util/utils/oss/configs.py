@@ -1,4 +1,4 @@
-from typing import List, TypedDict
+from typing import Any, Dict, List, Optional, TypedDict, Union
 
 from django.core.signals import setting_changed
 from django.dispatch import receiver
@@ -15,6 +15,29 @@ OssSettingDict = TypedDict(
         "URL_EXPIRE_SECOND": int,
         "TOKEN_EXPIRE_SECOND": int,
         "MAX_SIZE_MB": int,
+        "CONNECTION_POOL_SIZE": int,
+        "URL_CACHE_SIZE": int,
+        "URL_CACHE_MARGIN_SECOND": int,
+        "URL_CACHE_ALIAS": Optional[str],
+        "READ_BUFFER_SIZE": int,
+        "MULTIPART_THRESHOLD": int,
+        "MULTIPART_PART_SIZE": int,
+        "MULTIPART_THREADS": int,
+        "MULTIPART_CHECKPOINT_DIR": Optional[str],
+        "DELETE_THREADS": int,
+        "META_CACHE_SIZE": int,
+        "META_CACHE_TIMEOUT": int,
+        "ASYNC_THREADS": int,
+        "ASYNC_MAX_PENDING": int,
+        "COPY_THRESHOLD": int,
+        "COPY_THREADS": int,
+        "TOKEN_CACHE_SIZE": int,
+        "TOKEN_CACHE_MARGIN_SECOND": int,
+        "PUB_KEY_CACHE_SIZE": int,
+        "PUB_KEY_CACHE_TIMEOUT": int,
+        "PUB_KEY_FETCH_TIMEOUT": float,
+        "IMAGE_PRESETS": Dict[str, Union[str, Dict[str, Any]]],
+        "CONTENT_ADDRESSED": bool,
     },
 )
 
@@ -30,6 +53,29 @@ class OssSettings(PackageSettings):
         "URL_EXPIRE_SECOND": 60 * 60 * 24 * 30,
         "TOKEN_EXPIRE_SECOND": 60,
         "MAX_SIZE_MB": 100,
+        "CONNECTION_POOL_SIZE": 10,  # 进程内共享的连接池大小
+        "URL_CACHE_SIZE": 4096,  # 进程内签名 url 缓存数量，0 为不缓存
+        "URL_CACHE_MARGIN_SECOND": 60 * 60 * 24,  # 签名 url 过期前的安全时间
+        "URL_CACHE_ALIAS": None,  # 共享签名 url 缓存的 django cache 名称
+        "READ_BUFFER_SIZE": 1024 * 1024,  # 读取文件时每次请求的预读大小
+        "MULTIPART_THRESHOLD": 10 * 1024 * 1024,  # 超过该大小时使用分片上传
+        "MULTIPART_PART_SIZE": 10 * 1024 * 1024,  # 分片大小
+        "MULTIPART_THREADS": 4,  # 并行上传分片的线程数
+        "MULTIPART_CHECKPOINT_DIR": None,  # 断点续传记录目录，None 为不续传
+        "DELETE_THREADS": 4,  # 并行批量删除的线程数
+        "META_CACHE_SIZE": 4096,  # 进程内文件信息缓存数量，0 为不缓存
+        "META_CACHE_TIMEOUT": 5,  # 文件信息缓存时间(秒)
+        "ASYNC_THREADS": 8,  # 异步操作专用线程池大小
+        "ASYNC_MAX_PENDING": 64,  # 每个事件循环中同时提交的异步操作上限
+        "COPY_THRESHOLD": 100 * 1024 * 1024,  # 超过该大小时使用分片复制
+        "COPY_THREADS": 8,  # 批量复制、移动文件夹时并行复制的文件数
+        "TOKEN_CACHE_SIZE": 1024,  # 进程内前缀直传 token 缓存数量，0 为不缓存
+        "TOKEN_CACHE_MARGIN_SECOND": 30,  # 缓存的直传 token 过期前的安全时间
+        "PUB_KEY_CACHE_SIZE": 16,  # 进程内回调公钥缓存数量，0 为不缓存
+        "PUB_KEY_CACHE_TIMEOUT": 60 * 60 * 24,  # 回调公钥缓存时间(秒)
+        "PUB_KEY_FETCH_TIMEOUT": 5,  # 获取回调公钥的超时时间(秒)
+        "IMAGE_PRESETS": {},  # 图片处理预设，值为处理参数或 build_image_process 参数
+        "CONTENT_ADDRESSED": False,  # 按内容 sha256 命名文件，相同内容只上传一次
     }
 
     IMPORT_STRINGS: List[str] = []
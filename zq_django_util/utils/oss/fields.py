@@ -0,0 +1,32 @@
+from typing import Any, Optional
+
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+
+class OssImageField(serializers.ImageField):
+    """
+    输出 OSS 图片处理后 url 的图片字段
+
+    存储不支持图片处理时输出原图 url
+    """
+
+    process: str
+
+    def __init__(self, process: str, **kwargs: Any):
+        """
+        :param process: IMAGE_PRESETS 中的预设名或图片处理参数
+        """
+        self.process = process
+        super().__init__(**kwargs)
+
+    def to_representation(self, value: Any) -> Optional[str]:
+        if not value:
+            return None
+
+        image_url = getattr(value.storage, "image_url", None)
+        use_url = getattr(self, "use_url", api_settings.UPLOADED_FILES_USE_URL)
+        if not use_url or image_url is None:
+            return super().to_representation(value)
+
+        return image_url(value.name, self.process)
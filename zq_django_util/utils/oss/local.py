@@ -0,0 +1,527 @@
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import shutil
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from threading import Lock
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import quote, unquote, urlencode
+
+import oss2
+import oss2.exceptions
+from oss2.models import PartInfo, SimplifiedObjectInfo
+
+from .backends import OssStorage
+from .clients import OssClient
+
+REQUEST_ID = "local"
+
+
+def _not_found(key: str, code: str = "NoSuchKey") -> oss2.exceptions.NotFound:
+    exc_type = (
+        oss2.exceptions.NoSuchKey
+        if code == "NoSuchKey"
+        else oss2.exceptions.NotFound
+    )
+    return exc_type(
+        status=404,
+        headers={},
+        body=b"",
+        details={"Code": code, "Key": key},
+    )
+
+
+class _KeyIndex:
+    """
+    有序的对象 key 索引，列举时二分查找，每页耗时与对象总数无关
+    """
+
+    keys: List[str]
+    lock: Lock
+
+    def __init__(self, meta_dir: str):
+        self.keys = sorted(map(unquote, os.listdir(meta_dir)))
+        self.lock = Lock()
+
+    def add(self, key: str) -> None:
+        with self.lock:
+            index = bisect_left(self.keys, key)
+            if index == len(self.keys) or self.keys[index] != key:
+                self.keys.insert(index, key)
+
+    def remove(self, key: str) -> None:
+        with self.lock:
+            index = bisect_left(self.keys, key)
+            if index < len(self.keys) and self.keys[index] == key:
+                del self.keys[index]
+
+    def list(
+        self, prefix: str, delimiter: str, marker: str, max_keys: int
+    ) -> Tuple[List[Tuple[str, bool]], Optional[str]]:
+        """
+        列举一页 key
+        :return: (key 或公共前缀, 是否为公共前缀) 列表，下一页 marker(无下一页时为 None)
+        """
+        entries: List[Tuple[str, bool]] = []
+        next_marker = marker
+        with self.lock:
+            keys = self.keys
+            index = max(bisect_right(keys, marker), bisect_left(keys, prefix))
+            while index < len(keys) and keys[index].startswith(prefix):
+                if len(entries) >= max_keys:
+                    return entries, next_marker
+
+                key = keys[index]
+                position = key.find(delimiter, len(prefix)) if delimiter else -1
+                if position == -1:
+                    entries.append((key, False))
+                    next_marker = key
+                    index += 1
+                else:
+                    # 跳过该公共前缀下的其余对象
+                    common_prefix = key[: position + len(delimiter)]
+                    entries.append((common_prefix, True))
+                    next_marker = common_prefix + "\U0010ffff"
+                    index = bisect_right(keys, next_marker)
+        return entries, None
+
+
+_key_indexes: Dict[str, _KeyIndex] = {}
+_key_indexes_lock = Lock()
+
+
+def _get_key_index(meta_dir: str) -> _KeyIndex:
+    """
+    获取数据目录的 key 索引，同一进程中使用相同目录的 bucket 共享索引
+    """
+    path = os.path.realpath(meta_dir)
+    with _key_indexes_lock:
+        index = _key_indexes.get(path)
+        if index is None:
+            index = _key_indexes[path] = _KeyIndex(path)
+        return index
+
+
+class LocalBucket:
+    """
+    基于本地文件系统的 oss2.Bucket 替身
+
+    实现 OssStorage 用到的 oss2.Bucket 方法，用于离线测试与性能测试；
+    每次请求前等待 latency 秒以模拟网络延迟
+    """
+
+    root: str
+    bucket_name: str
+    endpoint: str
+    acl: str
+    latency: float
+
+    def __init__(
+        self,
+        root: str,
+        bucket_name: str = "local",
+        endpoint: str = "http://oss.localhost",
+        acl: str = oss2.BUCKET_ACL_PRIVATE,
+        latency: float = 0,
+    ):
+        """
+        :param root: 数据存放目录
+        :param bucket_name: bucket 名称
+        :param endpoint: 生成 url 使用的 endpoint
+        :param acl: bucket 访问权限
+        :param latency: 每次请求的模拟延迟(秒)
+        """
+        self.root = root
+        self.bucket_name = bucket_name
+        self.endpoint = endpoint
+        self.acl = acl
+        self.latency = latency
+
+        for dirname in ("objects", "meta", "uploads", "tmp"):
+            os.makedirs(os.path.join(root, dirname), exist_ok=True)
+        self._index = _get_key_index(os.path.join(root, "meta"))
+
+    def _request(self) -> None:
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    # 对象以转义后的 key 为文件名平铺存放，避免 a 与 a/b 在文件系统中冲突
+    def _object_path(self, key: str) -> str:
+        return os.path.join(self.root, "objects", quote(key, safe=""))
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.root, "meta", quote(key, safe=""))
+
+    def _upload_path(self, upload_id: str, part_number: int = 0) -> str:
+        path = os.path.join(self.root, "uploads", upload_id)
+        return os.path.join(path, str(part_number)) if part_number else path
+
+    @staticmethod
+    def _iter_data(data: Any) -> Iterable[bytes]:
+        if isinstance(data, str):
+            data = data.encode()
+        if isinstance(data, bytes):
+            yield data
+            return
+        if hasattr(data, "read"):
+            while True:
+                chunk = data.read(1024 * 1024)
+                if not chunk:
+                    return
+                yield chunk.encode() if isinstance(chunk, str) else chunk
+        for chunk in data:
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+
+    def _write(self, path: str, data: Any) -> str:
+        """
+        原子写入文件
+        :return: 内容 md5
+        """
+        md5 = hashlib.md5()
+        tmp_path = os.path.join(self.root, "tmp", uuid.uuid4().hex)
+        with open(tmp_path, "wb") as f:
+            for chunk in self._iter_data(data):
+                md5.update(chunk)
+                f.write(chunk)
+        os.replace(tmp_path, path)
+        return md5.hexdigest().upper()
+
+    def _write_meta(self, key: str, etag: str, **meta: Any) -> None:
+        meta = {
+            "etag": etag,
+            "content_type": mimetypes.guess_type(key)[0]
+            or "application/octet-stream",
+            "acl": oss2.OBJECT_ACL_DEFAULT,
+            **meta,
+        }
+        self._write(self._meta_path(key), json.dumps(meta))
+        self._index.add(key)
+
+    def _read_meta(self, key: str) -> Dict[str, Any]:
+        try:
+            with open(self._meta_path(key)) as f:
+                meta = json.load(f)
+            stat = os.stat(self._object_path(key))
+        except FileNotFoundError:
+            raise _not_found(key)
+        meta["content_length"] = stat.st_size
+        meta["last_modified"] = int(stat.st_mtime)
+        return meta
+
+    def _head(self, key: str) -> SimpleNamespace:
+        meta = self._read_meta(key)
+        return SimpleNamespace(
+            request_id=REQUEST_ID,
+            content_length=meta["content_length"],
+            last_modified=meta["last_modified"],
+            etag=meta["etag"],
+            content_type=meta["content_type"],
+            object_type="Normal",
+            headers={},
+        )
+
+    def get_bucket_acl(self) -> SimpleNamespace:
+        self._request()
+        return SimpleNamespace(acl=self.acl, request_id=REQUEST_ID)
+
+    def put_object(
+        self, key: str, data: Any, headers: Optional[Dict] = None, **kwargs
+    ) -> SimpleNamespace:
+        self._request()
+        etag = self._write(self._object_path(key), data)
+        self._write_meta(key, etag)
+        return SimpleNamespace(etag=etag, crc=None, request_id=REQUEST_ID)
+
+    def get_object(
+        self,
+        key: str,
+        byte_range: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        **kwargs,
+    ) -> io.BytesIO:
+        self._request()
+        meta = self._read_meta(key)
+        with open(self._object_path(key), "rb") as f:
+            if byte_range is None:
+                data = f.read()
+            else:
+                start, end = byte_range
+                start = start or 0
+                end = meta["content_length"] - 1 if end is None else end
+                f.seek(start)
+                data = f.read(max(end - start + 1, 0))
+
+        result = io.BytesIO(data)
+        result.content_length = len(data)
+        result.etag = meta["etag"]
+        result.request_id = REQUEST_ID
+        return result
+
+    def get_object_meta(self, key: str, **kwargs) -> SimpleNamespace:
+        self._request()
+        return self._head(key)
+
+    def head_object(self, key: str, **kwargs) -> SimpleNamespace:
+        self._request()
+        try:
+            return self._head(key)
+        except oss2.exceptions.NoSuchKey:
+            raise _not_found(key, code="NotFound")  # HEAD 响应没有错误码
+
+    def object_exists(self, key: str, **kwargs) -> bool:
+        self._request()
+        return os.path.exists(self._object_path(key))
+
+    def _delete(self, key: str) -> None:
+        self._index.remove(key)
+        for path in (self._object_path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def delete_object(self, key: str, **kwargs) -> SimpleNamespace:
+        self._request()
+        self._delete(key)
+        return SimpleNamespace(request_id=REQUEST_ID)
+
+    def batch_delete_objects(
+        self, key_list: List[str], **kwargs
+    ) -> SimpleNamespace:
+        self._request()
+        for key in key_list:
+            self._delete(key)
+        return SimpleNamespace(
+            deleted_keys=list(key_list), request_id=REQUEST_ID
+        )
+
+    def list_objects(
+        self,
+        prefix: str = "",
+        delimiter: str = "",
+        marker: str = "",
+        max_keys: int = 100,
+        **kwargs,
+    ) -> SimpleNamespace:
+        self._request()
+        entries, next_marker = self._index.list(
+            prefix, delimiter, marker, max_keys
+        )
+
+        object_list: List[SimplifiedObjectInfo] = []
+        prefix_list: List[str] = []
+        for key, is_prefix in entries:
+            if is_prefix:
+                prefix_list.append(key)
+                continue
+            try:
+                meta = self._read_meta(key)
+            except oss2.exceptions.NoSuchKey:  # 列举期间被删除
+                continue
+            object_list.append(
+                SimplifiedObjectInfo(
+                    key,
+                    meta["last_modified"],
+                    meta["etag"],
+                    "Normal",
+                    meta["content_length"],
+                    "Standard",
+                )
+            )
+
+        return SimpleNamespace(
+            object_list=object_list,
+            prefix_list=prefix_list,
+            is_truncated=next_marker is not None,
+            next_marker=next_marker or "",
+            request_id=REQUEST_ID,
+        )
+
+    def copy_object(
+        self,
+        source_bucket_name: str,
+        source_key: str,
+        target_key: str,
+        **kwargs,
+    ) -> SimpleNamespace:
+        self._request()
+        meta = self._read_meta(source_key)
+        with open(self._object_path(source_key), "rb") as f:
+            etag = self._write(self._object_path(target_key), f)
+        self._write_meta(target_key, etag, content_type=meta["content_type"])
+        return SimpleNamespace(etag=etag, request_id=REQUEST_ID)
+
+    def init_multipart_upload(self, key: str, **kwargs) -> SimpleNamespace:
+        self._request()
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._upload_path(upload_id))
+        return SimpleNamespace(upload_id=upload_id, request_id=REQUEST_ID)
+
+    def _check_upload(self, key: str, upload_id: str) -> None:
+        if not os.path.isdir(self._upload_path(upload_id)):
+            raise _not_found(key, code="NoSuchUpload")
+
+    def upload_part(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        data: Any,
+        **kwargs,
+    ) -> SimpleNamespace:
+        self._request()
+        self._check_upload(key, upload_id)
+        etag = self._write(self._upload_path(upload_id, part_number), data)
+        return SimpleNamespace(etag=etag, crc=None, request_id=REQUEST_ID)
+
+    def upload_part_copy(
+        self,
+        source_bucket_name: str,
+        source_key: str,
+        byte_range: Tuple[int, int],
+        target_key: str,
+        target_upload_id: str,
+        target_part_number: int,
+        **kwargs,
+    ) -> SimpleNamespace:
+        self._request()
+        self._check_upload(target_key, target_upload_id)
+        start, end = byte_range
+        with open(self._object_path(source_key), "rb") as f:
+            f.seek(start)
+            data = f.read(end - start + 1)
+        etag = self._write(
+            self._upload_path(target_upload_id, target_part_number), data
+        )
+        return SimpleNamespace(etag=etag, request_id=REQUEST_ID)
+
+    def complete_multipart_upload(
+        self, key: str, upload_id: str, parts: List[PartInfo], **kwargs
+    ) -> SimpleNamespace:
+        self._request()
+        self._check_upload(key, upload_id)
+
+        def iter_parts() -> Iterable[bytes]:
+            for part in sorted(parts, key=lambda part: part.part_number):
+                path = self._upload_path(upload_id, part.part_number)
+                with open(path, "rb") as f:
+                    yield from self._iter_data(f)
+
+        etag = self._write(self._object_path(key), iter_parts())
+        self._write_meta(key, etag)
+        shutil.rmtree(self._upload_path(upload_id), ignore_errors=True)
+        return SimpleNamespace(etag=etag, crc=None, request_id=REQUEST_ID)
+
+    def abort_multipart_upload(
+        self, key: str, upload_id: str, **kwargs
+    ) -> SimpleNamespace:
+        self._request()
+        self._check_upload(key, upload_id)
+        shutil.rmtree(self._upload_path(upload_id), ignore_errors=True)
+        return SimpleNamespace(request_id=REQUEST_ID)
+
+    def get_object_acl(self, key: str, **kwargs) -> SimpleNamespace:
+        self._request()
+        return SimpleNamespace(
+            acl=self._read_meta(key)["acl"], request_id=REQUEST_ID
+        )
+
+    def put_object_acl(
+        self, key: str, permission: str, **kwargs
+    ) -> SimpleNamespace:
+        self._request()
+        meta = self._read_meta(key)
+        self._write_meta(
+            key, meta["etag"], content_type=meta["content_type"], acl=permission
+        )
+        return SimpleNamespace(request_id=REQUEST_ID)
+
+    def _make_url(self, bucket_name: str, key: str) -> str:
+        scheme, netloc = self.endpoint.split("://")
+        return f"{scheme}://{bucket_name}.{netloc}/{quote(key, safe='')}"
+
+    def sign_url(
+        self,
+        method: str,
+        key: str,
+        expires: int,
+        headers: Optional[Dict] = None,
+        params: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> str:
+        """
+        生成形如签名 url 的地址(签名不可用于访问)
+        """
+        query: Dict[str, Union[str, int]] = {
+            "OSSAccessKeyId": REQUEST_ID,
+            "Expires": int(time.time()) + expires,
+            "Signature": hashlib.sha1(
+                f"{method}\n{key}\n{expires}".encode()
+            ).hexdigest(),
+            **(params or {}),
+        }
+        return (
+            self._make_url(self.bucket_name, key).replace("%2F", "/")
+            + "?"
+            + urlencode(query)
+        )
+
+
+class LocalOssClient(OssClient):
+    """
+    使用 LocalBucket 的客户端
+    """
+
+    bucket: LocalBucket
+
+    def __init__(self, bucket: LocalBucket):
+        super().__init__(
+            REQUEST_ID, REQUEST_ID, bucket.endpoint, bucket.bucket_name
+        )
+        self.bucket = bucket
+
+
+class LocalOssStorage(OssStorage):
+    """
+    数据存放在本地文件系统的 OssStorage，接口与行为与 OssStorage 一致
+
+    用于离线测试与性能测试，latency 为每次 OSS 请求的模拟延迟(秒)
+    """
+
+    def __init__(
+        self,
+        root: str,
+        base_dir: str = "",
+        latency: float = 0,
+        acl: str = oss2.BUCKET_ACL_PRIVATE,
+        bucket_name: str = "local",
+        expire_time: Optional[int] = None,
+        content_addressed: Optional[bool] = None,
+    ):
+        self.root = root
+        self.base_dir = base_dir
+        self.latency = latency
+        self.acl = acl
+        super().__init__(
+            access_key_id=REQUEST_ID,
+            access_key_secret=REQUEST_ID,
+            end_point="http://oss.localhost",
+            bucket_name=bucket_name,
+            expire_time=expire_time,
+            content_addressed=content_addressed,
+        )
+
+    def _get_client(self) -> OssClient:
+        return LocalOssClient(
+            LocalBucket(
+                self.root,
+                bucket_name=self.bucket_name,
+                endpoint=self.end_point,
+                acl=self.acl,
+                latency=self.latency,
+            )
+        )
@@ -3,9 +3,20 @@ import datetime
 import hashlib
 import hmac
 import json
+import os
 import random
 import time
-from typing import AnyStr, Dict, Optional, Tuple, TypedDict
+from threading import Lock
+from typing import (
+    AnyStr,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypedDict,
+)
 from urllib.parse import unquote
 from urllib.request import urlopen
 
@@ -13,8 +24,11 @@ from Crypto.Hash import MD5
 from Crypto.PublicKey import RSA
 from Crypto.Signature import PKCS1_v1_5
 from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from rest_framework.request import Request
 
+from zq_django_util.utils.cache import LRUCache
 from zq_django_util.utils.oss.configs import oss_settings
 from zq_django_util.utils.types import JSONValue
 
@@ -73,61 +87,286 @@ def get_random_name(file_name: str) -> str:
     return new_name
 
 
-def get_token(
-    key: str,
-    callback: Dict[str, str],
-    policy: Optional[JSONValue] = None,
-) -> OSSCallbackToken:
+def get_content_addressed_name(file_name: str, digest: str) -> str:
     """
-    获取直传签名token
+    获取按内容哈希命名的文件名
+
+    :param file_name: 原文件名
+    :param digest: 文件内容 sha256 十六进制摘要
+
+    :return: sha256/摘要前两位/摘要其余部分.扩展名
     """
-    # 获取Policy
-    expire_time = datetime.datetime.now() + datetime.timedelta(
-        seconds=oss_settings.TOKEN_EXPIRE_SECOND
-    )
-    expire = get_iso_8601(expire_time.timestamp())
-    if policy is None:
-        policy = {
-            "expiration": expire,  # 过期时间
-            "conditions": [
-                {"bucket": oss_settings.BUCKET_NAME},
-                [
-                    "content-length-range",
-                    0,
-                    oss_settings.MAX_SIZE_MB * 1024 * 1024,
-                ],  # 限制上传文件大小
-                ["eq", "$key", f"{key}"],  # 限制上传文件名
-            ],
-        }
-    policy = json.dumps(policy).strip()
-    policy_encode = base64.b64encode(policy.encode())
+    _, ext = split_file_name(os.path.basename(file_name))
 
-    # 签名
-    h = hmac.new(
-        oss_settings.ACCESS_KEY_SECRET.encode(),
-        policy_encode,
-        hashlib.sha1,
+    return f"sha256/{digest[:2]}/{digest[2:]}" + (
+        ("." + ext.lower()) if ext != "" else ""
     )
-    sign = base64.encodebytes(h.digest()).strip()
 
-    # 回调参数
+
+def build_image_process(
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    mode: str = "lfit",
+    crop: Optional[Tuple[int, int, int, int]] = None,
+    format: Optional[str] = None,
+    quality: Optional[int] = None,
+) -> str:
+    """
+    生成 OSS 图片处理参数
+
+    :param width: 缩放宽度
+    :param height: 缩放高度
+    :param mode: 缩放模式(lfit、mfit、fill、pad、fixed)
+    :param crop: 缩放前裁剪区域 (x, y, w, h)
+    :param format: 转换格式，例如 webp
+    :param quality: 相对质量(1-100)
+
+    :return: 图片处理参数，例如 image/resize,m_lfit,w_64,h_64/format,webp
+    """
+    actions = ["image"]
+    if crop is not None:
+        x, y, w, h = crop
+        actions.append(f"crop,x_{x},y_{y},w_{w},h_{h}")
+    if width is not None or height is not None:
+        resize = f"resize,m_{mode}"
+        if width is not None:
+            resize += f",w_{width}"
+        if height is not None:
+            resize += f",h_{height}"
+        actions.append(resize)
+    if format is not None:
+        actions.append(f"format,{format}")
+    if quality is not None:
+        actions.append(f"quality,q_{quality}")
+    if len(actions) == 1:
+        raise ValueError("Image process requires at least one action")
+
+    return "/".join(actions)
+
+
+def get_image_process(process: str) -> str:
+    """
+    获取图片处理参数
+
+    :param process: IMAGE_PRESETS 中的预设名或图片处理参数
+
+    :return: 图片处理参数
+    """
+    preset = oss_settings.IMAGE_PRESETS.get(process, process)
+    if isinstance(preset, dict):
+        return build_image_process(**preset)
+    return preset
+
+
+class SigningMaterial(NamedTuple):
+    """
+    直传签名材料，随配置变化重新生成
+    """
+
+    access_key_id: str
+    host: str
+    hmac: hmac.HMAC  # 已载入 access key secret 的 HMAC-SHA1，签名时复制使用
+
+
+_signing_material: Optional[SigningMaterial] = None
+_token_cache: Optional[LRUCache] = None
+_pub_key_cache: Optional[LRUCache] = None
+_pub_key_locks: Dict[str, Lock] = {}
+_pub_key_locks_lock = Lock()
+
+
+def get_signing_material() -> SigningMaterial:
+    """
+    获取直传签名材料(host 与签名密钥只在配置变化后计算一次)
+    """
+    global _signing_material
+
+    material = _signing_material
+    if material is None:
+        scheme, netloc = oss_settings.ENDPOINT.split("://")
+        material = SigningMaterial(
+            access_key_id=oss_settings.ACCESS_KEY_ID,
+            host=f"{scheme}://{oss_settings.BUCKET_NAME}.{netloc}",
+            hmac=hmac.new(
+                oss_settings.ACCESS_KEY_SECRET.encode(), digestmod=hashlib.sha1
+            ),
+        )
+        _signing_material = material
+    return material
+
+
+def _get_token_cache() -> LRUCache:
+    global _token_cache
+
+    token_cache = _token_cache
+    if token_cache is None:
+        token_cache = LRUCache(
+            maxsize=oss_settings.TOKEN_CACHE_SIZE,
+            timeout=oss_settings.TOKEN_EXPIRE_SECOND
+            - oss_settings.TOKEN_CACHE_MARGIN_SECOND,
+        )
+        _token_cache = token_cache
+    return token_cache
+
+
+def clear_token_cache() -> None:
+    """
+    清除签名材料与前缀直传 token 缓存
+    """
+    global _signing_material, _token_cache
+
+    _signing_material = None
+    _token_cache = None
+
+
+def clear_pub_key_cache() -> None:
+    """
+    清除进程内回调公钥缓存
+    """
+    global _pub_key_cache
+
+    _pub_key_cache = None
+
+
+@receiver(setting_changed)
+def reload_caches(*, setting: str, **kwargs) -> None:
+    if setting == oss_settings.setting_name:
+        clear_token_cache()
+        clear_pub_key_cache()
+
+
+def _get_expire() -> str:
+    return get_iso_8601(time.time() + oss_settings.TOKEN_EXPIRE_SECOND)
+
+
+def _encode_callback(callback: Dict[str, str]) -> str:
     callback_param = json.dumps(callback).strip()
-    base64_callback_body = base64.b64encode(callback_param.encode())
+    return base64.b64encode(callback_param.encode()).decode()
+
+
+def _build_token(
+    material: SigningMaterial,
+    key: str,
+    policy: JSONValue,
+    expire: str,
+    callback: str,
+) -> OSSCallbackToken:
+    policy_encode = base64.b64encode(json.dumps(policy).strip().encode())
+
+    # 签名
+    h = material.hmac.copy()
+    h.update(policy_encode)
+    sign = base64.encodebytes(h.digest()).strip()
 
     return dict(
-        OSSAccessKeyId=oss_settings.ACCESS_KEY_ID,
-        host=(
-            f'{oss_settings.ENDPOINT.split("://")[0]}://{oss_settings.BUCKET_NAME}.'
-            f'{oss_settings.ENDPOINT.split("://")[1]}'
-        ),
+        OSSAccessKeyId=material.access_key_id,
+        host=material.host,
         policy=policy_encode.decode(),
         signature=sign.decode(),
         expire=expire,
         key=key,
-        callback=base64_callback_body.decode(),
+        callback=callback,
+    )
+
+
+def _get_policy(expire: str, key_condition: List[str]) -> JSONValue:
+    return {
+        "expiration": expire,  # 过期时间
+        "conditions": [
+            {"bucket": oss_settings.BUCKET_NAME},
+            [
+                "content-length-range",
+                0,
+                oss_settings.MAX_SIZE_MB * 1024 * 1024,
+            ],  # 限制上传文件大小
+            key_condition,  # 限制上传文件名
+        ],
+    }
+
+
+def get_token(
+    key: str,
+    callback: Dict[str, str],
+    policy: Optional[JSONValue] = None,
+) -> OSSCallbackToken:
+    """
+    获取直传签名token
+    """
+    expire = _get_expire()
+    if policy is None:
+        policy = _get_policy(expire, ["eq", "$key", key])
+
+    return _build_token(
+        get_signing_material(), key, policy, expire, _encode_callback(callback)
     )
 
 
+def get_tokens(
+    keys: Iterable[str],
+    callback: Dict[str, str],
+    policy: Optional[JSONValue] = None,
+) -> List[OSSCallbackToken]:
+    """
+    批量获取直传签名token
+
+    所有 token 共用过期时间与回调参数，传入 policy 时只签名一次
+    :param keys: 上传文件路径列表
+    :param callback: 回调内容
+    :param policy: 上传策略(可选，默认分别限制每个 token 的上传文件名)
+    :return: 与 keys 顺序一致的 token 列表
+    """
+    material = get_signing_material()
+    expire = _get_expire()
+    callback_encode = _encode_callback(callback)
+
+    if policy is not None:
+        token = _build_token(material, "", policy, expire, callback_encode)
+        return [{**token, "key": key} for key in keys]
+
+    return [
+        _build_token(
+            material,
+            key,
+            _get_policy(expire, ["eq", "$key", key]),
+            expire,
+            callback_encode,
+        )
+        for key in keys
+    ]
+
+
+def get_prefix_token(
+    prefix: str,
+    callback: Dict[str, str],
+) -> OSSCallbackToken:
+    """
+    获取限制上传路径前缀的直传签名token
+
+    同一前缀与回调的 token 在过期前 TOKEN_CACHE_MARGIN_SECOND 秒内缓存复用，
+    返回的 key 为前缀，客户端需在其后拼接文件名
+    :param prefix: 上传路径前缀
+    :param callback: 回调内容
+    :return: token
+    """
+    material = get_signing_material()
+    callback_encode = _encode_callback(callback)
+    token_cache = _get_token_cache()
+
+    cache_key = (prefix, callback_encode)
+    token = token_cache.get(cache_key)
+    if token is None:
+        expire = _get_expire()
+        token = _build_token(
+            material,
+            prefix,
+            _get_policy(expire, ["starts-with", "$key", prefix]),
+            expire,
+            callback_encode,
+        )
+        token_cache.set(cache_key, token)
+    return dict(token)
+
+
 def check_callback_signature(request: Request) -> bool:
     """
     检测回调身份
@@ -150,7 +389,7 @@ def check_callback_signature(request: Request) -> bool:
             "http://gosspublic.alicdn.com/"
         ) and not pub_key_url.startswith("https://gosspublic.alicdn.com/"):
             return False
-        pub_key = get_pub_key(pub_key_url)
+        rsa_pub = get_rsa_pub_key(pub_key_url)
 
         # 获取base64解码后的签名
         authorization = base64.b64decode(authorization_base64)
@@ -175,10 +414,8 @@ def check_callback_signature(request: Request) -> bool:
 
         # 验证签名
         auth_md5 = MD5.new(auth_str.encode())
-        rsa_pub = RSA.importKey(pub_key)
         verifier = PKCS1_v1_5.new(rsa_pub)
-        verifier.verify(auth_md5, authorization)
-        return True
+        return verifier.verify(auth_md5, authorization)
     except Exception:
         return False
 
@@ -187,7 +424,7 @@ def _get_pub_key_online(pub_key_url: str) -> AnyStr:
     """
     从网络获取pub key
     """
-    response = urlopen(pub_key_url)
+    response = urlopen(pub_key_url, timeout=oss_settings.PUB_KEY_FETCH_TIMEOUT)
     return response.read()
 
 
@@ -203,7 +440,49 @@ def get_pub_key(pub_key_url: str) -> AnyStr:
         res = cache.get(key, None)
         if res is None:
             res = _get_pub_key_online(pub_key_url)
-            cache.set(key, res)
+            cache.set(key, res, oss_settings.PUB_KEY_CACHE_TIMEOUT)
         return res
     except Exception:
         return _get_pub_key_online(pub_key_url)
+
+
+def _get_pub_key_cache() -> LRUCache:
+    global _pub_key_cache
+
+    pub_key_cache = _pub_key_cache
+    if pub_key_cache is None:
+        pub_key_cache = LRUCache(
+            maxsize=oss_settings.PUB_KEY_CACHE_SIZE,
+            timeout=oss_settings.PUB_KEY_CACHE_TIMEOUT,
+        )
+        _pub_key_cache = pub_key_cache
+    return pub_key_cache
+
+
+def get_rsa_pub_key(pub_key_url: str) -> RSA.RsaKey:
+    """
+    获取解析后的公钥
+
+    解析结果在进程内缓存 PUB_KEY_CACHE_TIMEOUT 秒，
+    同一 url 同时只有一个线程获取，其余线程等待其结果
+    :param pub_key_url: url
+    :return: RSA 公钥
+    """
+    pub_key_cache = _get_pub_key_cache()
+    rsa_pub = pub_key_cache.get(pub_key_url)
+    if rsa_pub is not None:
+        return rsa_pub
+
+    with _pub_key_locks_lock:
+        lock = _pub_key_locks.setdefault(pub_key_url, Lock())
+    try:
+        with lock:
+            rsa_pub = pub_key_cache.get(pub_key_url)
+            if rsa_pub is None:
+                rsa_pub = RSA.importKey(get_pub_key(pub_key_url))
+                pub_key_cache.set(pub_key_url, rsa_pub)
+            return rsa_pub
+    finally:
+        with _pub_key_locks_lock:
+            if _pub_key_locks.get(pub_key_url) is lock:
+                del _pub_key_locks[pub_key_url]
@@ -1,7 +1,10 @@
+from django.contrib.auth.hashers import check_password, make_password
 from django.contrib.auth.models import AbstractUser as DjangoAbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
 
+from zq_django_util.utils.auth.configs import zq_auth_settings
+
 
 class AbstractUser(DjangoAbstractUser):
     """
@@ -46,6 +49,34 @@ class AbstractUser(DjangoAbstractUser):
     def __str__(self):
         return self.username
 
+    def set_password(self, raw_password):
+        """
+        设置密码，配置 ZQ_AUTH.PASSWORD_HASHER 时使用指定的哈希算法
+        """
+        hasher = zq_auth_settings.PASSWORD_HASHER
+        if hasher is None:
+            return super().set_password(raw_password)
+
+        self.password = make_password(raw_password, hasher=hasher)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        校验密码，配置 ZQ_AUTH.PASSWORD_HASHER 时登录成功后自动将旧哈希升级为指定算法
+        """
+        hasher = zq_auth_settings.PASSWORD_HASHER
+        if hasher is None:
+            return super().check_password(raw_password)
+
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return check_password(
+            raw_password, self.password, setter, preferred=hasher
+        )
+
     class Meta:
         abstract = True
         db_table = "zq_user"